@@ -2,17 +2,30 @@
 Main Flask Application - Modular Version
 """
 import os
+import time
+
+_import_started_at = time.perf_counter()
+
+import click
 from flask import Flask
 from dotenv import load_dotenv
 
-from config.settings import config_map
-from routes.main_routes import main_bp, init_services
+from config.settings import config_map, SCHOOL_DATA_SOURCES
+from routes import main_routes
+from routes.main_routes import main_bp, init_services, get_warmers
+from services.startup import StartupReport, start_warmup
+
+_imports_seconds = round(time.perf_counter() - _import_started_at, 4)
 
 
 def create_app(config_name=None):
     """Application factory function"""
+    report = StartupReport(started_at=_import_started_at)
+    report.phases['imports'] = _imports_seconds
+
     app = Flask(__name__)
-    
+    app.extensions['startup_report'] = report
+
     # Load environment variables
     load_dotenv()
     
@@ -23,7 +36,8 @@ def create_app(config_name=None):
     # Configure app
     config_class = config_map.get(config_name, config_map['default'])
     config_instance = config_class()
-    config_instance.init_app(app)
+    with report.phase('config'):
+        config_instance.init_app(app)
     
     # Configure Gemini AI
     _configure_genai(app)
@@ -32,22 +46,31 @@ def create_app(config_name=None):
     _setup_security_headers(app)
     
     # Initialize services
-    init_services(app)
-    
-    # Register blueprints
+    with report.phase('services'):
+        init_services(app)
+
+    # Register blueprints and CLI commands
     app.register_blueprint(main_bp)
-    
+    _register_cli_commands(app)
+
+    # Load libraries and read-only data before the first request needs them,
+    # in the background unless STARTUP_WARMUP_BACKGROUND is off
+    if app.config.get('STARTUP_WARMUP', True):
+        start_warmup(report, get_warmers(), background=app.config.get('STARTUP_WARMUP_BACKGROUND', True))
+
+    report.mark_ready()
+    report.print_summary()
     return app
 
 
 def _configure_genai(app):
-    """Configure Google Generative AI"""
-    import google.generativeai as genai
-    
+    """Check Google Generative AI configuration
+
+    Clients are bound to each key by ProposalService's GeminiClientPool, so
+    the process-global genai.configure key is never set.
+    """
     api_key = app.config.get('GEMINI_API_KEY')
-    if api_key:
-        genai.configure(api_key=api_key)
-    else:
+    if not api_key and not app.config.get('USE_FAKE_LLM'):
         print("Warning: GEMINI_API_KEY not configured")
 
 
@@ -73,6 +96,24 @@ def _setup_security_headers(app):
         return response
 
 
+def _register_cli_commands(app):
+    """Register maintenance commands for the flask CLI"""
+
+    @app.cli.command('ingest-schools')
+    @click.argument('csv_files', nargs=-1, type=click.Path(exists=True, dir_okay=False))
+    @click.option('--district', help="District of every row, for CSVs without a 'District Name' column")
+    def ingest_schools(csv_files, district):
+        """Merge school CSVs into the columnar school store.
+
+        Without arguments, merges the SCHOOL_DATA_SOURCES files from input_data.
+        """
+        if csv_files:
+            sources = [{'file': os.path.abspath(path), 'district': district} for path in csv_files]
+        else:
+            sources = SCHOOL_DATA_SOURCES
+        main_routes.data_service.ingest(sources)
+
+
 # Create the application instance
 app = create_app()
 
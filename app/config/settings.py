@@ -11,6 +11,97 @@ class Config:
     # Folder configurations
     INPUT_FILES_FOLDER_NAME = 'input_data'
     DOWNLOAD_FOLDER_NAME = 'generated_proposals'
+    STATE_FOLDER_NAME = 'runtime_state'
+
+    # Tunable runtime settings; each can be overridden by an environment
+    # variable of the same name. The default's type decides how it is parsed.
+    TUNING_DEFAULTS = {
+        # Local fake LLM for development and load testing (no Gemini keys needed)
+        'USE_FAKE_LLM': False,
+        'FAKE_LLM_LATENCY_SECONDS': 0.0,
+
+        # Idle GenerativeModel objects kept per API key between requests
+        'GEMINI_POOL_SIZE': 8,
+
+        # Per-key rate limits (per gunicorn worker) and load balancing.
+        # GEMINI_KEY_WEIGHTS is a comma-separated list in key order
+        # (primary, alternate, then GEMINI_API_KEYS), e.g. "1,1,0.5"
+        'GEMINI_RPM_LIMIT': 15,
+        'GEMINI_TPM_LIMIT': 1000000,
+        'GEMINI_KEY_WEIGHTS': '',
+        'GEMINI_QUEUE_TIMEOUT_SECONDS': 20.0,
+        'GEMINI_QUOTA_COOLDOWN_SECONDS': 60.0,
+        'GEMINI_AUTH_COOLDOWN_SECONDS': 3600.0,
+
+        # Per-call deadline, retries of transient errors (exponential backoff
+        # with jitter) and hedging of slow calls on a second key
+        'GEMINI_DEADLINE_SECONDS': 120.0,
+        'GEMINI_MAX_RETRIES': 2,
+        'GEMINI_RETRY_BASE_SECONDS': 1.0,
+        'GEMINI_RETRY_MAX_SECONDS': 10.0,
+        'GEMINI_HEDGING': False,
+        'GEMINI_HEDGE_PERCENTILE': 95,
+        'GEMINI_HEDGE_DELAY_SECONDS': 15.0,
+
+        # Background proposal generation jobs (per gunicorn worker)
+        'JOB_WORKERS': 2,
+        'JOB_QUEUE_SIZE': 8,
+        'JOB_RETENTION_SECONDS': 3600,
+        'JOB_RETRY_AFTER_SECONDS': 5,
+
+        # Stream generated text to the proposal page over server-sent events.
+        # A stream holds a gunicorn thread for the whole generation, so it is
+        # off by default and capped at PROPOSAL_STREAM_SLOTS per worker (keep
+        # that below gunicorn's threads so /healthz and polls still get one)
+        'PROPOSAL_STREAMING': False,
+        'PROPOSAL_STREAM_SLOTS': 1,
+
+        # Host-wide cache of Gemini responses keyed on model + prompt
+        'LLM_CACHE_ENABLED': True,
+        'LLM_CACHE_MAX_MB': 64,
+        'LLM_CACHE_TTL_SECONDS': 86400,
+
+        # Share one upstream call among concurrent identical prompts, within
+        # a worker and across workers on the host
+        'SINGLE_FLIGHT_ENABLED': True,
+        'SINGLE_FLIGHT_RESULT_TTL_SECONDS': 60,
+
+        # Seconds between checks of input_data template files for changes
+        'TEMPLATE_CHECK_INTERVAL_SECONDS': 2.0,
+
+        # Seconds between checks of the school data (input_data/data.csv, or
+        # the store written by `flask ingest-schools`) for changes
+        'SCHOOL_DATA_CHECK_INTERVAL_SECONDS': 2.0,
+
+        # Keep compiled Jinja templates on disk so they survive worker restarts
+        'JINJA_BYTECODE_CACHE': True,
+
+        # Fill YAML+Jinja templates one top-level section per model call
+        'SECTION_PARALLEL_GENERATION': True,
+        'SECTION_CONCURRENCY': 4,
+        'SECTION_MAX_HEADING_LEVEL': 2,
+
+        # Import the deferred libraries and load templates, the school table and
+        # the header logo at startup (in the gunicorn master when preload_app
+        # is on) instead of on first use
+        'STARTUP_WARMUP': True,
+        # Run that warmup in a background thread so /healthz answers at once
+        # (the gunicorn master still finishes it before forking the workers)
+        'STARTUP_WARMUP_BACKGROUND': True,
+
+        # Long-lived headless LibreOffice instances per worker for PDF export,
+        # each restarted after PDF_RECYCLE_AFTER conversions
+        'PDF_POOL_SIZE': 2,
+        'PDF_CONVERSION_TIMEOUT_SECONDS': 60.0,
+        'PDF_RECYCLE_AFTER': 50,
+        # PDFs waiting for a free instance before new ones are not rendered
+        'PDF_QUEUE_SIZE': 16,
+        # LibreOffice executable; empty finds libreoffice or soffice on the PATH
+        'LIBREOFFICE_BINARY': '',
+        # Python with LibreOffice's uno module that drives the long-lived
+        # instances; empty tries this interpreter and the system python3
+        'LIBREOFFICE_PYTHON': '',
+    }
     
     def __init__(self, app=None):
         if app:
@@ -23,19 +114,27 @@ class Config:
         # Set up paths
         app.config['INPUT_FILES_FOLDER'] = os.path.abspath(self.INPUT_FILES_FOLDER_NAME)
         app.config['DOWNLOAD_FOLDER'] = os.path.abspath(self.DOWNLOAD_FOLDER_NAME)
+        app.config['STATE_FOLDER'] = os.path.abspath(self.STATE_FOLDER_NAME)
+        app.config['SCHOOL_STORE_FOLDER'] = os.path.join(app.config['STATE_FOLDER'], 'school_store')
         
         # Create directories if they don't exist
         self._create_directories(app)
         
-        # Load environment variables
+        # Load tunable settings and environment variables
+        self._load_tuning_vars(app)
         self._load_env_vars(app)
     
     def _create_directories(self, app):
         """Create necessary directories"""
-        for folder in [app.config['INPUT_FILES_FOLDER'], app.config['DOWNLOAD_FOLDER']]:
+        for folder in [app.config['INPUT_FILES_FOLDER'], app.config['DOWNLOAD_FOLDER'], app.config['STATE_FOLDER']]:
             if not os.path.exists(folder):
                 os.makedirs(folder)
     
+    def _load_tuning_vars(self, app):
+        """Load tunable settings, letting environment variables override defaults"""
+        for name, default in self.TUNING_DEFAULTS.items():
+            app.config[name] = env_setting(name, default)
+
     def _load_env_vars(self, app):
         """Load required environment variables"""
         required_vars = ["GEMINI_API_KEY", "GEMINI_API_KEY_ALTERNATE"]
@@ -43,11 +142,39 @@ class Config:
         for var in required_vars:
             value = os.getenv(var)
             if not value:
+                if app.config.get('USE_FAKE_LLM'):
+                    # The fake LLM never talks to Gemini, so keys are optional
+                    app.config[var] = None
+                    continue
                 raise ValueError(f"{var} not set. Please set it in your .env file.")
             app.config[var] = value
+
+        # Optional extra keys beyond the primary/alternate pair, comma-separated
+        extra_keys = os.getenv("GEMINI_API_KEYS", "")
+        app.config['GEMINI_EXTRA_API_KEYS'] = [key.strip() for key in extra_keys.split(',') if key.strip()]
         
         app.config['DEPL'] = os.getenv("DEPL", "DEV")
 
+def env_setting(name, default):
+    """Read an environment variable, parsing it with the type of its default value"""
+    raw_value = os.getenv(name)
+    if raw_value is None or raw_value.strip() == '':
+        return default
+    raw_value = raw_value.strip()
+
+    try:
+        if isinstance(default, bool):
+            return raw_value.lower() in ('1', 'true', 'yes', 'on')
+        if isinstance(default, int):
+            return int(raw_value)
+        if isinstance(default, float):
+            return float(raw_value)
+    except ValueError:
+        print(f"Warning: Invalid value '{raw_value}' for {name}, using default {default!r}")
+        return default
+
+    return raw_value
+
 class DevelopmentConfig(Config):
     """Development configuration"""
     DEBUG = True
@@ -65,6 +192,19 @@ config_map = {
     'default': DevelopmentConfig
 }
 
+# Gemini model used for proposal generation
+GEMINI_MODEL_NAME = 'gemini-2.0-flash'
+
+# School CSVs merged into the school store by `flask ingest-schools`, in
+# priority order; 'district' names the district of files without a
+# District Name column
+SCHOOL_DATA_SOURCES = [
+    {'file': 'data.csv'},
+    {'file': 'natomas_school_district_demographics.csv', 'district': 'Natomas Unified School District'},
+    {'file': 'twin_rivers_school_district_demographics.csv', 'district': 'Twin Rivers Unified School District'},
+    {'file': 'sacramento_school_district_demographics_with_expanded.csv', 'district': 'Sacramento City Unified School District'},
+]
+
 # RFP Type to file mapping
 RFP_TYPE_FILES = {
     "Extended Learning Opportunities Program": {
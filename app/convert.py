@@ -1,13 +1,36 @@
 # convert.py
 
 import re
+from xml.sax.saxutils import escape
 from docx import Document
-from docx.shared import Inches, Pt
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls
+from docx.shared import Emu, Inches, Pt
+
+# A colon directly between a word character and the next word gets a space (Name:John -> Name: John)
+COLON_SPACING_PATTERN = re.compile(r'(\w):([^\s])')
+# **bold** left in text the inline pattern did not consume (headings, list items, quotes)
+BOLD_MARKER_PATTERN = re.compile(r'(\*\*.*?\*\*)')
+# Markdown table separator row (|---|:---:|)
+TABLE_SEPARATOR_PATTERN = re.compile(r'^\s*\|?[\s\-:|\|]*\|?\s*$')
+
+BOLD_MARKERS = ('**', '__', '***', '___')
+ITALIC_MARKERS = ('*', '_', '***', '___')
+# Shading of a table's header row
+TABLE_HEADER_FILL = 'D9E2F3'
+# Column widths follow the longest cell text in each column, within these bounds (characters)
+TABLE_MIN_COLUMN_CHARS = 4
+TABLE_MAX_COLUMN_CHARS = 40
+
 
 class MarkdownToDocxConverter:
     """
     A class to convert a Markdown formatted string into a .docx file.
     Can be initialized with an existing Document object to append content.
+
+    Runs are emitted with the colon spacing and leftover **bold** fixes that
+    word_formatter used to apply to the saved file, so a document is built
+    once and serialized once.
     """
 
     def __init__(self, document=None):
@@ -74,6 +97,12 @@ class MarkdownToDocxConverter:
 
     # ... (the rest of the _add_... methods remain exactly the same) ...
 
+    def add_heading(self, text, level):
+        """Adds a heading paragraph with the given text and returns it."""
+        paragraph = self.doc.add_heading('', level=level)
+        self._emit_runs(paragraph, [(text, None)])
+        return paragraph
+
     def _add_heading(self, line):
         """Adds a heading based on the number of '#' characters."""
         level = 0
@@ -81,7 +110,7 @@ class MarkdownToDocxConverter:
             level += 1
         
         heading_text = line[level:].strip()
-        self.doc.add_heading(heading_text, level=min(level, 6))
+        self.add_heading(heading_text, min(level, 6))
 
     def _add_horizontal_rule(self):
         """Adds a horizontal rule to the document."""
@@ -94,7 +123,7 @@ class MarkdownToDocxConverter:
     def _add_blockquote(self, line):
         """Adds a blockquote, removing the '>' marker."""
         quote_text = line.lstrip('> ').strip()
-        self.doc.add_paragraph(quote_text, style='Quote')
+        self._emit_runs(self.doc.add_paragraph(style='Quote'), [(quote_text, None)])
 
     def _add_list_item(self, line):
         """Adds a list item, handling indentation and type (bullet/number)."""
@@ -126,18 +155,19 @@ class MarkdownToDocxConverter:
 
         # Try to add paragraph with the requested style, fallback to basic list style if it doesn't exist
         try:
-            self.doc.add_paragraph(text, style=style)
+            paragraph = self.doc.add_paragraph(style=style)
         except KeyError:
             # If the specific style doesn't exist, fall back to the base style
             fallback_style = base_style if 'base_style' in locals() else 'List Bullet'
             try:
-                self.doc.add_paragraph(text, style=fallback_style)
+                paragraph = self.doc.add_paragraph(style=fallback_style)
             except KeyError:
                 # If even the base style doesn't exist, create as normal paragraph
-                paragraph = self.doc.add_paragraph(text)
+                paragraph = self.doc.add_paragraph()
                 # Add bullet formatting manually if needed
                 if not re.match(r'^\s*\d+\.\s', line):
                     paragraph.style = 'Normal'
+        self._emit_runs(paragraph, [(text, None)])
 
     def _add_formatted_paragraph(self, line):
         """Adds a paragraph with complex inline formatting."""
@@ -148,26 +178,7 @@ class MarkdownToDocxConverter:
             p.paragraph_format.space_after = Pt(0)
             p.paragraph_format.space_before = Pt(0)
 
-        last_end = 0
-        for match in self.inline_pattern.finditer(line):
-            start, end = match.span()
-            marker = match.group(1)
-            text = match.group(2)
-            if start > last_end:
-                p.add_run(line[last_end:start])
-            run = p.add_run(text)
-            if marker in ['**', '__', '***', '___']:
-                run.bold = True
-            if marker in ['*', '_', '***', '___']:
-                run.italic = True
-            if marker == '`':
-                font = run.font
-                font.name = 'Courier New'
-            if marker == '~~':
-                run.font.strike = True
-            last_end = end
-        if last_end < len(line):
-            p.add_run(line[last_end:])
+        self._emit_runs(p, self._inline_segments(line))
 
     def _is_table_line(self, line):
         """Check if a line is part of a markdown table"""
@@ -175,15 +186,21 @@ class MarkdownToDocxConverter:
         return '|' in line.strip() and line.strip() != '' and not line.strip().startswith('#')
 
     def _add_table(self, table_lines):
-        """Add a table to the document from markdown table lines"""
+        """Add a table to the document from markdown table lines
+
+        The rows are written as one block of XML in a single pass instead of
+        filling cells through table.cell(), which walks the whole grid on every
+        call. Columns get widths in proportion to their longest cell text, and
+        a first row followed by a separator line becomes a bold, shaded header
+        row that repeats at the top of each page.
+        """
         if not table_lines:
             return
 
+        has_header = len(table_lines) > 1 and bool(TABLE_SEPARATOR_PATTERN.match(table_lines[1]))
+
         # Filter out separator lines (lines with only |, -, :, and spaces)
-        data_lines = []
-        for line in table_lines:
-            if not re.match(r'^\s*\|?[\s\-:|\|]*\|?\s*$', line):
-                data_lines.append(line)
+        data_lines = [line for line in table_lines if not TABLE_SEPARATOR_PATTERN.match(line)]
 
         if not data_lines:
             return
@@ -206,49 +223,133 @@ class MarkdownToDocxConverter:
 
         # Determine table dimensions
         max_cols = max(len(row) for row in table_data)
-        rows = len(table_data)
+        column_widths = self._table_column_widths(table_data, max_cols)
 
-        # Create the table
-        table = self.doc.add_table(rows=rows, cols=max_cols)
+        # Create the empty table, then set its grid
+        table = self.doc.add_table(rows=0, cols=max_cols)
         table.style = 'Table Grid'  # Use a standard table style
+        table.autofit = False
+        for grid_col, width in zip(table._tbl.tblGrid.gridCol_lst, column_widths):
+            grid_col.w = width
 
-        # Fill the table
+        rows_xml = []
         for row_idx, row_data in enumerate(table_data):
-            for col_idx, cell_data in enumerate(row_data):
-                if col_idx < max_cols:
-                    cell = table.cell(row_idx, col_idx)
-                    # Handle bold formatting in cells
-                    self._add_formatted_text_to_cell(cell, cell_data)
+            is_header = has_header and row_idx == 0
+            cells_xml = [self._table_cell_xml(row_data[col_idx] if col_idx < len(row_data) else '',
+                                              column_widths[col_idx], is_header)
+                         for col_idx in range(max_cols)]
+            row_properties = '<w:trPr><w:tblHeader/></w:trPr>' if is_header else ''
+            rows_xml.append(f"<w:tr>{row_properties}{''.join(cells_xml)}</w:tr>")
+        table._tbl.extend(parse_xml(f"<w:tbl {nsdecls('w')}>{''.join(rows_xml)}</w:tbl>"))
 
         # Add some spacing after the table
         self.doc.add_paragraph()
 
-    def _add_formatted_text_to_cell(self, cell, text):
-        """Add formatted text to a table cell"""
-        # Clear existing content
-        cell.text = ''
-        paragraph = cell.paragraphs[0]
+    def _table_column_widths(self, table_data, max_cols):
+        """Split the text width between the columns by their longest cell text"""
+        section = self.doc.sections[-1]
+        try:
+            text_width = section.page_width - section.left_margin - section.right_margin
+        except TypeError:
+            text_width = Inches(6.5)
 
-        # Process inline formatting
+        weights = [TABLE_MIN_COLUMN_CHARS] * max_cols
+        for row_data in table_data:
+            for col_idx, cell_data in enumerate(row_data):
+                weights[col_idx] = min(max(weights[col_idx], len(cell_data)), TABLE_MAX_COLUMN_CHARS)
+        total = sum(weights)
+        return [Emu(text_width * weight // total) for weight in weights]
+
+    def _table_cell_xml(self, text, width, is_header):
+        """A w:tc holding text with bold and italic formatting only (all bold in a header row)"""
+        shading = f'<w:shd w:val="clear" w:color="auto" w:fill="{TABLE_HEADER_FILL}"/>' if is_header else ''
+        segments = [(content, marker if marker in BOLD_MARKERS + ITALIC_MARKERS else None)
+                    for content, marker in self._inline_segments(text)]
+        runs_xml = ''.join(self._run_xml(content, is_header or marker in BOLD_MARKERS, marker in ITALIC_MARKERS)
+                           for content, marker in self._run_pieces(segments))
+        return (f'<w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{width.twips}"/>{shading}</w:tcPr>'
+                f'<w:p>{runs_xml}</w:p></w:tc>')
+
+    @staticmethod
+    def _run_xml(content, bold, italic):
+        """A w:r for content, as paragraph.add_run would write it (tabs become w:tab)"""
+        properties = ('<w:b/>' if bold else '') + ('<w:i/>' if italic else '')
+        text_xml = '<w:tab/>'.join(f'<w:t xml:space="preserve">{escape(piece)}</w:t>' if piece else ''
+                                   for piece in content.split('\t'))
+        return f"<w:r>{f'<w:rPr>{properties}</w:rPr>' if properties else ''}{text_xml}</w:r>"
+
+    def _inline_segments(self, text):
+        """Split text into (content, marker) pieces by inline formatting; marker is None for plain text"""
+        segments = []
         last_end = 0
         for match in self.inline_pattern.finditer(text):
             start, end = match.span()
-            marker = match.group(1)
-            content = match.group(2)
-
-            # Add text before the match
             if start > last_end:
-                paragraph.add_run(text[last_end:start])
-
-            # Add formatted text
-            run = paragraph.add_run(content)
-            if marker in ['**', '__', '***', '___']:
-                run.bold = True
-            if marker in ['*', '_', '***', '___']:
-                run.italic = True
-
+                segments.append((text[last_end:start], None))
+            segments.append((match.group(2), match.group(1)))
             last_end = end
-
-        # Add remaining text
         if last_end < len(text):
-            paragraph.add_run(text[last_end:])
\ No newline at end of file
+            segments.append((text[last_end:], None))
+        return segments
+
+    def _emit_runs(self, paragraph, segments):
+        """Add (content, marker) segments to paragraph as formatted runs"""
+        for content, marker in self._run_pieces(segments):
+            self._add_run(paragraph, content, marker)
+
+    def _run_pieces(self, segments):
+        """The (content, marker) runs to emit for segments, after the colon and bold fixes
+
+        A space is inserted after a colon that sits between a word character and
+        the next character, also where the colon ends one segment; the space
+        stays in the segment holding the colon (so "**Name:**John" gives a bold
+        "Name: "). Text that still holds **bold** markers after inline parsing
+        is emitted as plain and bold runs split at those markers, dropping its
+        other inline formatting as word_formatter did.
+        """
+        full_text = ''.join(content for content, _ in segments)
+        # Offsets in full_text that get a space in front of them
+        space_offsets = [match.start(2) for match in COLON_SPACING_PATTERN.finditer(full_text)]
+
+        if '**' in full_text:
+            pieces = []
+            for part in BOLD_MARKER_PATTERN.split(COLON_SPACING_PATTERN.sub(r'\1: \2', full_text)):
+                if part.startswith('**') and part.endswith('**') and len(part) > 4:
+                    pieces.append((part[2:-2], '**'))
+                elif part:
+                    pieces.append((part, None))
+            return pieces
+
+        pieces = []
+        next_space = 0
+        segment_start = 0
+        for content, marker in segments:
+            segment_end = segment_start + len(content)
+            if next_space < len(space_offsets) and space_offsets[next_space] <= segment_end:
+                parts = []
+                last = 0
+                while next_space < len(space_offsets) and space_offsets[next_space] <= segment_end:
+                    offset = space_offsets[next_space] - segment_start
+                    parts.append(content[last:offset])
+                    last = offset
+                    next_space += 1
+                parts.append(content[last:])
+                content = ' '.join(parts)
+            segment_start = segment_end
+            if content:
+                pieces.append((content, marker))
+        return pieces
+
+    def _add_run(self, paragraph, content, marker):
+        """Add one run formatted for its inline marker"""
+        run = paragraph.add_run(content)
+        if marker in BOLD_MARKERS:
+            run.bold = True
+        if marker in ITALIC_MARKERS:
+            run.italic = True
+        if marker == '`':
+            font = run.font
+            font.name = 'Courier New'
+        if marker == '~~':
+            run.font.strike = True
+        return run
@@ -1,6 +1,28 @@
+import os
+
 bind = "0.0.0.0:5000"
 workers = 2
 threads = 2
 timeout = 60
 accesslog = "-"
 errorlog = "-"
+
+# Load the app and its read-only data once in the master and share it with the
+# workers copy-on-write (set GUNICORN_PRELOAD=0 to load it in every worker)
+preload_app = os.getenv("GUNICORN_PRELOAD", "1").strip().lower() in ("1", "true", "yes", "on")
+
+
+def pre_fork(server, worker):
+    """Freeze the preloaded app's objects so the workers' GC leaves their pages shared"""
+    if preload_app:
+        from services.startup import prepare_fork
+        from wsgi import app
+        prepare_fork(app.extensions['startup_report'])
+
+
+def post_fork(server, worker):
+    """Record when each worker started"""
+    if preload_app:
+        from services.startup import after_fork
+        from wsgi import app
+        after_fork(app.extensions['startup_report'])
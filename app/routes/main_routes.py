@@ -3,31 +3,99 @@ Main application routes
 """
 import os
 import signal
-from flask import Blueprint, render_template, request, url_for, send_from_directory, abort, jsonify
+import threading
+from flask import Blueprint, Response, current_app, make_response, render_template, request, url_for, send_from_directory, abort, jsonify
 from werkzeug.utils import secure_filename
 
 from services.proposal_service import ProposalService, DataService
+from services.job_service import JobService, JobQueueFullError
+from services.stream_processor import format_sse
+from services.startup import import_deferred_modules
 
 # Create blueprint
 main_bp = Blueprint('main', __name__)
 
 def init_services(app):
     """Initialize services with app config"""
-    global proposal_service, data_service
+    global proposal_service, data_service, job_service, stream_slots, stream_retry_after
     proposal_service = ProposalService(app.config)
     data_service = DataService(app.config)
+    job_service = JobService(app.config, name='proposal')
+    # Each stream holds a request thread until generation ends, so only a few may run at once
+    stream_slots = threading.BoundedSemaphore(max(1, app.config.get('PROPOSAL_STREAM_SLOTS', 1)))
+    stream_retry_after = app.config.get('JOB_RETRY_AFTER_SECONDS', 5)
+
+def get_warmers():
+    """Startup warmers for the deferred libraries and the services' read-only data, as (name, function) pairs"""
+    return [
+        ('libraries', import_deferred_modules),
+        ('templates', proposal_service.warm),
+        ('school_data', data_service.warm),
+        ('gemini_client', proposal_service.client_pool.warm),
+        ('pdf_converter', proposal_service.pdf_converter.warm),
+    ]
+
+def _extract_proposal_form():
+    """Extract proposal generation parameters from the submitted form"""
+    return {
+        'district': request.form.get('district'),
+        'rfp_type': request.form.get('rfp_type', 'Extended Learning Opportunities Program'),
+        'cost_proposal': request.form.get('cost_proposal'),
+        'num_weeks': request.form.get('num_weeks'),
+        'days_per_week': request.form.get('days_per_week'),
+        'selected_schools': request.form.getlist('schoolname'),
+        'total_students': request.form.get('total_students_display'),
+        'cost_per_student': request.form.get('cost_per_student_display'),
+        'hours_per_day': request.form.get('hours_per_day', '3'),
+        'daily_cost': request.form.get('daily_cost_for_ai'),
+        'weekly_cost': request.form.get('weekly_cost_for_ai'),
+        'cost_per_school': request.form.get('cost_per_school_for_ai'),
+        'selected_schools_list': request.form.get('selected_schools_list'),
+        'program_start_date': request.form.get('program_start_date'),
+        'bypass_cache': request.form.get('bypass_cache') == '1'
+    }
+
+def _validate_proposal_form(form_data):
+    """Return an error message for invalid proposal form data, or None"""
+    if not form_data['district']:
+        return "District is required"
+
+    if not form_data['selected_schools']:
+        return "At least one school must be selected"
+
+    return None
+
+def _build_proposal_data(form_data, proposal_text=None):
+    """Build the data dict rendered by proposal.html"""
+    return {
+        'district': form_data['district'],
+        'rfp_type': form_data['rfp_type'],
+        'cost_proposal': form_data['cost_proposal'],
+        'school_name': ", ".join(form_data['selected_schools']),
+        'proposal_text': proposal_text,
+        'filename': None,  # No document created yet
+        'num_weeks': form_data['num_weeks'],
+        'days_per_week': form_data['days_per_week'],
+        'hours_per_day': form_data['hours_per_day'],
+        'total_students': form_data['total_students'],
+        'cost_per_student': form_data['cost_per_student'],
+        'daily_cost': form_data['daily_cost'],
+        'weekly_cost': form_data['weekly_cost']
+    }
 
 @main_bp.route('/')
 def index():
     """Main page route"""
     try:
         districts = data_service.get_districts()
-        df = data_service.get_school_data()
-        all_data_json = df.to_json(orient='records')
-        
-        return render_template('index.html', 
-                             districts=districts, 
-                             all_data=all_data_json)
+
+        # School rows are fetched per district from /api/schools/<district>
+        response = make_response(render_template('index.html',
+                                                 districts=districts,
+                                                 streaming_enabled=proposal_service.config.get('PROPOSAL_STREAMING')))
+        response.headers['Cache-Control'] = 'no-cache'
+        response.add_etag()
+        return response.make_conditional(request)
     except Exception as e:
         print(f"Error in index route: {e}")
         return render_template('error.html', error="Failed to load data"), 500
@@ -36,50 +104,23 @@ def index():
 def generate_proposal():
     """Generate proposal route"""
     try:
-        # Extract form data
-        form_data = {
-            'district': request.form.get('district'),
-            'rfp_type': request.form.get('rfp_type', 'Extended Learning Opportunities Program'),
-            'cost_proposal': request.form.get('cost_proposal'),
-            'num_weeks': request.form.get('num_weeks'),
-            'days_per_week': request.form.get('days_per_week'),
-            'selected_schools': request.form.getlist('schoolname'),
-            'total_students': request.form.get('total_students_display'),
-            'cost_per_student': request.form.get('cost_per_student_display'),
-            'hours_per_day': request.form.get('hours_per_day', '3'),
-            'daily_cost': request.form.get('daily_cost_for_ai'),
-            'weekly_cost': request.form.get('weekly_cost_for_ai'),
-            'cost_per_school': request.form.get('cost_per_school_for_ai'),
-            'selected_schools_list': request.form.get('selected_schools_list'),
-            'program_start_date': request.form.get('program_start_date')
-        }
-        
-        # Validate required fields
-        if not form_data['district']:
-            return render_template('error.html', error="District is required"), 400
-            
-        if not form_data['selected_schools']:
-            return render_template('error.html', error="At least one school must be selected"), 400
+        # Extract and validate form data
+        form_data = _extract_proposal_form()
+        validation_error = _validate_proposal_form(form_data)
+        if validation_error:
+            return render_template('error.html', error=validation_error), 400
+
+        if request.form.get('stream') == '1':
+            # Render the page right away; it streams the text from /api/proposal-stream
+            return render_template('proposal.html',
+                                   data=_build_proposal_data(form_data, ''),
+                                   stream_form=list(request.form.items(multi=True)))
         
         # Generate proposal text only (user will edit and then generate document)
         proposal_text = proposal_service.generate_proposal_text_only(**form_data)
 
         # Prepare data for template
-        proposal_data = {
-            'district': form_data['district'],
-            'rfp_type': form_data['rfp_type'],
-            'cost_proposal': form_data['cost_proposal'],
-            'school_name': ", ".join(form_data['selected_schools']),
-            'proposal_text': proposal_text,
-            'filename': None,  # No document created yet
-            'num_weeks': form_data['num_weeks'],
-            'days_per_week': form_data['days_per_week'],
-            'hours_per_day': form_data['hours_per_day'],
-            'total_students': form_data['total_students'],
-            'cost_per_student': form_data['cost_per_student'],
-            'daily_cost': form_data['daily_cost'],
-            'weekly_cost': form_data['weekly_cost']
-        }
+        proposal_data = _build_proposal_data(form_data, proposal_text)
         
         return render_template('proposal.html', data=proposal_data)
         
@@ -87,6 +128,119 @@ def generate_proposal():
         print(f"Error in generate_proposal route: {e}")
         return render_template('error.html', error=f"Failed to generate proposal: {str(e)}"), 500
 
+@main_bp.route('/api/proposal-stream', methods=['POST'])
+def stream_proposal():
+    """Stream generated proposal text as server-sent events
+
+    At most PROPOSAL_STREAM_SLOTS streams run per worker; beyond that the
+    request gets a 429 with Retry-After, and the page falls back to a
+    background job.
+    """
+    form_data = _extract_proposal_form()
+    validation_error = _validate_proposal_form(form_data)
+    if validation_error:
+        return jsonify({'error': validation_error}), 400
+
+    if not stream_slots.acquire(blocking=False):
+        print("Rejecting proposal stream: every stream slot is taken")
+        response = jsonify({'error': 'The server is busy streaming other proposals. Please try again shortly.'})
+        response.headers['Retry-After'] = str(stream_retry_after)
+        return response, 429
+
+    cancel_event = threading.Event()
+
+    def generate_events():
+        try:
+            for text in proposal_service.stream_proposal_text(cancel_event=cancel_event, **form_data):
+                yield format_sse('chunk', {'text': text})
+            yield format_sse('done', {})
+        except Exception as e:
+            print(f"Error in stream_proposal route: {e}")
+            yield format_sse('error', {'error': f"Failed to generate proposal: {str(e)}"})
+        finally:
+            # Also runs when the server closes the stream after the client
+            # disconnects, so in-flight section calls and retries stop early
+            cancel_event.set()
+
+    response = Response(generate_events(), mimetype='text/event-stream')
+    # Runs when the server is done with the response, even if the stream never started
+    response.call_on_close(stream_slots.release)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # Tell nginx not to buffer the stream
+    return response
+
+@main_bp.route('/api/proposal-jobs', methods=['POST'])
+def submit_proposal_job():
+    """Queue proposal generation in the background and return the job id"""
+    try:
+        form_data = _extract_proposal_form()
+        validation_error = _validate_proposal_form(form_data)
+        if validation_error:
+            return jsonify({'error': validation_error}), 400
+
+        job = job_service.submit(
+            proposal_service.generate_proposal_text_only,
+            kwargs=dict(form_data, raise_errors=True),
+            meta=_build_proposal_data(form_data),
+            cancellable=True
+        )
+
+        return jsonify({
+            'job_id': job['id'],
+            'status': job['status'],
+            'status_url': url_for('main.get_proposal_job', job_id=job['id']),
+            'result_url': url_for('main.show_proposal_job_result', job_id=job['id']),
+            'cancel_url': url_for('main.cancel_proposal_job', job_id=job['id'])
+        }), 202
+
+    except JobQueueFullError as e:
+        print(f"Rejecting proposal job: {e}")
+        response = jsonify({'error': 'The server is busy generating other proposals. Please try again shortly.'})
+        response.headers['Retry-After'] = str(e.retry_after)
+        return response, 429
+
+    except Exception as e:
+        print(f"Error in submit_proposal_job route: {e}")
+        return jsonify({'error': f'Failed to queue proposal: {str(e)}'}), 500
+
+@main_bp.route('/api/proposal-jobs/<job_id>')
+def get_proposal_job(job_id):
+    """API endpoint to poll the status of a proposal job"""
+    job = job_service.get_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+
+    return jsonify(JobService.public_view(job))
+
+@main_bp.route('/api/proposal-jobs/<job_id>/cancel', methods=['POST'])
+def cancel_proposal_job(job_id):
+    """API endpoint to cancel a proposal job whose page was closed"""
+    job = job_service.cancel(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+
+    return jsonify(JobService.public_view(job)), 202
+
+@main_bp.route('/proposal-jobs/<job_id>')
+def show_proposal_job_result(job_id):
+    """Render the proposal page for a finished proposal job"""
+    job = job_service.get_job(job_id)
+    if job is None:
+        return render_template('error.html', error="Proposal job not found"), 404
+
+    if job['status'] == JobService.STATUS_CANCELLED:
+        return render_template('error.html', error="The proposal job was cancelled."), 410
+
+    if job['status'] == JobService.STATUS_FAILED:
+        return render_template('error.html', error=f"Failed to generate proposal: {job['error']}"), 500
+
+    if job['status'] != JobService.STATUS_DONE:
+        return render_template('error.html', error="The proposal is still being generated. Please check back shortly."), 202
+
+    proposal_data = dict(job['meta'])
+    proposal_data['proposal_text'] = job['result']
+    return render_template('proposal.html', data=proposal_data)
+
 @main_bp.route('/generate-document', methods=['POST'])
 def generate_document():
     """Generate document from edited proposal text"""
@@ -105,17 +259,18 @@ def generate_document():
         if not rfp_type:
             return jsonify({'error': 'RFP type is required'}), 400
 
-        # Generate filename and create document directly
+        # Save the DOCX now; its PDF renders in the background
         filename = proposal_service.create_document(proposal_text, district, rfp_type)
 
         if filename:
-            # Generate PDF filename
-            pdf_filename = filename.replace('.docx', '.pdf')
+            pdf_status = proposal_service.pdf_status(filename)
             return jsonify({
                 'success': True,
                 'filename': filename,
-                'pdf_filename': pdf_filename,
-                'message': 'Document and PDF generated successfully'
+                'pdf_filename': pdf_status['filename'],
+                'pdf_status': pdf_status['status'],
+                'pdf_status_url': url_for('main.get_document_pdf_status', filename=filename),
+                'message': 'Document generated successfully; the PDF is being rendered'
             })
         else:
             return jsonify({'error': 'Failed to create document'}), 500
@@ -124,6 +279,17 @@ def generate_document():
         print(f"Error in generate_document route: {e}")
         return jsonify({'error': f'Failed to generate document: {str(e)}'}), 500
 
+@main_bp.route('/api/documents/<filename>/pdf')
+def get_document_pdf_status(filename):
+    """API endpoint reporting whether a document's PDF is pending, ready or failed"""
+    status = proposal_service.pdf_status(secure_filename(filename))
+    if status is None:
+        return jsonify({'error': 'Document not found'}), 404
+
+    if status['status'] == 'ready':
+        status['download_url'] = url_for('main.download_file', filename=status['filename'])
+    return jsonify(status)
+
 
 @main_bp.route('/download/<path:filename>')
 def download_file(filename):
@@ -224,17 +390,79 @@ def get_proposal_history():
         print(f"Error in get_proposal_history route: {e}")
         return jsonify({'error': 'Failed to fetch proposal history'}), 500
 
+@main_bp.route('/api/schools')
+def get_all_schools():
+    """API endpoint to get every school (precomputed, compressed and ETagged per dataset version)"""
+    try:
+        return data_service.get_dataset().all_schools_payload().response(request)
+    except Exception as e:
+        print(f"Error in get_all_schools route: {e}")
+        return jsonify({'error': 'Failed to fetch schools'}), 500
+
+@main_bp.route('/api/schools/search')
+def search_schools():
+    """API endpoint to filter schools, one page at a time
+
+    Query parameters: district, school_type, frpm_min, frpm_max,
+    expanded_learning, after_school (yes/no), q (name contains), page, per_page.
+    """
+    from services.school_dataset import DEFAULT_PAGE_SIZE, PROGRAM_FLAG_COLUMNS
+
+    try:
+        args = request.args
+        flags = {}
+        for flag in PROGRAM_FLAG_COLUMNS:
+            value = args.get(flag, '').strip().lower()
+            if value:
+                if value not in ('yes', 'no', 'true', 'false', '1', '0'):
+                    return jsonify({'error': f"{flag} must be yes or no"}), 400
+                flags[flag] = value in ('yes', 'true', '1')
+
+        result = data_service.get_dataset().search(
+            district=args.get('district') or None,
+            school_type=args.get('school_type') or None,
+            frpm_min=args.get('frpm_min', type=float),
+            frpm_max=args.get('frpm_max', type=float),
+            flags=flags,
+            name=args.get('q') or None,
+            page=args.get('page', 1, type=int),
+            per_page=args.get('per_page', DEFAULT_PAGE_SIZE, type=int)
+        )
+        return jsonify(result)
+    except Exception as e:
+        print(f"Error in search_schools route: {e}")
+        return jsonify({'error': 'Failed to search schools'}), 500
+
 @main_bp.route('/api/schools/<district>')
 def get_schools_by_district(district):
-    """API endpoint to get schools by district"""
+    """API endpoint to get schools by district (precomputed, compressed and ETagged per dataset version)"""
     try:
-        df = data_service.get_school_data()
-        schools = df[df['District Name'] == district].to_dict('records')
-        return jsonify(schools)
+        return data_service.get_dataset().district_payload(district).response(request)
     except Exception as e:
         print(f"Error in get_schools_by_district route: {e}")
         return jsonify({'error': 'Failed to fetch schools'}), 500
 
+@main_bp.route('/api/budget/scenarios', methods=['POST'])
+def budget_scenarios():
+    """API endpoint to compute costs and budget splits for a grid of pricing scenarios
+
+    JSON body: schools, weeks, days_per_week, hours_per_day, students_per_day and one
+    of cost_per_student or total_cost, each a number, a list or a {min, max, step} range.
+    Returns {"columns": [...], "data": [[...], ...]} with one row per combination.
+    """
+    from services.budget_scenarios import scenarios_json
+
+    try:
+        inputs = request.get_json(silent=True)
+        if not isinstance(inputs, dict):
+            return jsonify({'error': 'A JSON object of scenario inputs is required'}), 400
+        return Response(scenarios_json(inputs), mimetype='application/json')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"Error in budget_scenarios route: {e}")
+        return jsonify({'error': 'Failed to calculate budget scenarios'}), 500
+
 @main_bp.route('/api/proposal-delete', methods=['DELETE'])
 def delete_proposal():
     """API endpoint to delete a proposal file"""
@@ -320,6 +548,50 @@ def stop_server():
     except Exception as e:
         return jsonify({"success": False, "message": f"Error stopping server: {e}"}), 500
 
+@main_bp.route('/api/llm-cache/stats')
+def get_llm_cache_stats():
+    """API endpoint reporting LLM response cache and request coalescing counters"""
+    stats = proposal_service.response_cache.get_stats()
+    if proposal_service.single_flight is not None:
+        stats['single_flight'] = proposal_service.single_flight.get_stats()
+    return jsonify(stats)
+
+@main_bp.route('/api/templates/stats')
+def get_template_stats():
+    """API endpoint reporting template file load, reload and hit counts for this worker"""
+    return jsonify(proposal_service.templates.get_stats())
+
+@main_bp.route('/api/pipeline/stats')
+def get_pipeline_stats():
+    """API endpoint reporting per-stage proposal pipeline timings for this worker"""
+    return jsonify(proposal_service.pipeline_stats.get_stats())
+
+@main_bp.route('/api/pdf/stats')
+def get_pdf_converter_stats():
+    """API endpoint reporting LibreOffice PDF converter pool usage for this worker"""
+    stats = proposal_service.pdf_converter.get_stats()
+    stats['jobs'] = proposal_service.pdf_jobs.get_stats()
+    return jsonify(stats)
+
+@main_bp.route('/api/gemini/keys')
+def get_gemini_key_utilization():
+    """API endpoint reporting per-key Gemini rate limit utilization for this worker"""
+    utilization = proposal_service.key_scheduler.get_utilization()
+    utilization['pid'] = os.getpid()
+    utilization['pool'] = proposal_service.client_pool.get_stats()
+    utilization['requests'] = proposal_service.request_stats.get_stats()
+    return jsonify(utilization)
+
+@main_bp.route('/api/jobs/stats')
+def get_job_stats():
+    """API endpoint reporting background job queue occupancy for this worker"""
+    return jsonify(job_service.get_stats())
+
+@main_bp.route('/api/startup')
+def get_startup_report():
+    """API endpoint reporting startup phase timings and memory use for this worker"""
+    return jsonify(current_app.extensions['startup_report'].get_report())
+
 @main_bp.route("/healthz")
 def health_check():
     """Health check endpoint"""
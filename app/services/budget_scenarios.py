@@ -0,0 +1,155 @@
+"""
+Budget Scenarios Module
+
+Computes program cost figures for a whole grid of pricing scenarios at once.
+Each input (number of schools, weeks, days per week, hours per day, students
+per day and either the cost per student per day or the total cost) may be a
+single value, a list or a {min, max, step} range; every combination becomes
+one scenario row. All derived figures and the budget category split are
+NumPy array operations over the grid, so a table of thousands of scenarios is
+built in milliseconds. The formulas are the ones the proposal form uses.
+"""
+import numpy as np
+import pandas as pd
+
+
+# Share of the total cost given to each budget category (also used for YAML+Jinja budgets)
+BUDGET_CATEGORY_SPLIT = {
+    'staffing': 0.6,
+    'instructional_materials': 0.1,
+    'program_supplies': 0.1,
+    'supervision': 0.1,
+    'professional_development': 0.05,
+    'transportation': 0.025,
+    'admin_costs': 0.025,
+}
+
+# Grid inputs in the order they vary (the last one varies fastest)
+AXES = ('schools', 'weeks', 'days_per_week', 'hours_per_day', 'students_per_day', 'cost_per_student', 'total_cost')
+# Exactly one of these sets the price of each scenario
+PRICE_AXES = ('cost_per_student', 'total_cost')
+# Used when an input is not given, matching the form's defaults
+AXIS_DEFAULTS = {'schools': 1, 'weeks': 1, 'days_per_week': 5, 'hours_per_day': 3, 'students_per_day': 0}
+
+MAX_SCENARIOS = 100_000
+MAX_AXIS_VALUES = 1_000
+
+
+def budget_categories(total_cost):
+    """Split one total cost across BUDGET_CATEGORY_SPLIT"""
+    return {category: total_cost * share for category, share in BUDGET_CATEGORY_SPLIT.items()}
+
+
+def axis_values(name, spec):
+    """Values of one grid input as a float array
+
+    Args:
+        name (str): Input name, for error messages
+        spec: A number, a list of numbers or a {'min', 'max', 'step'} dict (max inclusive)
+    """
+    try:
+        if isinstance(spec, dict):
+            start, stop = float(spec['min']), float(spec['max'])
+            step = float(spec.get('step', 1))
+            if step <= 0 or stop < start:
+                raise ValueError
+            count = int(np.floor((stop - start) / step + 1e-9)) + 1
+            if count > MAX_AXIS_VALUES:
+                raise OverflowError
+            values = start + step * np.arange(count)
+        else:
+            values = np.atleast_1d(np.asarray(spec, dtype='float64'))
+    except OverflowError:
+        raise ValueError(f"'{name}' has more than {MAX_AXIS_VALUES} values")
+    except (KeyError, TypeError, ValueError):
+        raise ValueError(f"'{name}' must be a number, a list of numbers or a {{min, max, step}} range")
+
+    if values.ndim != 1 or len(values) == 0 or len(values) > MAX_AXIS_VALUES:
+        raise ValueError(f"'{name}' must have between 1 and {MAX_AXIS_VALUES} values")
+    if not np.isfinite(values).all() or (values < 0).any():
+        raise ValueError(f"'{name}' values must be non-negative numbers")
+    return values
+
+
+def scenario_grid(inputs):
+    """Every combination of the given inputs as a dict of equal-length arrays
+
+    Raises:
+        ValueError: For unknown or invalid inputs, a missing or doubled price, or too many scenarios
+    """
+    unknown = set(inputs) - set(AXES)
+    if unknown:
+        raise ValueError(f"Unknown scenario inputs: {', '.join(sorted(unknown))}")
+    prices = [name for name in PRICE_AXES if inputs.get(name) is not None]
+    if len(prices) != 1:
+        raise ValueError("Give exactly one of 'cost_per_student' or 'total_cost'")
+
+    axes = {}
+    for name in AXES:
+        if inputs.get(name) is not None:
+            axes[name] = axis_values(name, inputs[name])
+        elif name in AXIS_DEFAULTS:
+            axes[name] = np.array([float(AXIS_DEFAULTS[name])])
+
+    count = int(np.prod([len(values) for values in axes.values()]))
+    if count > MAX_SCENARIOS:
+        raise ValueError(f"{count} scenarios requested; at most {MAX_SCENARIOS} are allowed")
+
+    grids = np.meshgrid(*axes.values(), indexing='ij')
+    return {name: grid.ravel() for name, grid in zip(axes, grids)}
+
+
+def calculate_scenarios(inputs):
+    """Cost table for every scenario in the grid described by inputs
+
+    Returns a DataFrame with one row per scenario: the inputs, the derived
+    costs (the cost per student or total cost that was not given, cost per
+    hour, daily, weekly and per-school cost, program hours and cost per
+    program hour) and one column per budget category. Figures that divide by
+    zero (e.g. cost per student with no students) are NaN.
+    """
+    grid = scenario_grid(inputs)
+    schools, weeks = grid['schools'], grid['weeks']
+    days, hours, students = grid['days_per_week'], grid['hours_per_day'], grid['students_per_day']
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if 'cost_per_student' in grid:
+            cost_per_student = grid['cost_per_student']
+            daily_cost = students * cost_per_student
+            weekly_cost = daily_cost * days
+            total_cost = weekly_cost * weeks
+        else:
+            total_cost = grid['total_cost']
+            weekly_cost = total_cost / weeks
+            daily_cost = weekly_cost / days
+            cost_per_student = daily_cost / students
+
+        program_hours = weeks * days * hours
+        columns = {
+            'schools': schools,
+            'weeks': weeks,
+            'days_per_week': days,
+            'hours_per_day': hours,
+            'students_per_day': students,
+            'cost_per_student': cost_per_student,
+            'total_cost': total_cost,
+            'cost_per_hour': cost_per_student / hours,
+            'daily_cost': daily_cost,
+            'weekly_cost': weekly_cost,
+            # The form shows no per-school cost until a school is selected
+            'cost_per_school': np.where(schools > 0, total_cost / schools, 0.0),
+            'program_hours': program_hours,
+            'cost_per_program_hour': total_cost / program_hours,
+        }
+
+    shares = np.fromiter(BUDGET_CATEGORY_SPLIT.values(), dtype='float64')
+    categories = np.multiply.outer(total_cost, shares)
+    for index, category in enumerate(BUDGET_CATEGORY_SPLIT):
+        columns[category] = categories[:, index]
+
+    return pd.DataFrame({name: np.where(np.isfinite(values), values, np.nan) for name, values in columns.items()})
+
+
+def scenarios_json(inputs, decimals=2):
+    """calculate_scenarios as a compact JSON table: {"columns": [...], "data": [[...], ...]}"""
+    return calculate_scenarios(inputs).to_json(orient='split', index=False, double_precision=decimals)
@@ -0,0 +1,70 @@
+"""
+Local Fake LLM Module
+
+Stands in for the Gemini model when USE_FAKE_LLM is enabled, so the job queue
+and the rest of the generation path can be exercised without API keys or quota.
+"""
+import hashlib
+import re
+import time
+
+
+TEMPLATE_START_MARKER = "TEMPLATE TO COMPLETE (MAINTAIN EXACT FORMAT):"
+TEMPLATE_END_MARKER = "CRITICAL FORMATTING REQUIREMENTS:"
+
+
+class FakeResponse:
+    """Mimics the response object returned by GenerativeModel.generate_content"""
+
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeGenerativeModel:
+    """Mimics the subset of genai.GenerativeModel used by ProposalService"""
+
+    def __init__(self, model_name, latency_seconds=0.0):
+        self.model_name = model_name
+        self.latency_seconds = latency_seconds
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        """Return a deterministic proposal after the configured latency"""
+        text = self.compose_text(prompt)
+        if stream:
+            return self._stream_chunks(text)
+
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        return FakeResponse(text)
+
+    def _stream_chunks(self, text, chunk_size=64):
+        """Yield the answer in small pieces, spreading the latency across them"""
+        pieces = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)] or ['']
+        delay = self.latency_seconds / len(pieces)
+
+        for piece in pieces:
+            if delay:
+                time.sleep(delay)
+            yield FakeResponse(piece)
+
+    def compose_text(self, prompt):
+        """Build a deterministic answer for the prompt"""
+        digest = hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:12]
+
+        # YAML+Jinja prompts embed the template to complete: echo it back with
+        # every TBD placeholder filled in, like the real model is asked to do
+        if TEMPLATE_START_MARKER in prompt:
+            template = prompt.split(TEMPLATE_START_MARKER, 1)[1]
+            template = template.split(TEMPLATE_END_MARKER, 1)[0].strip()
+            return re.sub(r'\bTBD\b', f"Sample content ({digest})", template)
+
+        return (
+            "# Program Proposal\n\n"
+            "## Executive Summary\n"
+            f"This is placeholder proposal text generated by the local fake LLM (prompt {digest}).\n\n"
+            "## Program Design\n"
+            "- Music integration sessions\n"
+            "- S.T.E.A.M. activities\n\n"
+            "**Company Name:** ______________\n"
+            "**Date:** ______________\n"
+        )
@@ -0,0 +1,153 @@
+"""
+Form Field Rewriter Module
+
+Fills the underscored company fields of a generated proposal and restores the
+signature lines, in one line-oriented pass with precompiled patterns.
+
+Every rule except the two multi-line signature blocks (``I, Name, Title`` over
+``(Name) (Title)`` and ``Of Company hereby certify:`` over ``(Company Name)``)
+matches within a single line and starts with a ``**Label:** `` marker. One
+precompiled scan finds the lines carrying a marker, and only those lines go
+through the rules, each rule's regex running only when its marker is on the
+line. The rules apply in the original order, so the output is identical to
+running them one after another over the whole text.
+"""
+import re
+
+
+# Underscored form fields filled with company data, in the order they are applied
+FORM_FIELD_LABELS = (
+    'Company Name',
+    'Authorized Representative Name',
+    'Title',
+    'Email',
+    'Phone',
+    'Address',
+    'Authorized Signature',
+    'Date',
+)
+
+FORM_FIELD_PATTERN = re.compile(
+    r'\*\*(' + '|'.join(re.escape(label) for label in FORM_FIELD_LABELS) + r'):\*\* _{10,}'
+)
+FORM_FIELD_PATTERNS = {
+    label: re.compile(r'\*\*' + re.escape(label) + r':\*\* _{10,}') for label in FORM_FIELD_LABELS
+}
+
+# "**Label:** " markers that every single-line rule starts with
+RULE_MARKER_PATTERN = re.compile(
+    r'\*\*(?:' + '|'.join(re.escape(label) for label in FORM_FIELD_LABELS + (
+        'Signature', 'Authorized Signature (Disclosee)', 'Initial Here'
+    )) + r'):\*\* '
+)
+
+# Signature blocks spanning two lines: (marker, pattern, replacement)
+SIGNATURE_BLOCK_RULES = (
+    # "I, Name, Title" -> "I, Name _________________________, Title _______________________"
+    ('\n(Name)',
+     re.compile(r'I, ([^,]+), ([^\n]+)\n\(Name\)\s+\(Title\)'),
+     r'I, \1 _________________________, \2 _______________________  \n(Name)                                   (Title)'),
+
+    # "Of Company Name hereby certify:" -> "Of Company Name ________________________________ hereby certify:"
+    ('\n(Company Name)',
+     re.compile(r'Of ([^\n]+) hereby certify:\n\(Company Name\)'),
+     r'Of \1 ______________________________________ hereby certify:  \n(Company Name)'),
+)
+
+# Single-line signature rules: (marker, pattern, replacement)
+SIGNATURE_LINE_RULES = (
+    # "**Signature:** Name" -> "**Signature:** ____________________________"
+    ('**Signature:** ',
+     re.compile(r'\*\*Signature:\*\* ([^\n]+)'),
+     r'**Signature:** ____________________________'),
+
+    # "**Authorized Signature (Disclosee):** Name" -> "**Authorized Signature (Disclosee):** ____________________________"
+    ('**Authorized Signature (Disclosee):** ',
+     re.compile(r'\*\*Authorized Signature \(Disclosee\):\*\* ([^\n]+)'),
+     r'**Authorized Signature (Disclosee):** ____________________________'),
+
+    # "**Date:** date" -> "**Date:** _____________"
+    ('**Date:** ',
+     re.compile(r'\*\*Date:\*\* [0-9]{4}-[0-9]{2}-[0-9]{2}'),
+     r'**Date:** _____________'),
+    ('**Date:** ',
+     re.compile(r'\*\*Date:\*\* [^\n]+\d{4}'),
+     r'**Date:** _____________'),
+
+    # "**Initial Here:** letters" -> "**Initial Here:** ____"
+    ('**Initial Here:** ',
+     re.compile(r'\*\*Initial Here:\*\* ([A-Z]+)'),
+     r'**Initial Here:** ____'),
+)
+
+
+def rewrite_form_fields(text, field_values):
+    """Fill form fields and restore signature lines
+
+    Args:
+        text (str): Generated proposal text
+        field_values (dict): FORM_FIELD_LABELS label to the value written after
+            "**Label:** " (backslashes are re.sub escapes, as in the original rules)
+    """
+    replacements = {label: f"**{label}:** {field_values[label]}" for label in FORM_FIELD_LABELS}
+
+    if any(char in str(value) for value in field_values.values() for char in '*\n\\'):
+        # A value could create a match for a later rule or holds re.sub escapes;
+        # keep strict rule order and re.sub's replacement handling
+        return _rewrite_sequential(text, replacements)
+
+    def fill_fields(line):
+        # Without backslashes the replacements are plain literals
+        return FORM_FIELD_PATTERN.sub(lambda match: replacements[match.group(1)], line)
+
+    # Field values contain no newlines, so filling fields never adds or removes
+    # the markers of the two-line signature blocks
+    if not any(marker in text for marker, _, _ in SIGNATURE_BLOCK_RULES):
+        return _rewrite_marked_lines(text, lambda line: _apply_line_rules(fill_fields(line)))
+
+    text = _rewrite_marked_lines(text, fill_fields)
+    for marker, pattern, replacement in SIGNATURE_BLOCK_RULES:
+        if marker in text:
+            text = pattern.sub(replacement, text)
+    return _rewrite_marked_lines(text, _apply_line_rules)
+
+
+def _rewrite_marked_lines(text, rewrite_line):
+    """Return text with rewrite_line applied to every line that carries a rule marker"""
+    pieces = []
+    position = 0
+
+    for match in RULE_MARKER_PATTERN.finditer(text):
+        if match.start() < position:
+            continue  # Another marker on a line already rewritten
+
+        line_start = text.rfind('\n', 0, match.start()) + 1
+        line_end = text.find('\n', match.end())
+        if line_end < 0:
+            line_end = len(text)
+
+        pieces.append(text[position:line_start])
+        pieces.append(rewrite_line(text[line_start:line_end]))
+        position = line_end
+
+    if not pieces:
+        return text
+    pieces.append(text[position:])
+    return ''.join(pieces)
+
+
+def _apply_line_rules(line):
+    """Apply the single-line signature rules in order to one line"""
+    for marker, pattern, replacement in SIGNATURE_LINE_RULES:
+        if marker in line:
+            line = pattern.sub(replacement, line)
+    return line
+
+
+def _rewrite_sequential(text, replacements):
+    """Apply every rule over the whole text one after another"""
+    for label in FORM_FIELD_LABELS:
+        text = FORM_FIELD_PATTERNS[label].sub(replacements[label], text)
+    for _, pattern, replacement in SIGNATURE_BLOCK_RULES + SIGNATURE_LINE_RULES:
+        text = pattern.sub(replacement, text)
+    return text
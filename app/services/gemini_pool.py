@@ -0,0 +1,170 @@
+"""
+Gemini Client Pool Module
+
+Keeps long-lived Gemini clients and GenerativeModel objects bound to each API
+key instead of switching the process-global genai.configure key. Each key gets
+its own client (and so its own keep-alive connection), which every model from
+that key shares. Models are checked out per request, so concurrent threads
+never see another thread's key.
+
+Binding a key to a model goes through google.generativeai internals
+(client._ClientManager and GenerativeModel._client), so the pool refuses to
+start with an SDK release other than SUPPORTED_GENAI_VERSION and checks the
+internals exist when the SDK is first imported.
+"""
+import os
+import threading
+from contextlib import contextmanager
+from importlib import metadata
+from queue import LifoQueue, Empty
+
+from services.fake_llm import FakeGenerativeModel
+
+# google-generativeai release (major, minor) whose internals the pool relies on
+SUPPORTED_GENAI_VERSION = (0, 8)
+
+
+def check_genai_version():
+    """Raise RuntimeError unless the installed google-generativeai is a SUPPORTED_GENAI_VERSION release"""
+    try:
+        version = metadata.version('google-generativeai')
+    except metadata.PackageNotFoundError:
+        raise RuntimeError("google-generativeai is not installed (set USE_FAKE_LLM=1 to run without it)")
+    if tuple(int(part) for part in version.split('.')[:2] if part.isdigit()) != SUPPORTED_GENAI_VERSION:
+        raise RuntimeError(
+            f"google-generativeai {version} is not supported: GeminiClientPool binds API keys through "
+            f"internals of the {'.'.join(map(str, SUPPORTED_GENAI_VERSION))}.x releases; "
+            f"install the version pinned in requirements.txt"
+        )
+
+
+def check_genai_internals():
+    """Raise RuntimeError unless the SDK internals used to bind a key to a model exist"""
+    import google.generativeai as genai
+    from google.generativeai import client as genai_client
+
+    if not hasattr(genai_client, '_ClientManager'):
+        raise RuntimeError("google.generativeai.client._ClientManager is missing; "
+                           "GeminiClientPool needs the google-generativeai version pinned in requirements.txt")
+    if not hasattr(genai.GenerativeModel('probe'), '_client'):
+        raise RuntimeError("google.generativeai.GenerativeModel has no _client attribute; "
+                           "GeminiClientPool needs the google-generativeai version pinned in requirements.txt")
+
+
+class GeminiClientPool:
+    """Thread-safe pool of GenerativeModel objects per API key"""
+
+    def __init__(self, model_name, api_keys, max_idle_per_key=8, use_fake=False, fake_latency_seconds=0.0):
+        """
+        Args:
+            model_name (str): Gemini model to create
+            api_keys (dict): Key name (e.g. 'primary') to API key
+            max_idle_per_key (int): Idle models kept per key between requests
+            use_fake (bool): Hand out the local fake model instead of Gemini
+        """
+        self.model_name = model_name
+        self.api_keys = dict(api_keys)
+        self.max_idle_per_key = max(1, int(max_idle_per_key))
+        self.use_fake = use_fake
+        self.fake_latency_seconds = fake_latency_seconds
+        if not use_fake:
+            check_genai_version()
+
+        self._lock = threading.Lock()
+        self._internals_checked = False
+        self._reset_state()
+
+    def _reset_state(self):
+        """Drop clients and models (they must not be shared across a fork)"""
+        self._pid = os.getpid()
+        self._clients = {}
+        self._idle = {key_name: LifoQueue() for key_name in self.api_keys}
+        self._created = {key_name: 0 for key_name in self.api_keys}
+        self._in_use = {key_name: 0 for key_name in self.api_keys}
+
+    @property
+    def key_names(self):
+        return list(self.api_keys)
+
+    @contextmanager
+    def checkout(self, key_name):
+        """Borrow a model bound to the named key for the duration of a call"""
+        if key_name not in self.api_keys:
+            raise KeyError(f"Unknown Gemini API key name: {key_name}")
+
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset_state()
+            idle = self._idle[key_name]
+            self._in_use[key_name] += 1
+
+        try:
+            model = idle.get_nowait()
+        except Empty:
+            model = self._create_model(key_name)
+
+        try:
+            yield model
+        finally:
+            with self._lock:
+                self._in_use[key_name] -= 1
+                keep = idle is self._idle[key_name] and idle.qsize() < self.max_idle_per_key
+            if keep:
+                idle.put(model)
+
+    def get_stats(self):
+        """Per-key counts of created, idle and in-use models"""
+        with self._lock:
+            return {
+                key_name: {
+                    'created': self._created[key_name],
+                    'idle': self._idle[key_name].qsize(),
+                    'in_use': self._in_use[key_name],
+                }
+                for key_name in self.api_keys
+            }
+
+    def warm(self):
+        """Import the Gemini client library ahead of the first call
+
+        Only modules are loaded; clients and their connections are still
+        created per process, after any fork.
+        """
+        if self.use_fake:
+            return
+        self._check_internals()
+
+    def _check_internals(self):
+        """Check the SDK internals once per pool, importing the SDK"""
+        if not self._internals_checked:
+            check_genai_internals()
+            self._internals_checked = True
+
+    def _create_model(self, key_name):
+        """Create a model bound to the named key's long-lived client"""
+        with self._lock:
+            self._created[key_name] += 1
+
+        if self.use_fake:
+            return FakeGenerativeModel(self.model_name, self.fake_latency_seconds)
+
+        import google.generativeai as genai
+        self._check_internals()
+        model = genai.GenerativeModel(self.model_name)
+        model._client = self._get_client(key_name)
+        return model
+
+    def _get_client(self, key_name):
+        """Return the named key's generative client, creating it once per process"""
+        with self._lock:
+            client = self._clients.get(key_name)
+            if client is None:
+                from google.generativeai import client as genai_client
+
+                # A private client manager configures this key without touching
+                # the process-wide default used by genai.configure
+                manager = genai_client._ClientManager()
+                manager.configure(api_key=self.api_keys[key_name])
+                client = manager.get_default_client('generative')
+                self._clients[key_name] = client
+            return client
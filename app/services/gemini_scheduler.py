@@ -0,0 +1,215 @@
+"""
+Gemini Key Scheduler Module
+
+Tracks requests per minute and tokens per minute for every configured Gemini
+API key with token buckets, and routes each call to the key with the most
+weighted headroom. When every key is saturated, callers wait briefly for
+capacity instead of failing. Keys that return quota or authentication errors
+are rested for a cooldown period.
+
+Limits are enforced per process, so with several gunicorn workers set them
+to each key's quota divided by the number of workers.
+"""
+import threading
+import time
+from collections import deque
+
+
+USAGE_WINDOW_SECONDS = 60
+
+
+class GeminiCapacityError(Exception):
+    """Raised when no API key frees up capacity within the queue timeout"""
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously up to its capacity"""
+
+    def __init__(self, capacity, refill_per_second, now):
+        self.capacity = float(capacity)
+        self.refill_per_second = float(refill_per_second)
+        self.tokens = float(capacity)
+        self.updated_at = now
+
+    def refill(self, now):
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_per_second)
+            self.updated_at = now
+
+    def seconds_until(self, amount):
+        """Seconds until the bucket holds amount (after refill())"""
+        missing = amount - self.tokens
+        if missing <= 0:
+            return 0.0
+        if self.refill_per_second <= 0:
+            return float('inf')
+        return missing / self.refill_per_second
+
+
+class KeyState:
+    """Buckets, cooldown and usage history of one API key"""
+
+    def __init__(self, name, weight, rpm_limit, tpm_limit, now):
+        self.name = name
+        self.weight = weight
+        self.requests = TokenBucket(rpm_limit, rpm_limit / 60.0, now)
+        self.tokens = TokenBucket(tpm_limit, tpm_limit / 60.0, now)
+        self.cooldown_until = 0.0
+        self.usage = deque()  # (timestamp, tokens) within the usage window
+        self.total_requests = 0
+        self.total_errors = 0
+
+    def headroom(self):
+        """Weighted fraction of capacity left in the tighter of the two buckets"""
+        return self.weight * min(self.requests.tokens / self.requests.capacity,
+                                 self.tokens.tokens / self.tokens.capacity)
+
+
+class GeminiKeyScheduler:
+    """Rate-limits and load-balances calls across any number of API keys"""
+
+    def __init__(self, key_names, rpm_limit, tpm_limit, weights=None, queue_timeout=20.0,
+                 quota_cooldown=60.0, auth_cooldown=3600.0):
+        now = time.monotonic()
+        weights = weights or {}
+        self.rpm_limit = max(1, int(rpm_limit))
+        self.tpm_limit = max(1, int(tpm_limit))
+        self.queue_timeout = queue_timeout
+        self.cooldowns = {'quota': quota_cooldown, 'auth': auth_cooldown}
+
+        self._keys = {
+            name: KeyState(name, max(0.01, float(weights.get(name, 1.0))), self.rpm_limit, self.tpm_limit, now)
+            for name in key_names
+        }
+        self._condition = threading.Condition()
+        self.throttled_waits = 0
+
+    @staticmethod
+    def estimate_tokens(prompt):
+        """Rough token estimate for a prompt (about four characters per token)"""
+        return max(1, len(prompt) // 4)
+
+    def acquire(self, estimated_tokens, exclude=(), timeout=None):
+        """Reserve capacity on the best key and return its name
+
+        Blocks up to queue_timeout (or timeout, if shorter) while every
+        candidate key is saturated. Raises GeminiCapacityError if none frees
+        up in time.
+        """
+        candidates = [state for name, state in self._keys.items() if name not in exclude]
+        if not candidates:
+            raise GeminiCapacityError("No Gemini API keys left to try")
+
+        wait_limit = self.queue_timeout if timeout is None else min(timeout, self.queue_timeout)
+        deadline = time.monotonic() + wait_limit
+        waited = False
+
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                best, wait_seconds = None, float('inf')
+
+                for state in candidates:
+                    state.requests.refill(now)
+                    state.tokens.refill(now)
+                    tokens_needed = min(estimated_tokens, state.tokens.capacity)
+
+                    key_wait = max(
+                        state.cooldown_until - now,
+                        state.requests.seconds_until(1),
+                        state.tokens.seconds_until(tokens_needed)
+                    )
+                    if key_wait <= 0:
+                        if best is None or state.headroom() > best.headroom():
+                            best = state
+                    else:
+                        wait_seconds = min(wait_seconds, key_wait)
+
+                if best is not None:
+                    tokens_needed = min(estimated_tokens, best.tokens.capacity)
+                    best.requests.tokens -= 1
+                    best.tokens.tokens -= tokens_needed
+                    best.total_requests += 1
+                    best.usage.append((now, tokens_needed))
+                    return best.name
+
+                remaining = deadline - now
+                if remaining <= 0:
+                    raise GeminiCapacityError(
+                        f"All Gemini API keys are at their rate limits (waited {wait_limit:.0f}s)"
+                    )
+
+                if not waited:
+                    self.throttled_waits += 1
+                    waited = True
+                self._condition.wait(min(wait_seconds, remaining))
+
+    def release(self, key_name, estimated_tokens):
+        """Refund the capacity acquire() reserved for a call that was never sent"""
+        with self._condition:
+            state = self._keys[key_name]
+            now = time.monotonic()
+            state.requests.refill(now)
+            state.tokens.refill(now)
+            tokens_reserved = min(estimated_tokens, state.tokens.capacity)
+            state.requests.tokens = min(state.requests.capacity, state.requests.tokens + 1)
+            state.tokens.tokens = min(state.tokens.capacity, state.tokens.tokens + tokens_reserved)
+            state.total_requests -= 1
+            for index in range(len(state.usage) - 1, -1, -1):
+                if state.usage[index][1] == tokens_reserved:
+                    del state.usage[index]
+                    break
+            self._condition.notify_all()
+
+    def record_usage(self, key_name, estimated_tokens, actual_tokens):
+        """Correct a key's token bucket once the real token count is known"""
+        if actual_tokens is None:
+            return
+
+        with self._condition:
+            state = self._keys[key_name]
+            estimated_tokens = min(estimated_tokens, state.tokens.capacity)
+            state.tokens.tokens -= actual_tokens - estimated_tokens
+            if state.usage:
+                timestamp, _ = state.usage[-1]
+                state.usage[-1] = (timestamp, actual_tokens)
+            self._condition.notify_all()
+
+    def report_error(self, key_name, error_kind):
+        """Rest a key after a quota ('quota') or authentication ('auth') error"""
+        with self._condition:
+            state = self._keys[key_name]
+            state.total_errors += 1
+            state.cooldown_until = time.monotonic() + self.cooldowns.get(error_kind, 0)
+            print(f"Resting Gemini {key_name} key for {self.cooldowns.get(error_kind, 0):.0f}s after {error_kind} error")
+            self._condition.notify_all()
+
+    def get_utilization(self):
+        """Per-key utilization over the last minute, for sizing quotas"""
+        with self._condition:
+            now = time.monotonic()
+            report = {'throttled_waits': self.throttled_waits, 'keys': {}}
+
+            for name, state in self._keys.items():
+                state.requests.refill(now)
+                state.tokens.refill(now)
+                while state.usage and now - state.usage[0][0] > USAGE_WINDOW_SECONDS:
+                    state.usage.popleft()
+
+                requests_last_minute = len(state.usage)
+                tokens_last_minute = sum(tokens for _, tokens in state.usage)
+                report['keys'][name] = {
+                    'weight': state.weight,
+                    'rpm_limit': self.rpm_limit,
+                    'tpm_limit': self.tpm_limit,
+                    'requests_last_minute': requests_last_minute,
+                    'tokens_last_minute': tokens_last_minute,
+                    'request_utilization': round(requests_last_minute / self.rpm_limit, 4),
+                    'token_utilization': round(tokens_last_minute / self.tpm_limit, 4),
+                    'cooldown_remaining_seconds': round(max(0.0, state.cooldown_until - now), 1),
+                    'total_requests': state.total_requests,
+                    'total_errors': state.total_errors,
+                }
+
+            return report
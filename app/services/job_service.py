@@ -0,0 +1,315 @@
+"""
+Background Job Service Module
+
+Runs slow work (proposal generation, PDF rendering) on a bounded thread pool
+so gunicorn request threads return immediately. Job records are persisted as JSON files in
+the state folder, so a job submitted to one gunicorn worker can be polled
+through any other worker on the same host. Cancellation requests likewise
+reach the worker running a job through a marker file. Each record names the
+process that took the job, so a job left unfinished by a worker that died can
+be told apart from one still running.
+"""
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+
+JOB_ID_PATTERN = re.compile(r'^[A-Za-z0-9_.-]{1,128}$')
+
+# How often a running job's cancel flag looks for a marker from another worker
+CANCEL_MARKER_POLL_SECONDS = 0.5
+
+
+def _process_alive(pid):
+    """True unless the process with this id on this host is known to have exited"""
+    if os.name == 'nt':
+        return True  # os.kill would terminate it
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass  # Exists, owned by another user
+    return True
+
+
+class JobQueueFullError(Exception):
+    """Raised when a job is submitted while every worker and queue slot is taken"""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class JobCancelFlag:
+    """threading.Event-like flag that is also set by a cancel marker file
+
+    The marker lets a cancel request handled by another gunicorn worker reach
+    the worker that is running the job.
+    """
+
+    def __init__(self, marker_path):
+        self.marker_path = marker_path
+        self._event = threading.Event()
+
+    def set(self):
+        self._event.set()
+
+    def is_set(self):
+        if not self._event.is_set() and os.path.exists(self.marker_path):
+            self._event.set()
+        return self._event.is_set()
+
+    def wait(self, timeout=None):
+        """Wait until set or timeout, polling for the marker file meanwhile"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.is_set():
+            remaining = CANCEL_MARKER_POLL_SECONDS if deadline is None else deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            self._event.wait(min(remaining, CANCEL_MARKER_POLL_SECONDS))
+        return True
+
+
+class JobService:
+    """Bounded background executor with persisted job status records"""
+
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CANCELLED = 'cancelled'
+    FINISHED_STATUSES = (STATUS_DONE, STATUS_FAILED, STATUS_CANCELLED)
+
+    def __init__(self, app_config, name='proposal', max_workers=None, max_pending=None):
+        """max_workers and max_pending default to JOB_WORKERS and JOB_QUEUE_SIZE"""
+        self.name = name
+        if max_workers is None:
+            max_workers = app_config.get('JOB_WORKERS', 2)
+        if max_pending is None:
+            max_pending = app_config.get('JOB_QUEUE_SIZE', 8)
+        self.max_workers = max(1, int(max_workers))
+        self.max_pending = max(0, int(max_pending))
+        self.retention_seconds = int(app_config.get('JOB_RETENTION_SECONDS', 3600))
+        self.retry_after = int(app_config.get('JOB_RETRY_AFTER_SECONDS', 5))
+
+        self.state_dir = os.path.join(app_config['STATE_FOLDER'], 'jobs', name)
+        os.makedirs(self.state_dir, exist_ok=True)
+
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                            thread_name_prefix=f"{name}-job")
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._cancel_flags = {}
+        self._active_count = 0
+
+    def submit(self, func, kwargs=None, meta=None, job_id=None, cancellable=False):
+        """Queue func(**kwargs) and return the new job record
+
+        With cancellable, func also receives a cancel_event keyword argument
+        that is set once the job is cancelled.
+        Raises JobQueueFullError when all workers are busy and the queue is full.
+        """
+        job_id = job_id or uuid.uuid4().hex
+        if not JOB_ID_PATTERN.match(job_id):
+            raise ValueError(f"Invalid job id: {job_id}")
+
+        with self._lock:
+            if self._active_count >= self.max_workers + self.max_pending:
+                raise JobQueueFullError(
+                    f"{self.name} queue is full ({self._active_count} jobs in progress)",
+                    self.retry_after
+                )
+            self._active_count += 1
+
+            job = {
+                'id': job_id,
+                'kind': self.name,
+                'status': self.STATUS_QUEUED,
+                'created_at': time.time(),
+                'started_at': None,
+                'finished_at': None,
+                'error': None,
+                'result': None,
+                'meta': meta or {},
+                'pid': os.getpid(),
+            }
+            self._jobs[job_id] = job
+
+            kwargs = dict(kwargs or {})
+            if cancellable:
+                cancel_flag = JobCancelFlag(self._cancel_marker_path(job_id))
+                self._cancel_flags[job_id] = cancel_flag
+                kwargs['cancel_event'] = cancel_flag
+
+        self._persist(job)
+        try:
+            self._executor.submit(self._run, job_id, func, kwargs)
+        except RuntimeError as e:
+            # Executor is shutting down
+            self._finish(job_id, error=str(e))
+            raise
+
+        return dict(job)
+
+    def get_job(self, job_id):
+        """Return the job record from memory or from the shared state folder"""
+        if not job_id or not JOB_ID_PATTERN.match(job_id):
+            return None
+
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return dict(job)
+
+        try:
+            with open(self._job_path(job_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def cancel(self, job_id):
+        """Request cancellation of a job and return its record (None if unknown)
+
+        A queued job never starts; a running job sees its cancel_event set and
+        is recorded as cancelled when it returns.
+        """
+        job = self.get_job(job_id)
+        if job is None or job['status'] in self.FINISHED_STATUSES:
+            return job
+
+        with self._lock:
+            cancel_flag = self._cancel_flags.get(job_id)
+        if cancel_flag is not None:
+            cancel_flag.set()
+        else:
+            # The job belongs to another worker; leave it a marker
+            try:
+                with open(self._cancel_marker_path(job_id), 'w', encoding='utf-8'):
+                    pass
+            except OSError as e:
+                print(f"Warning: Could not mark {self.name} job {job_id} cancelled: {e}")
+
+        print(f"Cancellation requested for {self.name} job {job_id}")
+        return job
+
+    def get_stats(self):
+        """Return queue occupancy for this worker process"""
+        with self._lock:
+            return {
+                'kind': self.name,
+                'pid': os.getpid(),
+                'active': self._active_count,
+                'capacity': self.max_workers + self.max_pending,
+                'workers': self.max_workers,
+            }
+
+    def is_orphaned(self, job, max_age_seconds=None):
+        """True if an unfinished job will never finish
+
+        A record outlives the worker that took the job, so a job is orphaned
+        once that process has exited or, with max_age_seconds, once it was
+        submitted longer ago than that.
+        """
+        if job['status'] in self.FINISHED_STATUSES:
+            return False
+        if max_age_seconds is not None and time.time() - job['created_at'] > max_age_seconds:
+            return True
+        pid = job.get('pid')
+        return pid is not None and pid != os.getpid() and not _process_alive(pid)
+
+    @staticmethod
+    def public_view(job):
+        """Job record without the (potentially large) result payload"""
+        view = {key: value for key, value in job.items() if key != 'result'}
+        view['has_result'] = job.get('result') is not None
+        return view
+
+    def _run(self, job_id, func, kwargs):
+        """Execute a job on a pool thread and record its outcome"""
+        cancel_flag = kwargs.get('cancel_event')
+        if cancel_flag is not None and cancel_flag.is_set():
+            self._finish(job_id, cancelled=True)
+            return
+
+        with self._lock:
+            job = self._jobs[job_id]
+            job['status'] = self.STATUS_RUNNING
+            job['started_at'] = time.time()
+            snapshot = dict(job)
+        self._persist(snapshot)
+
+        try:
+            result = func(**kwargs)
+        except Exception as e:
+            if cancel_flag is not None and cancel_flag.is_set():
+                self._finish(job_id, cancelled=True)
+                return
+            print(f"{self.name} job {job_id} failed: {e}")
+            self._finish(job_id, error=str(e))
+        else:
+            if cancel_flag is not None and cancel_flag.is_set():
+                self._finish(job_id, cancelled=True)
+                return
+            self._finish(job_id, result=result)
+
+    def _finish(self, job_id, result=None, error=None, cancelled=False):
+        """Mark a job finished, persist it and release its slot"""
+        with self._lock:
+            job = self._jobs[job_id]
+            if cancelled:
+                job['status'] = self.STATUS_CANCELLED
+            else:
+                job['status'] = self.STATUS_FAILED if error else self.STATUS_DONE
+            job['finished_at'] = time.time()
+            job['result'] = result
+            job['error'] = error
+            self._active_count -= 1
+            self._cancel_flags.pop(job_id, None)
+            snapshot = dict(job)
+
+        if cancelled:
+            print(f"{self.name} job {job_id} cancelled")
+        self._persist(snapshot)
+        self._prune()
+
+    def _persist(self, job):
+        """Atomically write the job record so other workers can read it"""
+        path = self._job_path(job['id'])
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(job, f, default=str)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Warning: Could not persist {self.name} job {job['id']}: {e}")
+
+    def _prune(self):
+        """Forget finished jobs older than the retention window"""
+        cutoff = time.time() - self.retention_seconds
+
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job['status'] in self.FINISHED_STATUSES and job['finished_at'] < cutoff
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+        try:
+            for filename in os.listdir(self.state_dir):
+                path = os.path.join(self.state_dir, filename)
+                if filename.endswith(('.json', '.cancel')) and os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+        except OSError as e:
+            print(f"Warning: Could not prune {self.name} jobs: {e}")
+
+    def _job_path(self, job_id):
+        return os.path.join(self.state_dir, f"{job_id}.json")
+
+    def _cancel_marker_path(self, job_id):
+        return os.path.join(self.state_dir, f"{job_id}.cancel")
@@ -0,0 +1,180 @@
+"""
+LLM Response Cache Module
+
+Content-addressed cache of model responses, keyed on a hash of the model name
+and the final prompt. Entries live in a SQLite database in the state folder, so
+every gunicorn worker on the host shares them. The cache is bounded by total
+response size (least recently used entries are evicted first) and entries
+expire after a configurable TTL.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+
+class LLMResponseCache:
+    """Disk-backed LRU + TTL cache shared by all worker processes on the host"""
+
+    def __init__(self, app_config):
+        self.enabled = bool(app_config.get('LLM_CACHE_ENABLED', True))
+        self.path = os.path.join(app_config['STATE_FOLDER'], 'llm_cache.sqlite3')
+        self.max_bytes = int(float(app_config.get('LLM_CACHE_MAX_MB', 64)) * 1024 * 1024)
+        self.ttl_seconds = int(app_config.get('LLM_CACHE_TTL_SECONDS', 86400))
+
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(model_name, prompt):
+        """Content address for a (model, prompt) pair"""
+        digest = hashlib.sha256()
+        digest.update(model_name.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(prompt.encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key):
+        """Return the cached response text, or None on a miss or expired entry"""
+        if not self.enabled:
+            return None
+
+        try:
+            conn = self._connection()
+            now = time.time()
+            row = conn.execute(
+                "SELECT response, created_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is not None and now - row[1] > self.ttl_seconds:
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                row = None
+
+            if row is None:
+                conn.execute("UPDATE stats SET misses = misses + 1 WHERE id = 1")
+                self._count('misses')
+                return None
+
+            conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+            conn.execute("UPDATE stats SET hits = hits + 1 WHERE id = 1")
+            self._count('hits')
+            return row[0]
+
+        except sqlite3.Error as e:
+            print(f"Warning: LLM cache lookup failed: {e}")
+            return None
+
+    def put(self, key, model_name, response_text):
+        """Store a response and evict old entries beyond the size limit"""
+        if not self.enabled or not response_text:
+            return
+
+        size = len(response_text.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+
+        try:
+            conn = self._connection()
+            now = time.time()
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, model, response, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model_name, response_text, size, now, now)
+            )
+            self._evict(conn, now)
+
+        except sqlite3.Error as e:
+            print(f"Warning: LLM cache store failed: {e}")
+
+    def get_stats(self):
+        """Return host-wide and per-process cache counters"""
+        stats = {
+            'enabled': self.enabled,
+            'max_bytes': self.max_bytes,
+            'ttl_seconds': self.ttl_seconds,
+            'process': {
+                'pid': os.getpid(),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            },
+        }
+        if not self.enabled:
+            return stats
+
+        try:
+            conn = self._connection()
+            entries, total_bytes = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+            hits, misses, evictions = conn.execute(
+                "SELECT hits, misses, evictions FROM stats WHERE id = 1"
+            ).fetchone()
+            lookups = hits + misses
+            stats.update({
+                'entries': entries,
+                'total_bytes': total_bytes,
+                'hits': hits,
+                'misses': misses,
+                'evictions': evictions,
+                'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+            })
+        except sqlite3.Error as e:
+            print(f"Warning: LLM cache stats failed: {e}")
+
+        return stats
+
+    def _evict(self, conn, now):
+        """Drop expired entries, then least recently used ones until under max_bytes"""
+        evicted = conn.execute(
+            "DELETE FROM entries WHERE created_at < ?", (now - self.ttl_seconds,)
+        ).rowcount
+
+        total_bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total_bytes > self.max_bytes:
+            excess = total_bytes - self.max_bytes
+            victims = []
+            for key, size in conn.execute("SELECT key, size FROM entries ORDER BY last_access"):
+                victims.append((key,))
+                excess -= size
+                if excess <= 0:
+                    break
+            conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+            evicted += len(victims)
+
+        if evicted:
+            conn.execute("UPDATE stats SET evictions = evictions + ? WHERE id = 1", (evicted,))
+            self._count('evictions', evicted)
+
+    def _count(self, counter, amount=1):
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def _connection(self):
+        """Per-thread connection, reopened after a fork"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, model TEXT, response TEXT, size INTEGER, "
+            "created_at REAL, last_access REAL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS stats ("
+            "id INTEGER PRIMARY KEY, hits INTEGER, misses INTEGER, evictions INTEGER)"
+        )
+        conn.execute("INSERT OR IGNORE INTO stats (id, hits, misses, evictions) VALUES (1, 0, 0, 0)")
+
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
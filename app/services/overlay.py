@@ -0,0 +1,55 @@
+"""
+Overlay Mapping Module
+
+Lets each request render a template from the shared, parsed YAML config
+without copying it. The config is frozen once (read-only mappings and tuples),
+and a request layers its few overrides on top with OverlayMapping, so the
+per-request allocation grows with the number of overrides rather than with the
+size of the config. Jinja renders overlays like plain dicts.
+"""
+from collections.abc import Mapping
+from types import MappingProxyType
+
+
+def freeze(value):
+    """Recursively convert parsed YAML into read-only mappings and tuples"""
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+class OverlayMapping(Mapping):
+    """Read-only view of a base mapping with some keys replaced or added
+
+    Keys keep the base mapping's order, followed by keys only in overrides, as
+    with dict.update. Use a nested OverlayMapping as an override value to change
+    a few keys of a nested mapping.
+    """
+
+    __slots__ = ('_base', '_overrides')
+
+    def __init__(self, base, overrides):
+        self._base = base
+        self._overrides = overrides
+
+    def __getitem__(self, key):
+        if key in self._overrides:
+            return self._overrides[key]
+        return self._base[key]
+
+    def __iter__(self):
+        yield from self._base
+        for key in self._overrides:
+            if key not in self._base:
+                yield key
+
+    def __len__(self):
+        return len(self._base) + sum(1 for key in self._overrides if key not in self._base)
+
+    def __contains__(self, key):
+        return key in self._overrides or key in self._base
+
+    def __repr__(self):
+        return f"OverlayMapping({dict(self)!r})"
@@ -0,0 +1,77 @@
+"""
+Precomputed Payload Module
+
+Response bodies that only change with their data (such as the school table
+JSON) are serialized and compressed once, then served as stored bytes. Each
+payload carries a strong ETag derived from its content, so a client that
+already holds the current version gets 304 Not Modified without a body.
+Brotli is used when the optional `brotli` package is installed; gzip always
+is available.
+"""
+import gzip
+import hashlib
+
+from flask import Response
+
+try:
+    import brotli
+except ImportError:  # Optional: serve gzip only
+    brotli = None
+
+
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 9
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_BYTES = 512
+
+
+class PrecomputedPayload:
+    """Immutable response body with its ETag and compressed variants"""
+
+    __slots__ = ('body', 'content_type', 'etag', 'gzip', 'brotli')
+
+    def __init__(self, body, content_type='application/json'):
+        """
+        Args:
+            body (bytes or str): Uncompressed response body (str is UTF-8 encoded)
+            content_type (str): Content-Type of the body
+        """
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        self.body = body
+        self.content_type = content_type
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+
+        compress = len(body) >= MIN_COMPRESS_BYTES
+        self.gzip = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0) if compress else None
+        self.brotli = brotli.compress(body, quality=BROTLI_QUALITY) if compress and brotli else None
+
+    def variants(self):
+        """(encoding, ETag, bytes) for every stored representation, preferred first"""
+        if self.brotli is not None:
+            yield 'br', f"{self.etag}-br", self.brotli
+        if self.gzip is not None:
+            yield 'gzip', f"{self.etag}-gz", self.gzip
+        yield None, self.etag, self.body
+
+    def response(self, request):
+        """Best representation for the request, or 304 if the client's copy is current"""
+        variants = list(self.variants())
+        encoding, etag, body = next(
+            (variant for variant in variants
+             if variant[0] is None or request.accept_encodings.quality(variant[0]) > 0)
+        )
+
+        # Any representation of this version satisfies a conditional request
+        if any(request.if_none_match.contains_weak(tag) for _, tag, _ in variants):
+            response = Response(status=304)
+        else:
+            response = Response(body, content_type=self.content_type)
+            if encoding:
+                response.headers['Content-Encoding'] = encoding
+
+        response.set_etag(etag)
+        response.headers['Vary'] = 'Accept-Encoding'
+        # Cache, but revalidate every time so a new dataset version shows up at once
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
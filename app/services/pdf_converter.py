@@ -0,0 +1,443 @@
+"""
+PDF Converter Module
+
+Converts DOCX files to PDF with a pool of long-lived headless LibreOffice
+instances instead of starting `libreoffice --convert-to pdf` for every
+document. Each instance has its own UserInstallation profile folder (claimed
+with a lock file, so gunicorn workers never share one and a restarted worker
+reuses an initialized profile) and converts one document at a time, so
+concurrent exports run in parallel up to the pool size.
+
+When some Python on the host can import LibreOffice's `uno` module (the
+system python3 with the python3-uno package, or the app's own interpreter),
+each instance is an soffice process listening on a private pipe, driven over
+UNO by a pdf_uno_helper.py process running under that Python, the way
+unoconv does. The app itself never imports `uno`, so its interpreter does not
+need the bridge and gunicorn can fork it safely. Without such a Python each
+conversion is a one-shot `--convert-to pdf` run that still uses the
+instance's isolated, already initialized profile. Instances are started on
+first use, checked before each conversion, killed when a conversion exceeds
+its timeout and restarted after a set number of conversions.
+"""
+import atexit
+import json
+import os
+import pathlib
+import shutil
+import signal
+import subprocess
+import sys
+import threading
+import time
+from queue import Empty, Queue
+
+try:
+    import fcntl
+except ImportError:  # Windows: profiles are claimed per process id instead
+    fcntl = None
+
+
+SOFFICE_BINARIES = ('libreoffice', 'soffice')
+# Where python3-uno installs the bridge on Debian and Ubuntu
+SYSTEM_PYTHON = '/usr/bin/python3'
+UNO_HELPER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pdf_uno_helper.py')
+STARTUP_TIMEOUT_SECONDS = 30
+# More profile slots than this per host means something leaks them
+MAX_PROFILE_SLOTS = 256
+
+
+class PdfConversionError(RuntimeError):
+    """A document could not be converted"""
+
+
+def find_soffice(configured=None):
+    """Path of the LibreOffice binary, or None if it is not installed"""
+    for name in ((configured,) if configured else SOFFICE_BINARIES):
+        path = shutil.which(name)
+        if path:
+            return path
+    return None
+
+
+def find_uno_python(configured=None, soffice=None):
+    """Path of a Python that can import LibreOffice's uno module, or None
+
+    Without a configured interpreter, tries this one, the system python3 and
+    the Python that LibreOffice's own builds ship next to soffice.
+    """
+    if configured:
+        candidates = [configured]
+    else:
+        candidates = [sys.executable, SYSTEM_PYTHON]
+        if soffice:
+            candidates.append(os.path.join(os.path.dirname(os.path.realpath(soffice)), 'python'))
+
+    for candidate in candidates:
+        path = shutil.which(candidate)
+        if not path:
+            continue
+        try:
+            probe = subprocess.run([path, '-c', 'import uno'], stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                   stderr=subprocess.DEVNULL, timeout=STARTUP_TIMEOUT_SECONDS)
+        except (OSError, subprocess.TimeoutExpired):
+            continue
+        if probe.returncode == 0:
+            return path
+    return None
+
+
+def file_url(path):
+    """file:// URL of a local path, as LibreOffice expects it"""
+    return pathlib.Path(os.path.abspath(path)).as_uri()
+
+
+class OfficeInstance:
+    """One headless LibreOffice with its own profile, converting one document at a time"""
+
+    def __init__(self, binary, profile_root, timeout):
+        self.binary = binary
+        self.profile_root = profile_root
+        self.timeout = timeout
+        self.profile_dir = None
+        self.process = None
+        self.helper = None
+        self.conversions = 0
+        self.started_at = None
+        self._lock_file = None
+
+    @property
+    def running(self):
+        return self.process is not None and self.process.poll() is None
+
+    def claim_profile(self):
+        """Take an unused profile folder under profile_root, keeping it locked while this process lives"""
+        if self.profile_dir is not None:
+            return self.profile_dir
+        os.makedirs(self.profile_root, exist_ok=True)
+        if fcntl is None:
+            self.profile_dir = os.path.join(self.profile_root, f"pid{os.getpid()}-{id(self)}")
+            return self.profile_dir
+
+        for slot in range(MAX_PROFILE_SLOTS):
+            lock_file = open(os.path.join(self.profile_root, f"{slot}.lock"), 'a')
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                continue
+            self._lock_file = lock_file
+            self.profile_dir = os.path.join(self.profile_root, str(slot))
+            return self.profile_dir
+        raise PdfConversionError(f"No free LibreOffice profile slot in {self.profile_root}")
+
+    def _base_command(self):
+        return [
+            self.binary, '--headless', '--invisible', '--nologo', '--norestore', '--nodefault',
+            '--nolockcheck', '--nofirststartwizard', f"-env:UserInstallation={file_url(self.claim_profile())}",
+        ]
+
+    def _pipe_name(self):
+        return f"proposal_pdf_{os.getpid()}_{os.path.basename(self.profile_dir)}"
+
+    def start(self, python):
+        """Launch soffice on a private pipe and the UNO helper (run by python) that drives it"""
+        command = self._base_command() + [f"--accept=pipe,name={self._pipe_name()};urp;StarOffice.ComponentContext"]
+        self.process = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                        stderr=subprocess.DEVNULL, start_new_session=True)
+        self.started_at = time.time()
+        self.conversions = 0
+
+        try:
+            self.helper = subprocess.Popen(
+                [python, UNO_HELPER, self._pipe_name(), str(STARTUP_TIMEOUT_SECONDS)],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                text=True, start_new_session=True)
+            # The helper's first reply says whether it connected
+            self._request(None, STARTUP_TIMEOUT_SECONDS + 5)
+        except (OSError, PdfConversionError, subprocess.TimeoutExpired) as e:
+            self.stop(force=True)
+            raise PdfConversionError(f"LibreOffice did not start: {e}")
+
+    def healthy(self):
+        """True if soffice is alive and answers its helper over UNO"""
+        if not self.running or self.helper is None:
+            return False
+        try:
+            self._request({'op': 'ping'}, STARTUP_TIMEOUT_SECONDS)
+            return True
+        except (PdfConversionError, subprocess.TimeoutExpired):
+            return False
+
+    def convert(self, docx_path, pdf_path):
+        """Convert one document, killing the instance if it takes longer than the timeout
+
+        Raises:
+            PdfConversionError: On failure
+            subprocess.TimeoutExpired: If the conversion timed out
+        """
+        if self.helper is None:
+            return self._convert_once(docx_path, pdf_path)
+
+        try:
+            self._request({'op': 'convert', 'docx': os.path.abspath(docx_path), 'pdf': os.path.abspath(pdf_path)},
+                          self.timeout)
+        except PdfConversionError as e:
+            raise PdfConversionError(f"PDF conversion failed: {e}")
+        self.conversions += 1
+
+    def _request(self, message, timeout):
+        """Send message (None to only read) to the UNO helper and return its reply
+
+        Both processes are killed if no reply comes within timeout.
+        """
+        helper = self.helper
+        timed_out = threading.Event()
+
+        def expire():
+            timed_out.set()
+            self.stop(force=True)
+
+        timer = threading.Timer(timeout, expire)
+        timer.daemon = True
+        timer.start()
+        try:
+            if message is not None:
+                helper.stdin.write(json.dumps(message) + '\n')
+                helper.stdin.flush()
+            line = helper.stdout.readline()
+        except (OSError, ValueError):
+            line = ''
+        finally:
+            timer.cancel()
+
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(self.binary, timeout)
+        if not line:
+            raise PdfConversionError("LibreOffice UNO helper exited")
+        reply = json.loads(line)
+        if not reply.get('ok'):
+            raise PdfConversionError(reply.get('error') or "LibreOffice UNO helper failed")
+        return reply
+
+    def _convert_once(self, docx_path, pdf_path):
+        """One-shot `--convert-to pdf` run that uses this instance's profile"""
+        out_dir = os.path.dirname(os.path.abspath(pdf_path))
+        command = self._base_command() + ['--convert-to', 'pdf', '--outdir', out_dir, docx_path]
+        process = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE, start_new_session=True)
+        try:
+            _, stderr = process.communicate(timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            _kill_process_group(process)
+            process.communicate()
+            raise
+        if process.returncode != 0:
+            raise PdfConversionError(f"PDF conversion failed with exit code {process.returncode}: "
+                                     f"{stderr.decode(errors='replace').strip()}")
+
+        # LibreOffice names the PDF after the DOCX
+        generated_pdf = os.path.join(out_dir, f"{os.path.splitext(os.path.basename(docx_path))[0]}.pdf")
+        if not os.path.exists(generated_pdf):
+            raise PdfConversionError(f"LibreOffice wrote no PDF for {docx_path}")
+        if generated_pdf != os.path.abspath(pdf_path):
+            os.replace(generated_pdf, pdf_path)
+        self.conversions += 1
+
+    def stop(self, force=False):
+        """Shut soffice and its helper down (killing them if force or if they don't exit)"""
+        process, helper = self.process, self.helper
+        self.process, self.helper = None, None
+        if helper is not None and not force:
+            try:
+                helper.stdin.write(json.dumps({'op': 'terminate'}) + '\n')
+                helper.stdin.close()
+            except (OSError, ValueError):
+                pass
+        for child in (process, helper):
+            if child is None:
+                continue
+            try:
+                if force:
+                    _kill_process_group(child)
+                child.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                _kill_process_group(child)
+                child.wait()
+
+
+def _kill_process_group(process):
+    """Kill soffice together with the soffice.bin it launched"""
+    try:
+        if hasattr(os, 'killpg'):
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except OSError:
+        pass  # Already gone
+
+
+class PdfConverterPool:
+    """Fixed-size pool of LibreOffice instances shared by a worker's threads"""
+
+    def __init__(self, profile_root, size=2, timeout=60, recycle_after=50, binary=None, python=None):
+        """
+        Args:
+            profile_root (str): Folder holding each instance's UserInstallation profile
+            size (int): Instances, i.e. conversions that can run at once in this worker
+            timeout (float): Seconds one conversion (or the wait for a free instance) may take
+            recycle_after (int): Conversions after which a long-lived instance is restarted
+            binary (str): LibreOffice executable; by default libreoffice or soffice on the PATH
+            python (str): Python with the uno module that runs the UNO helper; found on first use by default
+        """
+        self.profile_root = profile_root
+        self.size = max(1, int(size))
+        self.timeout = timeout
+        self.recycle_after = max(1, int(recycle_after))
+        self.binary = find_soffice(binary)
+        self._configured_python = python
+        self._uno_python = None
+        self._uno_python_checked = False
+
+        self._lock = threading.Lock()
+        self._reset_state()
+        atexit.register(self.close)
+
+    def _reset_state(self):
+        """Start with fresh instances (soffice processes must not be shared across a fork)"""
+        self._pid = os.getpid()
+        self._instances = [OfficeInstance(self.binary, self.profile_root, self.timeout) for _ in range(self.size)]
+        self._idle = Queue()
+        for instance in self._instances:
+            self._idle.put(instance)
+        self.stats = {'conversions': 0, 'failures': 0, 'timeouts': 0, 'starts': 0, 'recycled': 0,
+                      'unhealthy': 0, 'total_seconds': 0.0, 'max_seconds': 0.0}
+
+    @property
+    def available(self):
+        return self.binary is not None
+
+    def warm(self):
+        """Look up the UNO helper's Python ahead of the first conversion (run by the startup warmup)"""
+        self.resolve_uno_python()
+
+    def resolve_uno_python(self):
+        """Python that runs the UNO helper, or None for one-shot conversions
+
+        Probing starts interpreters, so it runs once and outside the pool's
+        lock; two threads that race here both find the same answer.
+        """
+        if self._uno_python_checked:
+            return self._uno_python
+        uno_python = find_uno_python(self._configured_python, self.binary) if self.available else None
+        with self._lock:
+            if not self._uno_python_checked:
+                self._uno_python, self._uno_python_checked = uno_python, True
+                if uno_python:
+                    print(f"PDF converter: long-lived LibreOffice instances driven by {uno_python}")
+                elif self.available:
+                    print("PDF converter: no Python with the uno module found; converting with one-shot runs")
+            return self._uno_python
+
+    @property
+    def uno_python(self):
+        """The UNO helper's Python as last resolved (None before the first lookup)"""
+        return self._uno_python
+
+    @property
+    def mode(self):
+        """'uno' or 'subprocess', or 'unresolved' before the lookup has run"""
+        if not self._uno_python_checked:
+            return 'unresolved'
+        return 'uno' if self._uno_python is not None else 'subprocess'
+
+    def convert(self, docx_path, pdf_path):
+        """Convert docx_path to pdf_path on a free instance
+
+        Raises:
+            PdfConversionError: If LibreOffice is missing, busy past the timeout, fails or times out
+        """
+        if not self.available:
+            raise PdfConversionError("LibreOffice is not installed")
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset_state()
+            idle = self._idle
+
+        try:
+            instance = idle.get(timeout=self.timeout)
+        except Empty:
+            raise PdfConversionError(f"No PDF converter free within {self.timeout}s")
+
+        started_at = time.perf_counter()
+        try:
+            self._prepare(instance)
+            instance.convert(docx_path, pdf_path)
+        except subprocess.TimeoutExpired:
+            self._record('timeouts')
+            instance.stop(force=True)
+            raise PdfConversionError(f"PDF conversion timed out after {self.timeout}s")
+        except Exception:
+            self._record('failures')
+            instance.stop(force=True)
+            raise
+        finally:
+            idle.put(instance)
+
+        seconds = time.perf_counter() - started_at
+        with self._lock:
+            self.stats['conversions'] += 1
+            self.stats['total_seconds'] += seconds
+            self.stats['max_seconds'] = max(self.stats['max_seconds'], seconds)
+
+    def _prepare(self, instance):
+        """Make sure a UNO instance is running, healthy and not due for recycling"""
+        python = self.resolve_uno_python()
+        if python is None:
+            instance.claim_profile()
+            return
+        if instance.running and instance.conversions >= self.recycle_after:
+            self._record('recycled')
+            instance.stop()
+        elif instance.process is not None and not instance.healthy():
+            # Also reaps the helper of an soffice that crashed
+            self._record('unhealthy')
+            instance.stop(force=True)
+        if not instance.running:
+            self._record('starts')
+            instance.start(python)
+
+    def _record(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            instances = list(self._instances)
+        conversions = stats['conversions']
+        stats['avg_seconds'] = round(stats['total_seconds'] / conversions, 3) if conversions else None
+        stats['total_seconds'] = round(stats['total_seconds'], 3)
+        stats['max_seconds'] = round(stats['max_seconds'], 3)
+        stats.update({
+            'available': self.available,
+            'mode': self.mode,
+            'uno_python': self.uno_python,
+            'size': self.size,
+            'idle': self._idle.qsize(),
+            'instances': [
+                {
+                    'profile': os.path.basename(instance.profile_dir) if instance.profile_dir else None,
+                    'running': instance.running,
+                    'conversions': instance.conversions,
+                }
+                for instance in instances
+            ],
+        })
+        return stats
+
+    def close(self):
+        """Stop every instance this process started"""
+        if self._pid != os.getpid():
+            return
+        for instance in self._instances:
+            instance.stop()
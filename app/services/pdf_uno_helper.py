@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+LibreOffice UNO Helper
+
+Drives one long-lived soffice for PdfConverterPool. It runs as its own
+process under whichever Python can import LibreOffice's `uno` module (usually
+the system python3 with the python3-uno package), which need not be the app's
+interpreter, and imports nothing from the app. It connects to the soffice
+listening on the pipe named on the command line, then answers one JSON request
+per stdin line with one JSON reply per stdout line:
+
+    {"op": "convert", "docx": "/in.docx", "pdf": "/out.pdf"}  ->  {"ok": true}
+    {"op": "ping"}                                             ->  {"ok": true}
+    {"op": "terminate"}                                        ->  {"ok": true}, then soffice exits
+
+The first line it writes is the reply to connecting. Failures reply
+{"ok": false, "error": "..."}.
+
+Usage: python3 pdf_uno_helper.py <pipe_name> [connect_timeout_seconds]
+"""
+import json
+import os
+import sys
+import time
+
+import uno
+
+CONNECT_POLL_SECONDS = 0.25
+
+
+def connect(pipe_name, timeout):
+    """Desktop of the soffice accepting UNO connections on pipe_name"""
+    local_context = uno.getComponentContext()
+    resolver = local_context.ServiceManager.createInstanceWithContext(
+        'com.sun.star.bridge.UnoUrlResolver', local_context)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            context = resolver.resolve(f"uno:pipe,name={pipe_name};urp;StarOffice.ComponentContext")
+            break
+        except Exception:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(CONNECT_POLL_SECONDS)
+    return context.ServiceManager.createInstanceWithContext('com.sun.star.frame.Desktop', context)
+
+
+def properties(**values):
+    """Tuple of UNO PropertyValues"""
+    result = []
+    for name, value in values.items():
+        prop = uno.createUnoStruct('com.sun.star.beans.PropertyValue')
+        prop.Name, prop.Value = name, value
+        result.append(prop)
+    return tuple(result)
+
+
+def convert(desktop, docx_path, pdf_path):
+    """Export one document to PDF"""
+    document = desktop.loadComponentFromURL(
+        uno.systemPathToFileUrl(os.path.abspath(docx_path)), '_blank', 0, properties(Hidden=True, ReadOnly=True))
+    if document is None:
+        raise RuntimeError(f"LibreOffice could not open {docx_path}")
+    try:
+        document.storeToURL(uno.systemPathToFileUrl(os.path.abspath(pdf_path)),
+                            properties(FilterName='writer_pdf_Export'))
+    finally:
+        document.close(True)
+
+
+def reply(stream, error=None):
+    message = {'ok': True} if error is None else {'ok': False, 'error': error}
+    stream.write(json.dumps(message) + '\n')
+    stream.flush()
+
+
+def describe(error):
+    # UNO exceptions often carry no message of their own
+    return str(error) or type(error).__name__
+
+
+def main():
+    pipe_name = sys.argv[1]
+    timeout = float(sys.argv[2]) if len(sys.argv) > 2 else 30.0
+    replies = sys.stdout
+    # Anything else printed must not be mistaken for a reply
+    sys.stdout = sys.stderr
+
+    try:
+        desktop = connect(pipe_name, timeout)
+    except Exception as e:
+        reply(replies, f"Could not connect to LibreOffice: {describe(e)}")
+        return 1
+    reply(replies)
+
+    for line in sys.stdin:
+        try:
+            request = json.loads(line)
+            op = request.get('op')
+            if op == 'convert':
+                convert(desktop, request['docx'], request['pdf'])
+            elif op == 'ping':
+                desktop.getComponents()
+            elif op == 'terminate':
+                reply(replies)
+                try:
+                    desktop.terminate()
+                except Exception:
+                    pass  # The connection closes as soffice exits
+                return 0
+            else:
+                raise ValueError(f"Unknown request: {op}")
+        except Exception as e:
+            reply(replies, describe(e))
+            continue
+        reply(replies)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
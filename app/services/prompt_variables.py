@@ -0,0 +1,82 @@
+"""
+Prompt Variables Module
+
+Builds prompt variables on demand. LazyVariables maps each variable name to a
+resolver, and a value is computed the first time a template asks for it and
+kept for the rest of the request, so str.format_map and the YAML prompt only
+pay for the variables they reference. format_field_names and
+jinja_variable_names find the names a template references statically, once
+per template version, so the ones a prompt needs can be resolved up front.
+"""
+import re
+import string
+from collections.abc import Mapping
+
+from jinja2 import meta
+
+
+FIELD_ROOT_PATTERN = re.compile(r'[.\[]')
+
+
+class LazyVariables(Mapping):
+    """Read-only mapping whose values are computed on first access
+
+    resolvers maps a name to a function taking this mapping, so a value can be
+    built from other variables. A resolver raising KeyError makes its name
+    behave as missing (e.g. for .get). Resolvers must not have side effects: two
+    threads reading the same name at once may both run it, and the first
+    result is kept.
+    """
+
+    __slots__ = ('_resolvers', '_values')
+
+    def __init__(self, values, resolvers):
+        self._values = dict(values)
+        self._resolvers = resolvers
+
+    def __getitem__(self, key):
+        try:
+            return self._values[key]
+        except KeyError:
+            resolver = self._resolvers[key]
+        return self._values.setdefault(key, resolver(self))
+
+    def __iter__(self):
+        yield from list(self._values)
+        for key in self._resolvers:
+            if key not in self._values:
+                yield key
+
+    def __len__(self):
+        return len(self._values) + sum(1 for key in self._resolvers if key not in self._values)
+
+    def resolve(self, names):
+        """Compute the given variables now; names with no value or resolver are skipped"""
+        for name in names:
+            if name in self._resolvers:
+                self.get(name)
+
+    def resolved_names(self):
+        """Names whose values have been computed or were given up front"""
+        return frozenset(self._values)
+
+    def __repr__(self):
+        return f"LazyVariables(resolved={sorted(self._values)!r})"
+
+
+def format_field_names(template_text):
+    """Top-level variable names referenced by a str.format template"""
+    names = set()
+    for _, field_name, format_spec, _ in string.Formatter().parse(template_text):
+        if field_name:
+            root = FIELD_ROOT_PATTERN.split(field_name, 1)[0]
+            if root and not root.isdigit():
+                names.add(root)
+        if format_spec and '{' in format_spec:
+            names.update(format_field_names(format_spec))
+    return frozenset(names)
+
+
+def jinja_variable_names(environment, template_text):
+    """Variable names a Jinja template reads from its render context"""
+    return frozenset(meta.find_undeclared_variables(environment.parse(template_text)))
@@ -0,0 +1,238 @@
+"""
+Proposal Pipeline Module
+
+Runs one proposal request as explicit stages: load the template and the
+variable names it references, build the prompt variables, render the prompt,
+call the model and post-process its text. Each stage runs at most once per
+request and hands the next stage a read-only artifact, so no input file is
+loaded twice and each variable is computed at most once. Every stage is timed,
+and the timings are collected per process in PipelineStats.
+"""
+import threading
+import time
+
+from services.stream_processor import IncrementalPostProcessor
+
+
+STAGES = ('load_template', 'build_variables', 'render', 'generate', 'postprocess')
+
+
+class RenderedProposal:
+    """Output of the render stage
+
+    prompt is the full model prompt, or with sectioned the rendered template
+    whose TBD sections are generated one call each. postprocess(text) turns
+    the model's text into the final proposal text.
+    """
+
+    __slots__ = ('prompt', 'postprocess', 'sectioned')
+
+    def __init__(self, prompt, postprocess, sectioned=False):
+        self.prompt = prompt
+        self.postprocess = postprocess
+        self.sectioned = sectioned
+
+
+class PipelineStats:
+    """Per-stage timing totals for every pipeline run in this process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {name: {'count': 0, 'total_seconds': 0.0, 'max_seconds': 0.0, 'last_seconds': None}
+                        for name in STAGES}
+
+    def record(self, stage, seconds):
+        with self._lock:
+            stats = self._stages[stage]
+            stats['count'] += 1
+            stats['total_seconds'] += seconds
+            stats['max_seconds'] = max(stats['max_seconds'], seconds)
+            stats['last_seconds'] = seconds
+
+    def get_stats(self):
+        with self._lock:
+            result = {}
+            for name, stats in self._stages.items():
+                stats = dict(stats)
+                stats['avg_seconds'] = stats['total_seconds'] / stats['count'] if stats['count'] else None
+                result[name] = {key: round(value, 4) if isinstance(value, float) else value
+                                for key, value in stats.items()}
+            return result
+
+
+class ProposalPipeline:
+    """One request's stages, each computed once and memoized"""
+
+    def __init__(self, service, request_values, stats=None, artifacts=None, bypass_cache=False, cancel_event=None):
+        """
+        Args:
+            service (ProposalService): Provides the loading, rendering and model calls
+            request_values (dict): Form values for the request (rfp_type, district, ...)
+            stats (PipelineStats): Optional process-wide timing collector
+            artifacts (dict): Stage results that are already known, by stage name
+            bypass_cache (bool): Skip cached model responses
+            cancel_event (threading.Event): Stops the model calls once set
+        """
+        self.service = service
+        self.request_values = request_values
+        self.bypass_cache = bypass_cache
+        self.cancel_event = cancel_event
+        self.stats = stats
+        self.timings = {}
+        self._artifacts = dict(artifacts or {})
+
+    @property
+    def rfp_type(self):
+        return self.request_values.get('rfp_type', 'Extended Learning Opportunities Program')
+
+    def _stage(self, name, compute):
+        """Return a stage's artifact, computing and timing it on first use"""
+        if name not in self._artifacts:
+            started_at = time.perf_counter()
+            self._artifacts[name] = compute()
+            self._record(name, time.perf_counter() - started_at)
+        return self._artifacts[name]
+
+    def _record(self, name, seconds):
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+        if self.stats is not None:
+            self.stats.record(name, seconds)
+
+    def template(self):
+        """Stage 1: the RFP template and the variable names it references (None if unknown)"""
+        return self._stage('load_template', lambda: (
+            self.service.load_rfp_files(self.rfp_type),
+            self.service.template_variable_names(self.rfp_type)
+        ))
+
+    def is_yaml_jinja(self):
+        template_data, _ = self.template()
+        return isinstance(template_data, dict) and template_data.get('mode') == 'yaml_jinja'
+
+    def variables(self):
+        """Stage 2: read-only prompt variables built from the form and stage 1
+
+        Variables are computed lazily; the ones a traditional prompt references
+        are resolved here so their cost shows up in this stage.
+        """
+        self.template()
+
+        def build():
+            template_data, variable_names = self.template()
+            prompt_variables = self.service.prepare_prompt_variables(rfp_data=template_data, **self.request_values)
+            if variable_names and not self.is_yaml_jinja():
+                prompt_variables.resolve(variable_names)
+            return prompt_variables
+        return self._stage('build_variables', build)
+
+    def rendered(self):
+        """Stage 3: the prompt (or sectioned template) and its post-processing"""
+        def render():
+            template_data, _ = self.template()
+            prompt_variables = self.variables()
+            if self.is_yaml_jinja() and self.service.config.get('SECTION_PARALLEL_GENERATION'):
+                return RenderedProposal(
+                    self.service.render_yaml_jinja_template(template_data, prompt_variables),
+                    self.service.normalize_empty_lines,
+                    sectioned=True
+                )
+            prompt, postprocess = self.service.build_generation_prompt(template_data, prompt_variables)
+            return RenderedProposal(prompt, postprocess)
+        return self._stage('render', render)
+
+    def generated(self):
+        """Stage 4: the model's raw text"""
+        def generate():
+            rendered = self.rendered()
+            prompt_variables = self.variables()
+            if rendered.sectioned:
+                print(f"Generating proposal section by section using YAML+Jinja strategy for RFP type: {self.rfp_type}...")
+                return ''.join(self.service.iter_yaml_jinja_sections(rendered.prompt, prompt_variables,
+                                                                     bypass_cache=self.bypass_cache,
+                                                                     cancel_event=self.cancel_event))
+
+            strategy = "YAML+Jinja strategy" if self.is_yaml_jinja() else "Gemini model"
+            print(f"Generating proposal using {strategy} for RFP type: {self.rfp_type}...")
+            return self.service.call_gemini_with_fallback(rendered.prompt, bypass_cache=self.bypass_cache,
+                                                          cancel_event=self.cancel_event)
+        return self._stage('generate', generate)
+
+    def postprocessed(self):
+        """Stage 5: the final proposal text"""
+        return self._stage('postprocess', lambda: self.rendered().postprocess(self.generated()))
+
+    def proposal_text(self, raise_errors=False):
+        """Run every stage and return the proposal text
+
+        If generation fails the error message is returned instead, or with
+        raise_errors the exception is raised.
+        """
+        self.variables()
+        try:
+            # Earlier stages run first so each stage's time excludes the ones it depends on
+            self.rendered()
+            self.generated()
+            return self.postprocessed()
+        except Exception as e:
+            if raise_errors:
+                raise
+            if self.is_yaml_jinja():
+                error_text = f"An error occurred in YAML+Jinja generation: {e}"
+            else:
+                error_text = f"An error occurred while generating the proposal text: {e}"
+            print(error_text)
+            return error_text
+        finally:
+            self.log_timings()
+
+    def stream_text(self):
+        """Yield post-processed text as the model produces it
+
+        Generation and post-processing interleave here, so their time is
+        recorded separately as it is spent.
+        """
+        prompt_variables = self.variables()
+        rendered = self.rendered()
+        processor = IncrementalPostProcessor(rendered.postprocess)
+
+        if rendered.sectioned:
+            # Sections are generated concurrently; stream each one as soon as
+            # it and everything before it is done
+            print(f"Streaming proposal section by section for RFP type: {self.rfp_type}...")
+            chunks = self.service.iter_yaml_jinja_sections(rendered.prompt, prompt_variables,
+                                                           bypass_cache=self.bypass_cache,
+                                                           cancel_event=self.cancel_event)
+        else:
+            print(f"Streaming proposal using Gemini model for RFP type: {self.rfp_type}...")
+            chunks = self.service.stream_gemini_with_fallback(rendered.prompt, bypass_cache=self.bypass_cache,
+                                                              cancel_event=self.cancel_event)
+
+        generate_seconds = postprocess_seconds = 0.0
+        try:
+            started_at = time.perf_counter()
+            for chunk in chunks:
+                chunk_done_at = time.perf_counter()
+                generate_seconds += chunk_done_at - started_at
+                text = processor.feed(chunk)
+                started_at = time.perf_counter()
+                postprocess_seconds += started_at - chunk_done_at
+                if text:
+                    yield text
+                    started_at = time.perf_counter()
+
+            chunk_done_at = time.perf_counter()
+            generate_seconds += chunk_done_at - started_at
+            remaining_text = processor.flush()
+            postprocess_seconds += time.perf_counter() - chunk_done_at
+            if remaining_text:
+                yield remaining_text
+        finally:
+            self._record('generate', generate_seconds)
+            self._record('postprocess', postprocess_seconds)
+            self.log_timings()
+
+    def log_timings(self):
+        if self.timings:
+            print("Proposal pipeline timings: " + ", ".join(
+                f"{name}={self.timings[name] * 1000:.1f}ms" for name in STAGES if name in self.timings
+            ))
@@ -1,74 +1,103 @@
 """
 Proposal Generation Service Module
 """
+import json
+import math
 import os
 import re
+import threading
 import time
-import pandas as pd
+from io import BytesIO
 from datetime import date, datetime, timedelta
-from docx import Document
-from docx.shared import Inches, Pt
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-import google.generativeai as genai
-import yaml
-from jinja2 import Template
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import subprocess
 import platform
 
-from convert import MarkdownToDocxConverter
-from config.settings import RFP_TYPE_FILES
-import word_formatter
-
-
-class GeminiAPIManager:
-    """Manages Gemini API keys with smart switching and cooldown logic"""
-
-    def __init__(self, primary_key, alternate_key):
-        self.primary_key = primary_key
-        self.alternate_key = alternate_key
-        self.current_key = primary_key
-        self.is_using_alternate = False
-        self.last_switch_time = None
-        self.switch_cooldown_hours = 1
-
-    def can_switch_keys(self):
-        """Check if we can switch keys (not switched in last hour)"""
-        if self.last_switch_time is None:
-            return True
-
-        time_since_switch = datetime.now() - self.last_switch_time
-        return time_since_switch >= timedelta(hours=self.switch_cooldown_hours)
-
-    def switch_to_alternate_key(self):
-        """Switch to alternate API key if cooldown period has passed"""
-        if not self.can_switch_keys():
-            print(f"Cannot switch keys - last switch was less than {self.switch_cooldown_hours} hour(s) ago")
-            return False
-
-        if not self.is_using_alternate:
-            self.current_key = self.alternate_key
-            self.is_using_alternate = True
-            self.last_switch_time = datetime.now()
-            genai.configure(api_key=self.current_key)
-            print("Switched to alternate Gemini API key")
-            return True
-        else:
-            print("Already using alternate key")
-            return False
-
-    def get_current_key_info(self):
-        """Get info about current key usage"""
-        key_type = "ALTERNATE" if self.is_using_alternate else "PRIMARY"
-        cooldown_status = "Available" if self.can_switch_keys() else f"Cooldown until {self.last_switch_time + timedelta(hours=self.switch_cooldown_hours)}"
-        return f"Using {key_type} key. Switch {cooldown_status}"
-
-
-def convert_docx_to_pdf(docx_path, pdf_path):
-    """Cross-platform DOCX to PDF conversion"""
+from config.settings import RFP_TYPE_FILES, GEMINI_MODEL_NAME
+from services.gemini_pool import GeminiClientPool
+from services.gemini_scheduler import GeminiKeyScheduler, GeminiCapacityError
+from services.request_control import (
+    CANCEL_POLL_SECONDS, Deadline, DeadlineExceeded, RequestCancelled, RequestStats,
+    backoff_delay, check_cancelled, is_transient_error
+)
+from services.llm_cache import LLMResponseCache
+from services.single_flight import SingleFlight
+from services.template_registry import TemplateRegistry, create_jinja_environment
+from services.form_fields import rewrite_form_fields
+from services.overlay import OverlayMapping, freeze
+from services.prompt_variables import LazyVariables, format_field_names, jinja_variable_names
+from services.section_generator import SectionParallelGenerator
+from services.proposal_pipeline import PipelineStats, ProposalPipeline
+from services.pdf_converter import PdfConverterPool
+from services.job_service import JobService, JobQueueFullError
+
+# python-docx, pandas and NumPy are imported by the methods that use them so that
+# importing this module stays fast; the startup warmup imports them (DEFERRED_MODULES)
+
+# Context files shared by every prompt, by prompt variable name
+CONTEXT_FILES = {
+    'all_districts_info': 'district.csv',
+    'about_mstg': 'about_mstg.txt',
+    'about_minkh': 'about_minkh.txt',
+}
+
+# Logo shown in the header of every generated document, found from this file
+# so it doesn't depend on the working directory
+HEADER_LOGO_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                'static', 'assets', 'mstg_large_logo.png')
+
+# Company details used when the form leaves them out
+DEFAULT_COMPANY_INFO = freeze({
+    'company_name': 'Musical Instruments N Kids Hands (M.I.N.K.H.) - Music Science & Technology Group (MSTG)',
+    'representative_name': 'A.P. Moore, Program Coordinator',
+    'representative_title': 'Program Coordinator',
+    'company_email': 'aphilanda@musicsciencegroup.com',
+    'company_phone': '(216) 903-3756',
+    'company_address': '2150 Capitol Avenue Sacramento, CA 95816',
+})
+
+# Past-performance references filled into YAML+Jinja templates
+DEFAULT_REFERENCES = freeze([
+    {
+        'organization': 'Natomas Unified School District',
+        'contact_name': 'Program Administrator',
+        'phone': '(916) 567-5000',
+        'email': 'programs@natomas.net',
+        'dates_of_service': '2023-2024',
+        'description': 'Extended Learning Opportunities Program'
+    },
+    {
+        'organization': 'Sacramento City Unified School District',
+        'contact_name': 'Enrichment Coordinator',
+        'phone': '(916) 643-7400',
+        'email': 'enrichment@scusd.edu',
+        'dates_of_service': '2022-2023',
+        'description': 'Music & STEAM Integration Program'
+    },
+    {
+        'organization': 'Elk Grove Unified School District',
+        'contact_name': 'After School Programs Manager',
+        'phone': '(916) 686-7700',
+        'email': 'afterschool@egusd.net',
+        'dates_of_service': '2021-2022',
+        'description': 'Arts & Wellness Programs'
+    }
+])
+
+
+def convert_docx_to_pdf(docx_path, pdf_path, converter=None):
+    """Cross-platform DOCX to PDF conversion
+
+    With a PdfConverterPool whose LibreOffice is installed, the document is
+    converted by one of its long-lived instances instead of a new process.
+    """
     try:
         system = platform.system().lower()
 
-        if system == "linux":
+        if converter is not None and converter.available and system != "windows":
+            converter.convert(docx_path, pdf_path)
+
+        elif system == "linux":
             # Use LibreOffice for Linux
             cmd = [
                 'libreoffice', '--headless', '--convert-to', 'pdf',
@@ -127,70 +156,363 @@ class ProposalService:
 
     def __init__(self, app_config):
         self.config = app_config
+        self.templates = TemplateRegistry(
+            app_config['INPUT_FILES_FOLDER'],
+            check_interval=app_config.get('TEMPLATE_CHECK_INTERVAL_SECONDS', 2.0)
+        )
+        self.jinja_env = create_jinja_environment(
+            app_config['INPUT_FILES_FOLDER'],
+            os.path.join(app_config['STATE_FOLDER'], 'jinja_bytecode') if app_config.get('JINJA_BYTECODE_CACHE', True) else None
+        )
         self._configure_genai()
+        self.response_cache = LLMResponseCache(app_config)
+        # Fake responses must never be served as real Gemini output
+        self.cache_model_name = f"fake-{GEMINI_MODEL_NAME}" if app_config.get('USE_FAKE_LLM') else GEMINI_MODEL_NAME
+        self.request_stats = RequestStats()
+        self.single_flight = None
+        if app_config.get('SINGLE_FLIGHT_ENABLED', True):
+            self.single_flight = SingleFlight(
+                os.path.join(app_config['STATE_FOLDER'], 'single_flight'),
+                wait_timeout=app_config.get('GEMINI_DEADLINE_SECONDS', 120.0),
+                result_ttl=app_config.get('SINGLE_FLIGHT_RESULT_TTL_SECONDS', 60)
+            )
+        # Runs hedged calls so the caller can stop waiting on a slow one
+        self._hedge_executor = ThreadPoolExecutor(
+            max_workers=max(2, 2 * app_config.get('SECTION_CONCURRENCY', 4)),
+            thread_name_prefix='gemini-hedge'
+        )
+        self.section_generator = SectionParallelGenerator(
+            max_concurrency=app_config.get('SECTION_CONCURRENCY', 4),
+            max_heading_level=app_config.get('SECTION_MAX_HEADING_LEVEL', 2)
+        )
+        self.pipeline_stats = PipelineStats()
+        self.pdf_converter = PdfConverterPool(
+            os.path.join(app_config['STATE_FOLDER'], 'libreoffice_profiles'),
+            size=app_config.get('PDF_POOL_SIZE', 2),
+            timeout=app_config.get('PDF_CONVERSION_TIMEOUT_SECONDS', 60.0),
+            recycle_after=app_config.get('PDF_RECYCLE_AFTER', 50),
+            binary=app_config.get('LIBREOFFICE_BINARY') or None,
+            python=app_config.get('LIBREOFFICE_PYTHON') or None
+        )
+        # PDFs render in the background, one job per converter instance; the
+        # job id is the PDF's filename so any worker can report its status
+        self.pdf_jobs = JobService(
+            app_config,
+            name='pdf',
+            max_workers=app_config.get('PDF_POOL_SIZE', 2),
+            max_pending=app_config.get('PDF_QUEUE_SIZE', 16)
+        )
+        # Longest a PDF job can take: its own conversion and wait for an
+        # instance, after every job that can be queued ahead of it
+        self.pdf_job_max_age = self.pdf_converter.timeout * (
+            2 + math.ceil(self.pdf_jobs.max_pending / self.pdf_jobs.max_workers))
+        # Serialized letterhead document every proposal starts from, as
+        # (logo file signature, .docx bytes); rebuilt when the logo changes
+        self.letterhead_check_interval = app_config.get('TEMPLATE_CHECK_INTERVAL_SECONDS', 2.0)
+        self._letterhead = None
+        self._letterhead_checked_at = 0.0
+        self._letterhead_lock = threading.Lock()
     
     def _configure_genai(self):
-        """Configure Google Generative AI with fallback API key management"""
-        primary_key = self.config.get('GEMINI_API_KEY')
-        alternate_key = self.config.get('GEMINI_API_KEY_ALTERNATE')
-
-        if primary_key and alternate_key:
-            self.api_manager = GeminiAPIManager(primary_key, alternate_key)
-            genai.configure(api_key=primary_key)
-            print("Gemini API configured with primary key and fallback enabled")
+        """Set up per-key Gemini clients and the key scheduler"""
+        if self.config.get('USE_FAKE_LLM'):
+            print("Using local fake LLM - Gemini API calls are disabled")
+            api_keys = {'primary': None}
         else:
-            print("Warning: Both GEMINI_API_KEY and GEMINI_API_KEY_ALTERNATE are required for fallback functionality")
-            if primary_key:
-                genai.configure(api_key=primary_key)
-                self.api_manager = None
+            api_keys = {}
+            configured_keys = [self.config.get('GEMINI_API_KEY'), self.config.get('GEMINI_API_KEY_ALTERNATE')]
+            configured_keys += self.config.get('GEMINI_EXTRA_API_KEYS', [])
+            for index, key in enumerate(configured_keys):
+                if key and key not in api_keys.values():
+                    api_keys[self._key_name(index)] = key
+
+            if len(api_keys) > 1:
+                print(f"Gemini API configured with {len(api_keys)} keys and load balancing enabled")
+            else:
+                print("Warning: Only one Gemini API key configured - no fallback available")
+
+        self.client_pool = GeminiClientPool(
+            GEMINI_MODEL_NAME,
+            api_keys,
+            max_idle_per_key=self.config.get('GEMINI_POOL_SIZE', 8),
+            use_fake=self.config.get('USE_FAKE_LLM', False),
+            fake_latency_seconds=self.config.get('FAKE_LLM_LATENCY_SECONDS', 0.0)
+        )
+        self.key_scheduler = GeminiKeyScheduler(
+            self.client_pool.key_names,
+            rpm_limit=self.config.get('GEMINI_RPM_LIMIT', 15),
+            tpm_limit=self.config.get('GEMINI_TPM_LIMIT', 1000000),
+            weights=self._parse_key_weights(self.client_pool.key_names),
+            queue_timeout=self.config.get('GEMINI_QUEUE_TIMEOUT_SECONDS', 20.0),
+            quota_cooldown=self.config.get('GEMINI_QUOTA_COOLDOWN_SECONDS', 60.0),
+            auth_cooldown=self.config.get('GEMINI_AUTH_COOLDOWN_SECONDS', 3600.0)
+        )
+
+    @staticmethod
+    def _key_name(index):
+        """Pool name of the index-th configured key: primary, alternate, key3, key4, ..."""
+        return ('primary', 'alternate')[index] if index < 2 else f"key{index + 1}"
+
+    def _parse_key_weights(self, key_names):
+        """Map key names to the weights listed in GEMINI_KEY_WEIGHTS (default 1.0)"""
+        weights = {}
+        raw_weights = [w.strip() for w in str(self.config.get('GEMINI_KEY_WEIGHTS', '')).split(',') if w.strip()]
+        for key_name, raw_weight in zip(key_names, raw_weights):
+            try:
+                weights[key_name] = float(raw_weight)
+            except ValueError:
+                print(f"Warning: Invalid weight '{raw_weight}' for Gemini {key_name} key, using 1.0")
+        return weights
+
+    def _classify_error(self, error):
+        """Return 'quota' or 'auth' if another key may succeed, 'transient' if a retry may, else None"""
+        error_message = str(error).lower()
+        if any(keyword in error_message for keyword in [
+            'rate limit', 'quota', 'resource exhausted', 'too many requests', 'limit exceeded'
+        ]):
+            return 'quota'
+        if any(keyword in error_message for keyword in [
+            'api key not valid', 'api_key_invalid', 'invalid api key', 'api key expired', 'authentication failed'
+        ]):
+            return 'auth'
+        if is_transient_error(error):
+            return 'transient'
+        return None
+
+    @staticmethod
+    def _response_tokens(response):
+        """Total tokens reported by a non-streamed response, if available"""
+        usage = getattr(response, 'usage_metadata', None)
+        total_tokens = getattr(usage, 'total_token_count', None)
+        return total_tokens or None
+
+    def _generate_with_fallback(self, prompt, cancel_event=None, **generate_kwargs):
+        """Run generate_content on the key with the most headroom within the request deadline
+
+        Quota and key errors fail over to another key, transient errors are
+        retried with exponential backoff and jitter, and slow non-streamed calls
+        may be hedged on a second key. Raises RequestCancelled once cancel_event
+        is set.
+        """
+        deadline = Deadline(self.config.get('GEMINI_DEADLINE_SECONDS', 120.0))
+        estimated_tokens = self.key_scheduler.estimate_tokens(prompt)
+        tried_keys = set()
+        retries = 0
+
+        while True:
+            check_cancelled(cancel_event)
+            deadline.check()
+
+            # Waits briefly when every remaining key is saturated
+            key_name = self.key_scheduler.acquire(estimated_tokens, exclude=tried_keys, timeout=deadline.remaining())
 
-    def call_gemini_with_fallback(self, prompt):
-        """Call Gemini API with automatic fallback to alternate key on rate limit errors"""
-        model = genai.GenerativeModel('gemini-2.0-flash')
+            try:
+                if self.config.get('GEMINI_HEDGING') and not generate_kwargs.get('stream'):
+                    return self._generate_hedged(key_name, prompt, estimated_tokens, deadline, cancel_event, generate_kwargs)
+                return self._generate_on_key(key_name, prompt, estimated_tokens, deadline, generate_kwargs)
+
+            except (RequestCancelled, DeadlineExceeded) as e:
+                self.request_stats.count('cancelled' if isinstance(e, RequestCancelled) else 'deadline_exceeded')
+                raise
+
+            except Exception as e:
+                print(f"Gemini API error on {key_name} key: {e}")
+                error_kind = self._classify_error(e)
+
+                if error_kind in ('quota', 'auth'):
+                    tried_keys.add(key_name)
+                    self.key_scheduler.report_error(key_name, error_kind)
+                    if len(tried_keys) >= len(self.client_pool.key_names):
+                        raise e
+                    print("Detected API error that may be resolved with another key. Retrying...")
+                    continue
+
+                if error_kind == 'transient' and retries < self.config.get('GEMINI_MAX_RETRIES', 2):
+                    delay = backoff_delay(retries,
+                                          self.config.get('GEMINI_RETRY_BASE_SECONDS', 1.0),
+                                          self.config.get('GEMINI_RETRY_MAX_SECONDS', 10.0))
+                    if delay >= deadline.remaining():
+                        raise e
+                    retries += 1
+                    self.request_stats.count('retries')
+                    print(f"Transient Gemini error, retry {retries} in {delay:.1f}s...")
+                    # Wakes early if the client goes away during the backoff
+                    if cancel_event is not None:
+                        cancel_event.wait(delay)
+                    else:
+                        time.sleep(delay)
+                    continue
 
-        try:
-            print(f"Attempting Gemini API call with {'alternate' if hasattr(self, 'api_manager') and self.api_manager.is_using_alternate else 'primary'} key...")
-            response = model.generate_content(prompt)
-            return response.text
+                raise e
 
-        except Exception as e:
-            error_message = str(e).lower()
-            print(f"Gemini API error: {e}")
+    def _generate_on_key(self, key_name, prompt, estimated_tokens, deadline, generate_kwargs):
+        """One generate_content call on the named key, bounded by the deadline"""
+        print(f"Attempting Gemini API call with {key_name} key...")
+        started_at = time.monotonic()
 
-            # Check if it's an error that should trigger fallback (rate limits, invalid keys, etc.)
-            should_try_fallback = any(keyword in error_message for keyword in [
-                'rate limit', 'quota', 'resource exhausted', 'too many requests', 'limit exceeded',
-                'api key not valid', 'api_key_invalid', 'invalid api key', 'api key expired', 'authentication failed'
-            ])
+        with self.client_pool.checkout(key_name) as model:
+            response = model.generate_content(
+                prompt, request_options={'timeout': max(1.0, deadline.remaining())}, **generate_kwargs
+            )
 
-            if should_try_fallback and hasattr(self, 'api_manager') and self.api_manager:
-                print("Detected API error that may be resolved with alternate key. Attempting to switch...")
+        # Streamed responses only report usage and full latency once consumed
+        if not generate_kwargs.get('stream'):
+            self.request_stats.record_latency(time.monotonic() - started_at)
+            self.key_scheduler.record_usage(key_name, estimated_tokens, self._response_tokens(response))
+        return response
+
+    def _hedge_delay(self):
+        """Seconds to wait before hedging: the observed latency percentile once known"""
+        observed = self.request_stats.percentile(self.config.get('GEMINI_HEDGE_PERCENTILE', 95))
+        return observed if observed is not None else self.config.get('GEMINI_HEDGE_DELAY_SECONDS', 15.0)
+
+    def _generate_hedged(self, key_name, prompt, estimated_tokens, deadline, cancel_event, generate_kwargs):
+        """Fire a duplicate call on another key if the first is slow; first answer wins
+
+        Calls still in flight when this returns or raises are abandoned.
+        """
+        futures = {
+            self._hedge_executor.submit(self._generate_on_key, key_name, prompt, estimated_tokens,
+                                        deadline, generate_kwargs): key_name
+        }
+        pending = set(futures)
+        hedge_at = time.monotonic() + self._hedge_delay()
+        first_error = None
 
-                if self.api_manager.switch_to_alternate_key():
-                    try:
-                        print("Retrying with alternate API key...")
-                        model = genai.GenerativeModel('gemini-2.0-flash')
-                        response = model.generate_content(prompt)
-                        return response.text
+        try:
+            while pending:
+                check_cancelled(cancel_event)
+                deadline.check()
 
-                    except Exception as fallback_error:
-                        print(f"Alternate API key also failed: {fallback_error}")
-                        raise fallback_error
+                hedge_pending = len(futures) == 1 and len(self.client_pool.key_names) > 1
+                wait_seconds = min(deadline.remaining(), CANCEL_POLL_SECONDS)
+                if hedge_pending:
+                    wait_seconds = min(wait_seconds, max(0.0, hedge_at - time.monotonic()))
 
-                else:
-                    print("Could not switch to alternate key (cooldown active or already using alternate)")
-                    raise e
+                done, pending = wait(pending, timeout=wait_seconds, return_when=FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        response = future.result()
+                    except Exception as e:
+                        first_error = first_error or e
+                        continue
+                    if futures[future] != key_name:
+                        self.request_stats.count('hedges_won')
+                        print(f"Hedged call on {futures[future]} key answered first")
+                    return response
+
+                if hedge_pending and pending and time.monotonic() >= hedge_at:
+                    try:
+                        # Only hedge on a key with free capacity right now
+                        hedge_key = self.key_scheduler.acquire(estimated_tokens, exclude={key_name}, timeout=0)
+                    except GeminiCapacityError:
+                        hedge_key = None
+                    if hedge_key:
+                        print(f"Gemini call on {key_name} key is slow, hedging on {hedge_key} key...")
+                        self.request_stats.count('hedges_sent')
+                        hedge_future = self._hedge_executor.submit(self._generate_on_key, hedge_key, prompt,
+                                                                   estimated_tokens, deadline, generate_kwargs)
+                        futures[hedge_future] = hedge_key
+                        pending.add(hedge_future)
+                    else:
+                        hedge_at = float('inf')
+
+            raise first_error
+        finally:
+            self._abandon_calls(futures, estimated_tokens)
+
+    def _abandon_calls(self, futures, estimated_tokens):
+        """Stop waiting on the hedged calls that have not finished
+
+        A call still queued for a hedge thread is cancelled and its key's
+        reservation refunded. One already sent cannot be recalled; it finishes
+        on its own and records its real token usage like any other call.
+        """
+        for future, key_name in futures.items():
+            if future.done():
+                continue
+            self.request_stats.count('abandoned_calls')
+            if future.cancel():
+                self.key_scheduler.release(key_name, estimated_tokens)
+
+    def call_gemini_with_fallback(self, prompt, bypass_cache=False, cancel_event=None):
+        """Call Gemini API with automatic fallback to alternate key on rate limit errors
+
+        Responses are cached by model and prompt; bypass_cache forces a fresh call
+        (the fresh response still replaces the cached one). Concurrent calls with
+        the same prompt share one upstream call.
+        """
+        cache_key = self.response_cache.make_key(self.cache_model_name, prompt)
+        if not bypass_cache:
+            cached_text = self.response_cache.get(cache_key)
+            if cached_text is not None:
+                print("Using cached Gemini response")
+                return cached_text
+
+        def fetch():
+            response_text = self._generate_with_fallback(prompt, cancel_event=cancel_event).text
+            self.response_cache.put(cache_key, self.cache_model_name, response_text)
+            return response_text
+
+        if self.single_flight is None:
+            return fetch()
+        return self.single_flight.do(cache_key, fetch, cancel_event=cancel_event)
+
+    def stream_gemini_with_fallback(self, prompt, bypass_cache=False, cancel_event=None):
+        """Yield text chunks from Gemini's streamed generation as they arrive
+
+        Stops reading (and cancels the upstream stream) once cancel_event is set
+        or the caller closes the generator.
+        """
+        cache_key = self.response_cache.make_key(self.cache_model_name, prompt)
+        if not bypass_cache:
+            cached_text = self.response_cache.get(cache_key)
+            if cached_text is not None:
+                print("Using cached Gemini response")
+                yield cached_text
+                return
+
+        response = self._generate_with_fallback(prompt, cancel_event=cancel_event, stream=True)
+        chunks = []
 
-            else:
-                # Re-raise the original exception if it's not a rate limit error or no fallback available
-                raise e
+        try:
+            for chunk in response:
+                check_cancelled(cancel_event)
+                try:
+                    text = chunk.text
+                except ValueError:
+                    # Chunks carrying only finish metadata have no text parts
+                    continue
+                if text:
+                    chunks.append(text)
+                    yield text
+        except (RequestCancelled, GeneratorExit):
+            self.request_stats.count('cancelled')
+            self._cancel_stream(response)
+            raise
+
+        # Only cache complete responses
+        self.response_cache.put(cache_key, self.cache_model_name, ''.join(chunks))
+
+    @staticmethod
+    def _cancel_stream(response):
+        """Best-effort cancel of an upstream streaming call nobody is reading any more"""
+        iterator = getattr(response, '_iterator', None)
+        cancel = getattr(iterator, 'cancel', None)
+        if callable(cancel):
+            try:
+                cancel()
+            except Exception as e:
+                print(f"Warning: Could not cancel Gemini stream: {e}")
 
     def get_api_status(self):
         """Get current API key status information"""
-        if hasattr(self, 'api_manager') and self.api_manager:
-            return self.api_manager.get_current_key_info()
-        else:
-            return "Using single API key (no fallback configured)"
+        utilization = self.key_scheduler.get_utilization()['keys']
+        return "; ".join(
+            f"{name}: {usage['requests_last_minute']}/{usage['rpm_limit']} rpm"
+            + (f" (resting {usage['cooldown_remaining_seconds']:.0f}s)" if usage['cooldown_remaining_seconds'] else "")
+            for name, usage in utilization.items()
+        )
 
     def load_rfp_files(self, rfp_type):
         """Load the appropriate prompt and requirements files based on RFP type."""
@@ -204,17 +526,9 @@ class ProposalService:
             return self.load_yaml_jinja_template(files)
 
         try:
-            # Load requirements file
-            requirements_path = os.path.join(self.config['INPUT_FILES_FOLDER'], files["requirements"])
-            with open(requirements_path, 'r', encoding='utf-8') as f:
-                print(f"reading from requirements_path: {requirements_path} ")
-                requirements_context = f.read()
-
-            # Load prompt file
-            prompt_path = os.path.join(self.config['INPUT_FILES_FOLDER'], files["prompt"])
-            with open(prompt_path, 'r', encoding='utf-8') as f:
-                print(f"reading from prompt_path: {prompt_path} ")
-                prompt_template = f.read()
+            # Load requirements and prompt files (served from memory unless changed on disk)
+            requirements_context = self.templates.read_text(files["requirements"])
+            prompt_template = self.templates.read_text(files["prompt"])
 
             return prompt_template, requirements_context
 
@@ -222,10 +536,8 @@ class ProposalService:
             print(f"Warning: Could not load RFP files for {rfp_type}: {e}")
             # Fallback to default files
             try:
-                with open(os.path.join(self.config['INPUT_FILES_FOLDER'], 'proposal_prompt.txt'), 'r', encoding='utf-8') as f:
-                    prompt_template = f.read()
-                with open(os.path.join(self.config['INPUT_FILES_FOLDER'], 'natomas_school_district_rfp_requirements.txt'), 'r', encoding='utf-8') as f:
-                    requirements_context = f.read()
+                prompt_template = self.templates.read_text('proposal_prompt.txt')
+                requirements_context = self.templates.read_text('natomas_school_district_rfp_requirements.txt')
                 return prompt_template, requirements_context
             except FileNotFoundError:
                 raise ValueError(f"Could not load default prompt files for RFP type: {rfp_type}")
@@ -233,51 +545,128 @@ class ProposalService:
     def load_yaml_jinja_template(self, files):
         """Load YAML configuration and Jinja template for structured RFP generation"""
         try:
-            # Load YAML configuration
-            yaml_path = os.path.join(self.config['INPUT_FILES_FOLDER'], files["yaml"])
-            with open(yaml_path, 'r', encoding='utf-8') as f:
-                print(f"reading from yaml_path: {yaml_path}")
-                yaml_config = yaml.safe_load(f)
+            # Load YAML configuration (parsed once per file version; read-only)
+            yaml_config = self.templates.load_yaml(files["yaml"])
 
             # Load Jinja template
-            jinja_path = os.path.join(self.config['INPUT_FILES_FOLDER'], files["jinja"])
-            with open(jinja_path, 'r', encoding='utf-8') as f:
-                print(f"reading from jinja_path: {jinja_path}")
-                jinja_template = f.read()
+            jinja_template = self.templates.read_text(files["jinja"])
 
             # Return a dictionary that indicates YAML+Jinja mode
             return {
                 'mode': 'yaml_jinja',
                 'yaml_config': yaml_config,
-                'jinja_template': jinja_template
+                'jinja_template': jinja_template,
+                'jinja_name': files["jinja"],
+                # Top-level YAML vars the template reads (found once per template version)
+                'template_variables': self.templates.load_parsed(
+                    files["jinja"], 'variables', lambda text: jinja_variable_names(self.jinja_env, text)
+                )
             }
 
         except FileNotFoundError as e:
             print(f"Warning: Could not load YAML/Jinja files: {e}")
             raise ValueError(f"Could not load YAML/Jinja template files: {e}")
     
+    def template_variable_names(self, rfp_type):
+        """Variables an RFP type's template references, or None if its template can't be read
+
+        Found by static analysis once per template file version: the str.format
+        fields of a traditional prompt, or the YAML vars a Jinja template reads.
+        """
+        files = RFP_TYPE_FILES.get(rfp_type, RFP_TYPE_FILES["Extended Learning Opportunities Program"])
+        try:
+            if 'jinja' in files:
+                return self.templates.load_parsed(
+                    files['jinja'], 'variables', lambda text: jinja_variable_names(self.jinja_env, text)
+                )
+            return self.templates.load_parsed(files['prompt'], 'variables', format_field_names)
+        except FileNotFoundError:
+            return None
+
+    def warm(self):
+        """Load templates and context files and build the letterhead before the first request"""
+        self.warm_templates()
+        self.load_context_files()
+        self.get_letterhead_template()
+
+    def warm_templates(self):
+        """Load, parse and compile every configured template so the first request doesn't pay for it"""
+        for rfp_type, files in RFP_TYPE_FILES.items():
+            try:
+                self.load_rfp_files(rfp_type)
+                self.template_variable_names(rfp_type)
+                if 'jinja' in files:
+                    self.jinja_env.get_template(files['jinja'])
+            except Exception as e:
+                print(f"Warning: Could not precompile template for {rfp_type}: {e}")
+
     def load_context_files(self):
         """Load common context files"""
         context_files = {}
-        
-        try:
-            with open(os.path.join(self.config['INPUT_FILES_FOLDER'], 'district.csv'), 'r', encoding='utf-8') as f:
-                context_files['all_districts_info'] = f.read()
 
-            with open(os.path.join(self.config['INPUT_FILES_FOLDER'], 'about_mstg.txt'), 'r', encoding='utf-8') as f:
-                context_files['about_mstg'] = f.read()
+        for key, filename in CONTEXT_FILES.items():
+            try:
+                context_files[key] = self._read_context_file(filename)
+            except KeyError:
+                pass
 
-            with open(os.path.join(self.config['INPUT_FILES_FOLDER'], 'about_minkh.txt'), 'r', encoding='utf-8') as f:
-                context_files['about_minkh'] = f.read()
-                
+        return context_files
+
+    def _read_context_file(self, filename):
+        """Read one context file; a missing file raises KeyError so its variable counts as unset"""
+        try:
+            return self.templates.read_text(filename)
         except FileNotFoundError as e:
             print(f"Warning: Could not load context file: {e}")
-            
-        return context_files
+            raise KeyError(filename) from e
     
+    def get_header_logo(self):
+        """Header logo image bytes (None if the file is missing)"""
+        if not os.path.exists(HEADER_LOGO_PATH):
+            return None
+        with open(HEADER_LOGO_PATH, 'rb') as f:
+            return f.read()
+
+    @staticmethod
+    def _header_logo_signature():
+        """Modification time and size of the header logo, or None if it is missing"""
+        try:
+            stat = os.stat(HEADER_LOGO_PATH)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def get_letterhead_template(self):
+        """Serialized base .docx with the letterhead header, its logo and the styles in place
+
+        Built once per process (in the gunicorn master when the app is
+        preloaded) and rebuilt only when the logo file changes, checked at most
+        once per TEMPLATE_CHECK_INTERVAL_SECONDS.
+        """
+        now = time.monotonic()
+        letterhead = self._letterhead
+        if letterhead is not None and now - self._letterhead_checked_at < self.letterhead_check_interval:
+            return letterhead[1]
+
+        with self._letterhead_lock:
+            signature = self._header_logo_signature()
+            if self._letterhead is None or self._letterhead[0] != signature:
+                from docx import Document
+
+                document = Document()
+                self.create_document_header(document)
+                buffer = BytesIO()
+                document.save(buffer)
+                self._letterhead = (signature, buffer.getvalue())
+                print(f"Built letterhead template ({len(self._letterhead[1]):,} bytes)")
+            self._letterhead_checked_at = now
+            return self._letterhead[1]
+
     def create_document_header(self, document):
         """Add a pre-defined header to the document"""
-        LOGO_PATH = 'static/assets/mstg_large_logo.png'
+        from docx.enum.text import WD_ALIGN_PARAGRAPH
+        from docx.shared import Inches, Pt
+
         ADDRESS_LINES = [
             ("Musical Instruments N Kids Hands", True, 8),
             ("Music Science & Technology Group", True, 8),
@@ -299,8 +688,9 @@ class ProposalService:
         logo_paragraph = logo_cell.paragraphs[0]
         logo_run = logo_paragraph.add_run()
         
-        if os.path.exists(LOGO_PATH):
-            logo_run.add_picture(LOGO_PATH, height=Inches(0.75))
+        logo = self.get_header_logo()
+        if logo:
+            logo_run.add_picture(BytesIO(logo), height=Inches(0.75))
 
         address_cell = header_table.cell(0, 1)
         address_paragraph = address_cell.paragraphs[0]
@@ -318,48 +708,20 @@ class ProposalService:
 
     def fill_form_fields(self, text, prompt_variables):
         """Fill in form fields with actual company information and add signature lines"""
-        # Replace underscored form fields with actual data
-        replacements = {
-            r'\*\*Company Name:\*\* _{10,}': f"**Company Name:** {prompt_variables.get('company_name', 'Musical Instruments N Kids Hands (M.I.N.K.H.) - Music Science & Technology Group (MSTG)')}",
-            r'\*\*Authorized Representative Name:\*\* _{10,}': f"**Authorized Representative Name:** {prompt_variables.get('representative_name', 'A.P. Moore, Program Coordinator')}",
-            r'\*\*Title:\*\* _{10,}': f"**Title:** {prompt_variables.get('representative_title', 'Program Coordinator')}",
-            r'\*\*Email:\*\* _{10,}': f"**Email:** {prompt_variables.get('company_email', 'aphilanda@musicsciencegroup.com')}",
-            r'\*\*Phone:\*\* _{10,}': f"**Phone:** {prompt_variables.get('company_phone', '(216) 903-3756')}",
-            r'\*\*Address:\*\* _{10,}': f"**Address:** {prompt_variables.get('company_address', '2150 Capitol Avenue Sacramento, CA 95816')}",
-            r'\*\*Authorized Signature:\*\* _{10,}': f"**Authorized Signature:** {prompt_variables.get('representative_name', 'A.P. Moore, Program Coordinator')}",
-            r'\*\*Date:\*\* _{10,}': f"**Date:** {prompt_variables.get('today', date.today())}"
+        company = {key: prompt_variables.get(key, default) for key, default in DEFAULT_COMPANY_INFO.items()}
+        field_values = {
+            'Company Name': company['company_name'],
+            'Authorized Representative Name': company['representative_name'],
+            'Title': company['representative_title'],
+            'Email': company['company_email'],
+            'Phone': company['company_phone'],
+            'Address': company['company_address'],
+            'Authorized Signature': company['representative_name'],
+            'Date': prompt_variables.get('today', date.today())
         }
 
-        for pattern, replacement in replacements.items():
-            text = re.sub(pattern, replacement, text)
-
-        # Add signature lines for form fields that might have been filled by AI
-        signature_patterns = {
-            # Pattern: "I, Name, Title" -> "I, Name _________________________, Title _______________________"
-            r'I, ([^,]+), ([^\n]+)\n\(Name\)\s+\(Title\)': r'I, \1 _________________________, \2 _______________________  \n(Name)                                   (Title)',
-
-            # Pattern: "Of Company Name hereby certify:" -> "Of Company Name ________________________________ hereby certify:"
-            r'Of ([^\n]+) hereby certify:\n\(Company Name\)': r'Of \1 ______________________________________ hereby certify:  \n(Company Name)',
-
-            # Pattern: "**Signature:** Name" -> "**Signature:** ____________________________"
-            r'\*\*Signature:\*\* ([^\n]+)': r'**Signature:** ____________________________',
-
-            # Pattern: "**Authorized Signature:** Name" -> "**Authorized Signature (Disclosee):** ____________________________"
-            r'\*\*Authorized Signature \(Disclosee\):\*\* ([^\n]+)': r'**Authorized Signature (Disclosee):** ____________________________',
-
-            # Pattern: "**Date:** date" -> "**Date:** _____________"
-            r'\*\*Date:\*\* [0-9]{4}-[0-9]{2}-[0-9]{2}': r'**Date:** _____________',
-            r'\*\*Date:\*\* [^\n]+\d{4}': r'**Date:** _____________',
-
-            # Pattern: "**Initial Here:** letters" -> "**Initial Here:** ____"
-            r'\*\*Initial Here:\*\* ([A-Z]+)': r'**Initial Here:** ____',
-        }
-
-        # Apply signature line patterns
-        for pattern, replacement in signature_patterns.items():
-            text = re.sub(pattern, replacement, text)
-
-        return text
+        # One line-oriented pass with precompiled rules (see services/form_fields.py)
+        return rewrite_form_fields(text, field_values)
     
     def clean_and_format_currency(self, value, default="$0.00"):
         """Clean and format currency values"""
@@ -382,291 +744,278 @@ class ProposalService:
             print(f"Warning: Invalid currency value received: {value}. Error: {e}. Defaulting to {default}.")
             return default
     
-    def prepare_prompt_variables(self, **kwargs):
-        """Prepare variables for the prompt template"""
-        # Load context files
-        context_files = self.load_context_files()
-        
-        # Clean and format financial values
-        formatted_cost_proposal = self.clean_and_format_currency(kwargs.get('cost_proposal'))
-
-        # Calculate actual cost per student based on fixed program structure
-        # Program: 439 students, 7 weeks, $75,000 total cost
-        ##program_total_cost = 75000.00
-        ##total_students = 439
-        ##actual_cost_per_student = program_total_cost / total_students if total_students > 0 else 0
-
-        # Use calculated value or form value, prefer calculated
-        cost_per_student_value = kwargs.get('cost_per_student')
-        if cost_per_student_value and float(str(cost_per_student_value).replace('$', '').replace(',', '')) > 0:
-            formatted_cost_per_student = self.clean_and_format_currency(cost_per_student_value)
-        else:
-            formatted_cost_per_student = self.clean_and_format_currency("0")
-
-        formatted_daily_cost = self.clean_and_format_currency(kwargs.get('daily_cost'))
-        formatted_weekly_cost = self.clean_and_format_currency(kwargs.get('weekly_cost'))
+    def prepare_prompt_variables(self, rfp_data=None, context_files=None, **kwargs):
+        """Prepare variables for the prompt template
+
+        Returns a LazyVariables mapping: form values are stored as given and
+        everything derived from them (currency, dates, context files, RFP
+        requirements) is computed the first time a template reads it. rfp_data
+        and context_files are the already loaded RFP template and context
+        files; they are loaded on demand when not given.
+        """
+        rfp_type = kwargs.get('rfp_type', 'Extended Learning Opportunities Program')
+        district = kwargs.get('district', 'N/A')
 
         # Debug output
         print(f"DEBUG: cost_per_student from form: {kwargs.get('cost_per_student')}")
-        print(f"DEBUG: formatted_cost_per_student: {formatted_cost_per_student}")
         print(f"DEBUG: daily_cost from form: {kwargs.get('daily_cost')}")
         print(f"DEBUG: weekly_cost from form: {kwargs.get('weekly_cost')}")
         print(f"DEBUG: cost_per_school from form: {kwargs.get('cost_per_school')}")
         print(f"DEBUG: cost_proposal from form: {kwargs.get('cost_proposal')}")
-        
-        # Prepare school locations
-        selected_schools = kwargs.get('selected_schools', [])
+
+        # Values taken straight from the form
+        values = {
+            'district': district,
+            'rfp_type': rfp_type,
+            'today': date.today(),
+            'days_per_week': kwargs.get('days_per_week', 'N/A'),
+            'num_weeks': kwargs.get('num_weeks', 'N/A'),
+            'hours_per_day': kwargs.get('hours_per_day', '3'),
+            'total_students': kwargs.get('total_students', 'N/A'),
+            'client': f"{district} School District",
+            'project': {rfp_type},
+            'services': "Music Integration, S.T.E.A.M. Education, Wellness Programs, Student Engagement Activities",
+            'benefits': "Enhanced Student Engagement, Improved Academic Performance, Increased Wellness, Community Involvement",
+            'cta': "We look forward to the opportunity to collaborate and make a meaningful impact together.",
+        }
+        values['year'] = values['today'].year
+
+        # Company information
+        values.update((key, kwargs.get(key, default)) for key, default in DEFAULT_COMPANY_INFO.items())
+
+        # Derived values, computed only when a template reads them
+        resolvers = {
+            # Clean and format financial values
+            'formatted_cost_proposal': lambda v: self.clean_and_format_currency(kwargs.get('cost_proposal')),
+            'formatted_cost_per_student': lambda v: self._format_cost_per_student(kwargs.get('cost_per_student')),
+            'formatted_daily_cost': lambda v: self.clean_and_format_currency(kwargs.get('daily_cost')),
+            'formatted_weekly_cost': lambda v: self.clean_and_format_currency(kwargs.get('weekly_cost')),
+            'formatted_cost_per_school': lambda v: self.clean_and_format_currency(kwargs.get('cost_per_school')),
+            'school_locations': lambda v: self._format_school_locations(kwargs.get('selected_schools', []),
+                                                                       kwargs.get('selected_schools_list')),
+            'program_dates': lambda v: self._format_program_dates(kwargs.get('program_start_date')),
+            'rfp_instruction_formatted': lambda v: self._format_rfp_instruction(district, rfp_type),
+            'rfp_requirements_context_formatted': lambda v: self._requirements_context(rfp_data, rfp_type),
+            # For backward compatibility
+            'natomas_rfp_requirements_context_formatted': lambda v: v['rfp_requirements_context_formatted'],
+            'natomas_rfp_instruction_formatted': lambda v: v['rfp_instruction_formatted'],
+        }
+
+        # Add context files
+        if context_files is not None:
+            values.update(context_files)
+        else:
+            for key, filename in CONTEXT_FILES.items():
+                resolvers[key] = lambda v, filename=filename: self._read_context_file(filename)
+
+        return LazyVariables(values, resolvers)
+
+    def _format_cost_per_student(self, cost_per_student_value):
+        """Format the form's cost per student, or $0.00 when it is missing or not positive"""
+        if cost_per_student_value and float(str(cost_per_student_value).replace('$', '').replace(',', '')) > 0:
+            formatted_cost_per_student = self.clean_and_format_currency(cost_per_student_value)
+        else:
+            formatted_cost_per_student = self.clean_and_format_currency("0")
+        print(f"DEBUG: formatted_cost_per_student: {formatted_cost_per_student}")
+        return formatted_cost_per_student
+
+    @staticmethod
+    def _format_school_locations(selected_schools, selected_schools_list):
+        """Comma-separated school names, preferring the JSON list when it parses"""
         school_locations = ", ".join(selected_schools) if selected_schools else "Selected school sites"
 
         # Parse selected schools list if available
-        selected_schools_list = kwargs.get('selected_schools_list')
         if selected_schools_list:
             try:
-                import json
                 parsed_schools = json.loads(selected_schools_list)
                 school_locations = ", ".join(parsed_schools) if parsed_schools else school_locations
             except (json.JSONDecodeError, TypeError):
                 # Fallback to the original list
                 pass
+        return school_locations
 
-        # Format cost per school
-        formatted_cost_per_school = self.clean_and_format_currency(kwargs.get('cost_per_school'))
-
-        # Format program start date
-        program_start_date = kwargs.get('program_start_date')
+    @staticmethod
+    def _format_program_dates(program_start_date):
+        """Program date range starting at the form's start date (assuming 7 weeks)"""
         if program_start_date:
             try:
-                from datetime import datetime
                 date_obj = datetime.strptime(program_start_date, '%Y-%m-%d')
                 formatted_start_date = date_obj.strftime('%B %d, %Y')  # e.g., "October 07, 2024"
 
                 # Calculate end date (assuming 7 weeks)
-                from datetime import timedelta
                 end_date_obj = date_obj + timedelta(weeks=7)
                 formatted_end_date = end_date_obj.strftime('%B %d, %Y')
-                program_dates = f"{formatted_start_date} - {formatted_end_date}"
+                return f"{formatted_start_date} - {formatted_end_date}"
             except (ValueError, TypeError):
-                program_dates = "January 13, 2025 - March 07, 2025"
-        else:
-            program_dates = "January 13, 2025 - March 07, 2025"
-        
-        # Format RFP instructions
-        district = kwargs.get('district', 'N/A')
-        rfp_type = kwargs.get('rfp_type', 'Extended Learning Opportunities Program')
-        
+                pass
+        return "January 13, 2025 - March 07, 2025"
+
+    @staticmethod
+    def _format_rfp_instruction(district, rfp_type):
+        """Instruction asking the model to address the RFP's requirements"""
         if rfp_type != "Extended Learning Opportunities Program":
-            rfp_instruction_formatted = (
+            return (
                 f"\nWhen generating the proposal for {district}, it is crucial to explicitly address and demonstrate compliance with each of the listed RFP requirements for {rfp_type}, integrating them naturally into the relevant sections of the proposal."
             )
-        else:
-            rfp_instruction_formatted = ""
-            if district == "Natomas Unified School District":
-                rfp_instruction_formatted = (
-                    "\nWhen generating the proposal for Natomas Unified School District, it is crucial to explicitly address and demonstrate compliance with each of the listed RFP requirements, integrating them naturally into the relevant sections of the proposal."
-                )
-        
-        # Company information variables
-        company_name = kwargs.get('company_name', 'Musical Instruments N Kids Hands (M.I.N.K.H.) - Music Science & Technology Group (MSTG)')
-        representative_name = kwargs.get('representative_name', 'A.P. Moore, Program Coordinator')
-        representative_title = kwargs.get('representative_title', 'Program Coordinator')
-        company_email = kwargs.get('company_email', 'aphilanda@musicsciencegroup.com')
-        company_phone = kwargs.get('company_phone', '(216) 903-3756')
-        company_address = kwargs.get('company_address', '2150 Capitol Avenue Sacramento, CA 95816')
-
-        # Create comprehensive variables dictionary
-        prompt_variables = {
-            'district': district,
-            'rfp_type': rfp_type,
-            'today': date.today(),
-            'days_per_week': kwargs.get('days_per_week', 'N/A'),
-            'num_weeks': kwargs.get('num_weeks', 'N/A'),
-            'hours_per_day': kwargs.get('hours_per_day', '3'),
-            'school_locations': school_locations,
-            'formatted_cost_proposal': formatted_cost_proposal,
-            'formatted_daily_cost': formatted_daily_cost,
-            'formatted_weekly_cost': formatted_weekly_cost,
-            'total_students': kwargs.get('total_students', 'N/A'),
-            'formatted_cost_per_student': formatted_cost_per_student,
-            'formatted_cost_per_school': formatted_cost_per_school,
-            'program_dates': program_dates,
-            'year': date.today().year,
-            'rfp_instruction_formatted': rfp_instruction_formatted,
-            'client': f"{district} School District",
-            'project': {rfp_type},
-            'services': "Music Integration, S.T.E.A.M. Education, Wellness Programs, Student Engagement Activities",
-            'benefits': "Enhanced Student Engagement, Improved Academic Performance, Increased Wellness, Community Involvement",
-            'cta': "We look forward to the opportunity to collaborate and make a meaningful impact together.",
+        if district == "Natomas Unified School District":
+            return (
+                "\nWhen generating the proposal for Natomas Unified School District, it is crucial to explicitly address and demonstrate compliance with each of the listed RFP requirements, integrating them naturally into the relevant sections of the proposal."
+            )
+        return ""
 
-            # Company information
-            'company_name': company_name,
-            'representative_name': representative_name,
-            'representative_title': representative_title,
-            'company_email': company_email,
-            'company_phone': company_phone,
-            'company_address': company_address
-        }
-        
-        # Add context files
-        prompt_variables.update(context_files)
-        
-        # Add RFP requirements context
-        rfp_data = self.load_rfp_files(rfp_type)
+    def _requirements_context(self, rfp_data, rfp_type):
+        """RFP requirements text for traditional prompts, or a short note in YAML+Jinja mode"""
+        if rfp_data is None:
+            rfp_data = self.load_rfp_files(rfp_type)
         if isinstance(rfp_data, dict) and rfp_data.get('mode') == 'yaml_jinja':
             # For YAML+Jinja mode, use the RFP type as context
-            requirements_context = f"RFP Type: {rfp_type} (using YAML+Jinja template)"
+            return f"RFP Type: {rfp_type} (using YAML+Jinja template)"
+        # Traditional mode - extract requirements context
+        _, requirements_context = rfp_data
+        return requirements_context
+
+    def build_generation_prompt(self, template_data, prompt_variables):
+        """Build the final prompt and the post-processing function for its response"""
+        # Check if template_data is a YAML+Jinja config dictionary
+        if isinstance(template_data, dict) and template_data.get('mode') == 'yaml_jinja':
+            return self.render_yaml_jinja_prompt(template_data, prompt_variables), self.normalize_empty_lines
+
+        # Traditional approach - extract prompt template from tuple
+        if isinstance(template_data, tuple):
+            prompt_template, _ = template_data
         else:
-            # Traditional mode - extract requirements context
-            _, requirements_context = rfp_data
-        prompt_variables['rfp_requirements_context_formatted'] = requirements_context
-        
-        # For backward compatibility
-        prompt_variables.update({
-            'natomas_rfp_requirements_context_formatted': requirements_context,
-            'natomas_rfp_instruction_formatted': rfp_instruction_formatted
-        })
-
-        return prompt_variables
-    
-    def generate_proposal_text(self, template_data, prompt_variables):
-        """Generate proposal text using AI - handles both traditional and YAML+Jinja approaches"""
-        try:
-            # Check if template_data is a YAML+Jinja config dictionary
-            if isinstance(template_data, dict) and template_data.get('mode') == 'yaml_jinja':
-                # YAML + Jinja approach
-                return self.generate_with_yaml_jinja(template_data, prompt_variables)
-            else:
-                # Traditional approach - extract prompt template from tuple
-                if isinstance(template_data, tuple):
-                    prompt_template, _ = template_data
-                else:
-                    prompt_template = template_data  # Fallback for direct string
-
-                prompt = prompt_template.format(**prompt_variables)
+            prompt_template = template_data  # Fallback for direct string
 
-                print(f"Generating proposal using Gemini model for RFP type: {prompt_variables.get('rfp_type')}...")
-                ai_text_raw = self.call_gemini_with_fallback(prompt)
+        # format_map reads only the variables the template references
+        prompt = prompt_template.format_map(prompt_variables)
 
-                # Post-process the AI text to fill in form fields with actual company data
-                ai_text = self.normalize_empty_lines(ai_text_raw)
-                ai_text = self.fill_form_fields(ai_text, prompt_variables)
+        def postprocess(text):
+            # Fill in form fields with actual company data
+            return self.fill_form_fields(self.normalize_empty_lines(text), prompt_variables)
 
-                return ai_text
+        return prompt, postprocess
 
-        except Exception as e:
-            error_text = f"An error occurred while generating the proposal text: {e}"
-            print(error_text)
-            return error_text
-
-    def generate_with_yaml_jinja(self, config_data, prompt_variables):
-        """Generate proposal using YAML configuration and Jinja template"""
-        try:
-            # Extract YAML config and Jinja template from the config_data
-            yaml_config = config_data['yaml_config']
-            jinja_template_content = config_data['jinja_template']
+    def create_pipeline(self, request_values, artifacts=None, bypass_cache=False, cancel_event=None):
+        """Staged pipeline for one request, timed into the process-wide pipeline stats"""
+        return ProposalPipeline(self, request_values, stats=self.pipeline_stats, artifacts=artifacts,
+                                bypass_cache=bypass_cache, cancel_event=cancel_event)
 
-            # Populate YAML variables with form data
-            populated_vars = self.populate_yaml_vars(yaml_config['vars'], prompt_variables)
-
-            # Render the Jinja template with populated variables
-            template = Template(jinja_template_content)
-            rendered_content = template.render(**populated_vars)
-
-            # Create enhanced prompt for Gemini
-            enhanced_prompt = self.create_enhanced_prompt_for_yaml(rendered_content, prompt_variables)
-
-            rfp_type = prompt_variables.get('rfp_type', 'Request for Qualifications')
-            print(f"Generating proposal using YAML+Jinja strategy for RFP type: {rfp_type}...")
-            ai_text_raw = self.call_gemini_with_fallback(enhanced_prompt)
+    def generate_proposal_text(self, template_data, prompt_variables):
+        """Generate proposal text using AI - handles both traditional and YAML+Jinja approaches"""
+        pipeline = self.create_pipeline(prompt_variables, artifacts={
+            'load_template': (template_data, None),
+            'build_variables': prompt_variables,
+        })
+        return pipeline.proposal_text()
 
-            return self.normalize_empty_lines(ai_text_raw)
+    def render_yaml_jinja_template(self, config_data, prompt_variables):
+        """Render the Jinja template with YAML variables populated from form data"""
+        # Extract YAML config and Jinja template from the config_data
+        yaml_config = config_data['yaml_config']
+        jinja_template_content = config_data['jinja_template']
 
-        except Exception as e:
-            error_text = f"An error occurred in YAML+Jinja generation: {e}"
-            print(error_text)
-            return error_text
+        # Populate YAML variables with form data
+        populated_vars = self.populate_yaml_vars(yaml_config['vars'], prompt_variables,
+                                                 referenced=config_data.get('template_variables'))
 
-    def populate_yaml_vars(self, yaml_vars, prompt_variables):
-        """Populate YAML variables with form data"""
-        # Deep copy the YAML structure to avoid modifying the original
-        import copy
-        populated_vars = copy.deepcopy(yaml_vars)
+        # Render the compiled template shared by all requests
+        if config_data.get('jinja_name'):
+            template = self.jinja_env.get_template(config_data['jinja_name'])
+        else:
+            template = self.jinja_env.from_string(jinja_template_content)
+        return template.render(**populated_vars)
+
+    def render_yaml_jinja_prompt(self, config_data, prompt_variables):
+        """Render the Jinja template and wrap it in the Gemini prompt"""
+        rendered_content = self.render_yaml_jinja_template(config_data, prompt_variables)
+
+        # Create enhanced prompt for Gemini
+        return self.create_enhanced_prompt_for_yaml(rendered_content, prompt_variables)
+
+    def iter_yaml_jinja_sections(self, rendered_content, prompt_variables, bypass_cache=False, cancel_event=None):
+        """Yield generated sections of a rendered template in order, filling TBD sections in parallel"""
+        return self.section_generator.iter_sections(
+            rendered_content,
+            build_prompt=lambda section: self.create_enhanced_prompt_for_yaml(section, prompt_variables, section_only=True),
+            call_model=lambda prompt: self.call_gemini_with_fallback(prompt, bypass_cache=bypass_cache,
+                                                                     cancel_event=cancel_event)
+        )
+
+    def populate_yaml_vars(self, yaml_vars, prompt_variables, referenced=None):
+        """Populate YAML variables with form data
+
+        Returns a read-only overlay of the shared (frozen) YAML vars holding just
+        this request's values; the shared config itself is never copied or changed.
+        With referenced (the vars the template reads), sections the template
+        never reads are left as they are.
+        """
+        overrides = {}
+
+        def used(section):
+            return section in yaml_vars and (referenced is None or section in referenced)
 
         # Populate submission information
-        if 'submission' in populated_vars:
-            populated_vars['submission']['company_name'] = prompt_variables.get('company_name', '')
-            populated_vars['submission']['rep_name'] = prompt_variables.get('representative_name', '')
-            populated_vars['submission']['title'] = prompt_variables.get('representative_title', '')
-            populated_vars['submission']['email'] = prompt_variables.get('company_email', '')
-            populated_vars['submission']['phone'] = prompt_variables.get('company_phone', '')
-            populated_vars['submission']['address'] = prompt_variables.get('company_address', '')
-            populated_vars['submission']['signature_name'] = prompt_variables.get('representative_name', '')
-            populated_vars['submission']['signature_date'] = str(prompt_variables.get('today', ''))
+        if used('submission'):
+            overrides['submission'] = OverlayMapping(yaml_vars['submission'], {
+                'company_name': prompt_variables.get('company_name', ''),
+                'rep_name': prompt_variables.get('representative_name', ''),
+                'title': prompt_variables.get('representative_title', ''),
+                'email': prompt_variables.get('company_email', ''),
+                'phone': prompt_variables.get('company_phone', ''),
+                'address': prompt_variables.get('company_address', ''),
+                'signature_name': prompt_variables.get('representative_name', ''),
+                'signature_date': str(prompt_variables.get('today', '')),
+            })
 
         # Populate budget information if available
-        if 'budget' in populated_vars and 'categories' in populated_vars['budget']:
+        if used('budget') and 'categories' in yaml_vars['budget']:
+            from services.budget_scenarios import budget_categories
             # Extract costs from form data if available (you may need to enhance this based on your form structure)
             total_cost = prompt_variables.get('cost_proposal', '$0.00')
             if isinstance(total_cost, str):
                 try:
                     # Clean currency and convert to float
                     clean_cost = float(re.sub(r'[^\d.-]', '', total_cost))
-                    # Distribute cost across categories (basic allocation - you can enhance this)
-                    populated_vars['budget']['categories']['staffing'] = clean_cost * 0.6  # 60% staffing
-                    populated_vars['budget']['categories']['instructional_materials'] = clean_cost * 0.1
-                    populated_vars['budget']['categories']['program_supplies'] = clean_cost * 0.1
-                    populated_vars['budget']['categories']['supervision'] = clean_cost * 0.1
-                    populated_vars['budget']['categories']['professional_development'] = clean_cost * 0.05
-                    populated_vars['budget']['categories']['transportation'] = clean_cost * 0.025
-                    populated_vars['budget']['categories']['admin_costs'] = clean_cost * 0.025
+                    # Distribute cost across categories (BUDGET_CATEGORY_SPLIT, shared with the scenario calculator)
+                    categories = OverlayMapping(yaml_vars['budget']['categories'], budget_categories(clean_cost))
+                    overrides['budget'] = OverlayMapping(yaml_vars['budget'], {'categories': categories})
                 except (ValueError, TypeError):
                     pass  # Keep default values if conversion fails
 
         # Populate legal information
-        if 'legal' in populated_vars:
-            populated_vars['legal']['nda_disclosee_name'] = prompt_variables.get('company_name', '')
-            populated_vars['legal']['workers_comp_company_name'] = prompt_variables.get('company_name', '')
-            populated_vars['legal']['workers_comp_rep_name'] = prompt_variables.get('representative_name', '')
+        if used('legal'):
+            overrides['legal'] = OverlayMapping(yaml_vars['legal'], {
+                'nda_disclosee_name': prompt_variables.get('company_name', ''),
+                'workers_comp_company_name': prompt_variables.get('company_name', ''),
+                'workers_comp_rep_name': prompt_variables.get('representative_name', ''),
+            })
 
         # Set up references with default data (can be enhanced to pull from form)
-        if 'references' in populated_vars:
-            default_refs = [
-                {
-                    'organization': 'Natomas Unified School District',
-                    'contact_name': 'Program Administrator',
-                    'phone': '(916) 567-5000',
-                    'email': 'programs@natomas.net',
-                    'dates_of_service': '2023-2024',
-                    'description': 'Extended Learning Opportunities Program'
-                },
-                {
-                    'organization': 'Sacramento City Unified School District',
-                    'contact_name': 'Enrichment Coordinator',
-                    'phone': '(916) 643-7400',
-                    'email': 'enrichment@scusd.edu',
-                    'dates_of_service': '2022-2023',
-                    'description': 'Music & STEAM Integration Program'
-                },
-                {
-                    'organization': 'Elk Grove Unified School District',
-                    'contact_name': 'After School Programs Manager',
-                    'phone': '(916) 686-7700',
-                    'email': 'afterschool@egusd.net',
-                    'dates_of_service': '2021-2022',
-                    'description': 'Arts & Wellness Programs'
-                }
-            ]
+        if used('references'):
+            references = yaml_vars['references']
+            filled_count = min(3, len(references), len(DEFAULT_REFERENCES))  # Limit to first 3 references
+            overrides['references'] = tuple(
+                OverlayMapping(reference, DEFAULT_REFERENCES[i]) if i < filled_count else reference
+                for i, reference in enumerate(references)
+            )
 
-            for i in range(min(3, len(populated_vars['references']))):  # Limit to first 3 references
-                if i < len(default_refs):
-                    populated_vars['references'][i].update(default_refs[i])
+        return OverlayMapping(yaml_vars, overrides)
 
-        return populated_vars
+    def create_enhanced_prompt_for_yaml(self, rendered_content, prompt_variables, section_only=False):
+        """Create an enhanced prompt for Gemini using the rendered Jinja content
 
-    def create_enhanced_prompt_for_yaml(self, rendered_content, prompt_variables):
-        """Create an enhanced prompt for Gemini using the rendered Jinja content"""
+        With section_only, the template is one section of a larger proposal and
+        the model is told to return just that section.
+        """
 
-        # Load context information
-        context_files = self.load_context_files()
+        # Context files were merged into the prompt variables when they were built
+        section_scope = ""
+        if section_only:
+            section_scope = (
+                "\nSCOPE: The template below is ONE SECTION of a larger proposal. The other sections are "
+                "completed separately and joined in order, so complete and output ONLY this section, "
+                "starting with its heading.\n"
+            )
 
         enhanced_prompt = f"""
 You are a proposal writer completing an RFP response for {prompt_variables.get('district', 'N/A')} School District. This is a CRITICAL GOVERNMENT CONTRACT submission that must follow EXACT formatting requirements.
@@ -674,9 +1023,9 @@ You are a proposal writer completing an RFP response for {prompt_variables.get('
 WARNING: School districts have STRICT documentation order requirements. ANY deviation from the provided template structure will result in AUTOMATIC DISQUALIFICATION.
 
 ORGANIZATION CONTEXT:
-{context_files.get('about_mstg', 'Musical Instruments N Kids Hands (M.I.N.K.H.) - Music Science & Technology Group (MSTG) specializes in music integration and STEAM education programs.')}
+{prompt_variables.get('about_mstg', 'Musical Instruments N Kids Hands (M.I.N.K.H.) - Music Science & Technology Group (MSTG) specializes in music integration and STEAM education programs.')}
 
-{context_files.get('about_minkh', 'M.I.N.K.H. focuses on hands-on learning experiences that combine music, science, technology, engineering, arts, and mathematics.')}
+{prompt_variables.get('about_minkh', 'M.I.N.K.H. focuses on hands-on learning experiences that combine music, science, technology, engineering, arts, and mathematics.')}
 
 PROJECT DETAILS:
 - Client: {prompt_variables.get('district', 'N/A')} School District
@@ -685,7 +1034,7 @@ PROJECT DETAILS:
 - Duration: {prompt_variables.get('program_dates', 'N/A')}
 - Investment: {prompt_variables.get('formatted_cost_proposal', 'N/A')}
 - Cost/Student: {prompt_variables.get('formatted_cost_per_student', 'N/A')}
-
+{section_scope}
 TEMPLATE TO COMPLETE (MAINTAIN EXACT FORMAT):
 {rendered_content}
 
@@ -743,21 +1092,45 @@ FINAL CHECK BEFORE SUBMISSION:
         }
         return title_mapping.get(rfp_type, f"Proposal for {district}")
 
-    def create_document(self, text, district, rfp_type):
-        """Create and save the Word document"""
-        try:
-            document = Document()
-            self.create_document_header(document)
+    def build_document(self, text, district, rfp_type):
+        """Build the Word document in memory: header, title and the converted proposal text
+
+        The document is a copy of the cached letterhead template, so the header
+        and logo are not rebuilt. The converter applies the bold and
+        colon-spacing fixes as it adds runs, so the document needs no second
+        formatting pass and is saved only once.
+        """
+        from docx import Document
+        from docx.enum.text import WD_ALIGN_PARAGRAPH
+        from convert import MarkdownToDocxConverter
+
+        document = Document(BytesIO(self.get_letterhead_template()))
+        converter = MarkdownToDocxConverter(document=document)
+
+        # Add document title
+        title = self.get_document_title(district, rfp_type)
+        title_paragraph = converter.add_heading(title, level=0)
+        title_paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+        # Convert text to document
+        text = text.replace('** ', '**').replace(' **', '**')
+        converter.convert(text)
+        return document
+
+    def create_document_bytes(self, text, district, rfp_type):
+        """Build the Word document and return it serialized into a BytesIO, without touching disk"""
+        buffer = BytesIO()
+        self.build_document(text, district, rfp_type).save(buffer)
+        buffer.seek(0)
+        return buffer
 
-            # Add document title
-            title = self.get_document_title(district, rfp_type)
-            title_paragraph = document.add_heading(title, level=0)
-            title_paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    def create_document(self, text, district, rfp_type):
+        """Create and save the Word document and queue its PDF rendering
 
-            # Convert text to document
-            converter = MarkdownToDocxConverter(document=document)
-            text = text.replace('** ', '**').replace(' **', '**')
-            converter.convert(text)
+        Returns the DOCX filename; pdf_status reports on the PDF.
+        """
+        try:
+            document = self.build_document(text, district, rfp_type)
 
             # Generate filename
             safe_district_name = re.sub(r'[^a-zA-Z0-9_]', '', district).replace(" ", "_")
@@ -767,28 +1140,93 @@ FINAL CHECK BEFORE SUBMISSION:
             
             output_path = os.path.join(self.config['DOWNLOAD_FOLDER'], filename)
             document.save(output_path)
-
-            # Format the document
-            word_formatter.format_word_document(output_path, output_path)
-
-            # Generate PDF from the DOCX
-            pdf_filename = filename.replace('.docx', '.pdf')
-            pdf_output_path = os.path.join(self.config['DOWNLOAD_FOLDER'], pdf_filename)
-
-            try:
-                convert_docx_to_pdf(output_path, pdf_output_path)
-                print(f"Successfully created PDF '{pdf_filename}' from DOCX")
-            except Exception as pdf_error:
-                print(f"Warning: Failed to create PDF: {pdf_error}")
-                # Continue even if PDF creation fails
-
             print(f"Successfully created '{filename}' in '{self.config['DOWNLOAD_FOLDER']}' with custom header.")
 
+            self.queue_pdf(filename)
+
             return filename
             
         except Exception as e:
             print(f"Error creating document: {e}")
             return None
+
+    @staticmethod
+    def pdf_filename_for(filename):
+        """Name of the PDF rendered from a DOCX filename"""
+        return f"{os.path.splitext(filename)[0]}.pdf"
+
+    def render_pdf(self, filename):
+        """Convert a saved DOCX in the download folder to PDF
+
+        Returns the PDF's filename, size in bytes and render time in seconds.
+        Raises RuntimeError when the conversion produces no PDF.
+        """
+        download_dir = self.config['DOWNLOAD_FOLDER']
+        pdf_filename = self.pdf_filename_for(filename)
+        pdf_path = os.path.join(download_dir, pdf_filename)
+
+        started = time.perf_counter()
+        convert_docx_to_pdf(os.path.join(download_dir, filename), pdf_path, converter=self.pdf_converter)
+        render_seconds = time.perf_counter() - started
+
+        if not os.path.isfile(pdf_path) or os.path.getsize(pdf_path) == 0:
+            raise RuntimeError(f"PDF conversion produced no output for '{filename}'")
+
+        print(f"Successfully created PDF '{pdf_filename}' from DOCX in {render_seconds:.2f}s")
+        return {
+            'filename': pdf_filename,
+            'size': os.path.getsize(pdf_path),
+            'render_seconds': round(render_seconds, 3),
+        }
+
+    def queue_pdf(self, filename):
+        """Queue the PDF rendering of a saved DOCX; returns the job record, or None if the queue is full"""
+        try:
+            return self.pdf_jobs.submit(
+                self.render_pdf,
+                kwargs={'filename': filename},
+                meta={'docx_filename': filename},
+                job_id=self.pdf_filename_for(filename)
+            )
+        except JobQueueFullError as e:
+            print(f"Warning: Not rendering PDF for '{filename}': {e}")
+            return None
+
+    def pdf_status(self, filename):
+        """Status of the PDF rendered from a saved DOCX
+
+        filename may name the DOCX or the PDF. Returns a dict with the PDF's
+        filename, status ('pending', 'ready' or 'failed'), size, render_seconds
+        and error, or None when neither file exists in the download folder.
+        """
+        download_dir = self.config['DOWNLOAD_FOLDER']
+        pdf_filename = self.pdf_filename_for(filename)
+        pdf_path = os.path.join(download_dir, pdf_filename)
+        docx_path = os.path.join(download_dir, f"{os.path.splitext(filename)[0]}.docx")
+        status = {'filename': pdf_filename, 'status': 'pending', 'size': None, 'render_seconds': None, 'error': None}
+
+        job = self.pdf_jobs.get_job(pdf_filename)
+        if job is None:
+            # Never queued (queue full) or its record has expired
+            if os.path.isfile(pdf_path):
+                status.update(status='ready', size=os.path.getsize(pdf_path))
+            elif os.path.isfile(docx_path):
+                status.update(status='failed', error='The PDF was not rendered')
+            else:
+                return None
+        elif job['status'] == JobService.STATUS_DONE:
+            if os.path.isfile(pdf_path):
+                status.update(status='ready', size=job['result']['size'],
+                              render_seconds=job['result']['render_seconds'])
+            else:
+                status.update(status='failed', error='The PDF is no longer available')
+        elif job['status'] in JobService.FINISHED_STATUSES:
+            status.update(status='failed', error=job['error'] or 'PDF rendering was cancelled')
+        elif self.pdf_jobs.is_orphaned(job, max_age_seconds=self.pdf_job_max_age):
+            # Its worker died (or it never finished) and the record was left behind
+            status.update(status='failed', error='PDF rendering stopped before it finished')
+
+        return status
     
     def manage_file_rotation(self, district_name, max_files=5):
         """Manage file rotation to keep only recent files"""
@@ -818,38 +1256,35 @@ FINAL CHECK BEFORE SUBMISSION:
                 except OSError as e:
                     print(f"Error deleting file {filepath}: {e}")
     
-    def generate_proposal_text_only(self, **kwargs):
-        """Generate only the proposal text without creating a document"""
+    def generate_proposal_text_only(self, raise_errors=False, bypass_cache=False, cancel_event=None, **kwargs):
+        """Generate only the proposal text without creating a document
+
+        Failures return an error message in place of the text unless
+        raise_errors is set (background jobs, so the job is recorded as failed).
+        bypass_cache and cancel_event control the model calls; they are not
+        prompt variables.
+        """
         try:
-            # Load appropriate files based on RFP type
-            rfp_type = kwargs.get('rfp_type', 'Extended Learning Opportunities Program')
-            rfp_data = self.load_rfp_files(rfp_type)
-
-            # Prepare variables
-            prompt_variables = self.prepare_prompt_variables(**kwargs)
-
-            # Generate proposal text
-            proposal_text = self.generate_proposal_text(rfp_data, prompt_variables)
-
-            return proposal_text
+            pipeline = self.create_pipeline(kwargs, bypass_cache=bypass_cache, cancel_event=cancel_event)
+            return pipeline.proposal_text(raise_errors=raise_errors)
 
         except Exception as e:
+            if raise_errors:
+                raise
             error_text = f"An error occurred while generating the proposal text: {e}"
             print(error_text)
             return error_text
 
-    def generate_proposal(self, **kwargs):
+    def stream_proposal_text(self, bypass_cache=False, cancel_event=None, **kwargs):
+        """Yield post-processed proposal text as the model streams it"""
+        return self.create_pipeline(kwargs, bypass_cache=bypass_cache, cancel_event=cancel_event).stream_text()
+
+    def generate_proposal(self, bypass_cache=False, **kwargs):
         """Main method to generate a complete proposal"""
         try:
-            # Load appropriate files based on RFP type
+            # Load, render, generate and post-process through the staged pipeline
             rfp_type = kwargs.get('rfp_type', 'Extended Learning Opportunities Program')
-            rfp_data = self.load_rfp_files(rfp_type)
-
-            # Prepare variables
-            prompt_variables = self.prepare_prompt_variables(**kwargs)
-
-            # Generate proposal text
-            proposal_text = self.generate_proposal_text(rfp_data, prompt_variables)
+            proposal_text = self.create_pipeline(kwargs, bypass_cache=bypass_cache).proposal_text()
 
             # Create document
             district = kwargs.get('district', 'N/A')
@@ -869,22 +1304,77 @@ FINAL CHECK BEFORE SUBMISSION:
 
 
 class DataService:
-    """Service class for handling data operations"""
-    
+    """Service class for handling data operations
+
+    The school table is read once into a SchoolDataset and reloaded only when
+    its source's modification time or size changes, checked at most once per
+    SCHOOL_DATA_CHECK_INTERVAL_SECONDS. The source is the columnar store
+    written by `flask ingest-schools` when one exists, otherwise data.csv.
+    """
+
     def __init__(self, app_config):
         self.config = app_config
-    
+        self.data_path = os.path.join(self.config['INPUT_FILES_FOLDER'], "data.csv")
+        self.store_folder = app_config.get('SCHOOL_STORE_FOLDER')
+        self.check_interval = app_config.get('SCHOOL_DATA_CHECK_INTERVAL_SECONDS', 2.0)
+        self._lock = threading.Lock()
+        self._dataset = None
+        self._checked_at = 0.0
+
+    def warm(self):
+        """Load the school table ahead of the first request (shared by preforked workers)"""
+        self.get_dataset()
+
+    def get_dataset(self):
+        """Current SchoolDataset, reloading it if its source changed on disk"""
+        now = time.monotonic()
+        dataset = self._dataset
+        if dataset is not None and now - self._checked_at < self.check_interval:
+            return dataset
+
+        from services import school_store
+        from services.school_dataset import SchoolDataset
+
+        with self._lock:
+            dataset = self._dataset
+            try:
+                store_version = school_store.store_version(self.store_folder) if self.store_folder else None
+                if store_version is not None:
+                    version = ('store',) + store_version
+                else:
+                    stat = os.stat(self.data_path)
+                    version = ('csv', stat.st_mtime_ns, stat.st_size)
+
+                if dataset is None or dataset.version != version:
+                    source = self.store_folder if store_version is not None else self.data_path
+                    if dataset is not None:
+                        print(f"Reloading changed school data: {source}")
+                    if store_version is not None:
+                        dataset = SchoolDataset(school_store.read_store(self.store_folder), version)
+                    else:
+                        dataset = SchoolDataset.load(self.data_path, version)
+                    self._dataset = dataset
+            except Exception as e:
+                print(f"Error loading school data: {e}")
+                if dataset is None:
+                    # Not cached, so the next check tries again
+                    return SchoolDataset.empty()
+            self._checked_at = now
+            return dataset
+
     def get_school_data(self):
-        """Read and return school data from CSV"""
-        try:
-            df = pd.read_csv(os.path.join(self.config['INPUT_FILES_FOLDER'], "data.csv"))
-            df.columns = df.columns.str.strip()
-            return df
-        except Exception as e:
-            print(f"Error loading school data: {e}")
-            return pd.DataFrame()
-    
+        """Return the school table as a DataFrame (shared; treat it as read-only)"""
+        return self.get_dataset().frame
+
     def get_districts(self):
         """Get list of unique districts"""
-        df = self.get_school_data()
-        return df['District Name'].unique().tolist() if not df.empty else []
+        return list(self.get_dataset().districts)
+
+    def get_schools(self, district):
+        """Get the school records of one district"""
+        return self.get_dataset().schools(district)
+
+    def ingest(self, sources, input_folder=None):
+        """Merge school CSVs into the columnar store, which replaces data.csv as the source"""
+        from services import school_store
+        return school_store.ingest(sources, input_folder or self.config['INPUT_FILES_FOLDER'], self.store_folder)
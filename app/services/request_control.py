@@ -0,0 +1,131 @@
+"""
+Request Control Module
+
+Deadlines, retry backoff, cancellation and latency tracking for upstream
+Gemini calls. ProposalService uses these to bound how long a call may take,
+retry transient failures with exponential backoff and jitter, hedge slow calls
+on another key once they pass the observed latency percentile, and stop work
+for clients that have gone away.
+"""
+import random
+import re
+import threading
+import time
+from collections import deque
+
+
+# Retryable HTTP statuses, as an error message's leading code ("503 Service
+# Unavailable", the form google.api_core errors take) or after status/code/HTTP
+TRANSIENT_STATUS_PATTERN = re.compile(r'^\s*50[0234]\b|\b(?:status|code|http)\s*[:=]?\s*50[0234]\b')
+# A leading 4xx code marks a request error that a retry would only repeat
+CLIENT_ERROR_STATUS_PATTERN = re.compile(r'^\s*4\d\d\b')
+TRANSIENT_ERROR_PHRASES = [
+    'internal error', 'service unavailable', 'deadline exceeded', 'timed out',
+    'connection reset', 'connection aborted', 'temporarily unavailable', 'overloaded'
+]
+
+# How often waits on upstream calls wake up to notice a cancelled request
+CANCEL_POLL_SECONDS = 0.25
+
+
+class RequestCancelled(Exception):
+    """Raised when the client behind a request has gone away"""
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request runs out of time before an answer arrives"""
+
+
+class Deadline:
+    """Absolute deadline for one request, shared by its retries and hedges"""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def check(self):
+        if self.remaining() <= 0:
+            raise DeadlineExceeded(f"Gemini request did not finish within {self.seconds:.0f}s")
+
+
+def check_cancelled(cancel_event):
+    """Raise RequestCancelled if the request's cancel event is set"""
+    if cancel_event is not None and cancel_event.is_set():
+        raise RequestCancelled("Request cancelled because the client went away")
+
+
+def is_transient_error(error):
+    """Server-side or network errors that are worth retrying on the same key
+
+    Gemini's google.api_core errors are classified by type: 500, 502, 503 and
+    504 errors (including DeadlineExceeded) are retried and other API errors
+    are not. Other errors are read from their message, by status code or by
+    phrase, unless it starts with a 4xx code.
+    """
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+
+    # Loaded with google.generativeai, which raised the error if it is one of these
+    from google.api_core import exceptions as api_exceptions
+    if isinstance(error, (api_exceptions.InternalServerError, api_exceptions.BadGateway,
+                          api_exceptions.ServiceUnavailable, api_exceptions.GatewayTimeout)):
+        return True
+    if isinstance(error, api_exceptions.GoogleAPICallError):
+        return False
+
+    error_message = str(error).lower()
+    if CLIENT_ERROR_STATUS_PATTERN.match(error_message):
+        return False
+    return (TRANSIENT_STATUS_PATTERN.search(error_message) is not None
+            or any(phrase in error_message for phrase in TRANSIENT_ERROR_PHRASES))
+
+
+def backoff_delay(attempt, base_seconds, max_seconds):
+    """Exponential backoff with full jitter for the given retry attempt (0-based)"""
+    return random.uniform(0, min(max_seconds, base_seconds * (2 ** attempt)))
+
+
+class RequestStats:
+    """Rolling latency window and retry/hedge/cancel counters for one process"""
+
+    def __init__(self, window=200, min_samples=20):
+        self.min_samples = min_samples
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.counters = {
+            'retries': 0,
+            'hedges_sent': 0,
+            'hedges_won': 0,
+            'abandoned_calls': 0,
+            'deadline_exceeded': 0,
+            'cancelled': 0,
+        }
+
+    def record_latency(self, seconds):
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def count(self, counter):
+        with self._lock:
+            self.counters[counter] += 1
+
+    def percentile(self, percent):
+        """Latency at the given percentile, or None until enough samples exist"""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, int(round(percent / 100.0 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats['samples'] = len(self._latencies)
+        for percent in (50, 95):
+            latency = self.percentile(percent)
+            stats[f'latency_p{percent}'] = round(latency, 3) if latency is not None else None
+        return stats
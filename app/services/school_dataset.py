@@ -0,0 +1,200 @@
+"""
+School Dataset Module
+
+In-memory snapshot of the school table (data.csv) with the lookups the routes
+need computed once at load time: the district list and each district's row
+positions. A district's school records and the JSON payloads served by the
+school API are built once per snapshot, on first use. A snapshot is never modified otherwise; DataService
+replaces it when the file changes, so readers can use it without locking.
+
+Search filters run as vectorized NumPy comparisons over columns prepared at
+load time (school type codes, FRPM percentages, program flags, lowercased
+names), starting from the district index when a district is given. FRPM
+values are scaled to percentages once, when a source is read, so results
+carry the same values the filters compare.
+"""
+import json
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+from services.payloads import PrecomputedPayload
+from services.school_store import frpm_percentages
+
+
+DISTRICT_COLUMN = 'District Name'
+SCHOOL_COLUMN = 'School Name'
+SCHOOL_TYPE_COLUMN = 'School Type'
+FRPM_COLUMN = 'FRPM Percent (%)'
+# Search flag name -> Yes/No column
+PROGRAM_FLAG_COLUMNS = {
+    'expanded_learning': 'Expanded Learning Program',
+    'after_school': 'After School Education Program',
+}
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class SchoolDataset:
+    """Read-only school table with a district index"""
+
+    __slots__ = ('frame', 'version', 'loaded_at', 'districts', 'schools_by_district', '_district_rows', '_payloads',
+                 '_type_codes', '_type_index', '_frpm', '_flags', '_names_text', '_name_starts')
+
+    def __init__(self, frame, version=None):
+        """
+        Args:
+            frame (DataFrame): School table with stripped column names
+            version (tuple): (mtime_ns, size) of the file it was read from, or None
+        """
+        self.frame = frame
+        self.version = version
+        self.loaded_at = time.time()
+        self._payloads = {}
+        self.schools_by_district = {}
+        self._prepare_search_columns()
+
+        if frame.empty or DISTRICT_COLUMN not in frame.columns:
+            self.districts = ()
+            self._district_rows = {}
+            return
+
+        self.districts = tuple(frame[DISTRICT_COLUMN].unique().tolist())
+        # groupby keeps each district's rows in file order, like a boolean mask would
+        self._district_rows = frame.groupby(DISTRICT_COLUMN, sort=False).indices
+
+    def _prepare_search_columns(self):
+        """Turn the filterable columns into arrays that compare without Python loops"""
+        frame = self.frame
+        if SCHOOL_TYPE_COLUMN in frame.columns:
+            self._type_codes, types = pd.factorize(frame[SCHOOL_TYPE_COLUMN])
+            self._type_index = {value: code for code, value in enumerate(types)}
+        else:
+            self._type_codes, self._type_index = np.full(len(frame), -1), {}
+
+        if FRPM_COLUMN in frame.columns:
+            # Already percentages: scaled by school_store.read_source or load()
+            self._frpm = pd.to_numeric(frame[FRPM_COLUMN], errors='coerce').to_numpy(dtype='float64')
+        else:
+            self._frpm = np.full(len(frame), np.nan)
+
+        self._flags = {}
+        for flag, column in PROGRAM_FLAG_COLUMNS.items():
+            if column in frame.columns:
+                values = frame[column].astype(str).str.strip().str.lower()
+                self._flags[flag] = (values == 'yes').to_numpy()
+            else:
+                self._flags[flag] = np.zeros(len(frame), dtype=bool)
+
+        # All lowercased names in one newline-separated string, so a substring search is one scan in C
+        if SCHOOL_COLUMN in frame.columns:
+            names = frame[SCHOOL_COLUMN].fillna('').astype(str).str.lower().str.replace('\n', ' ').tolist()
+        else:
+            names = [''] * len(frame)
+        self._names_text = '\n'.join(names)
+        self._name_starts = np.cumsum([0] + [len(name) + 1 for name in names[:-1]], dtype=np.int64)[:len(names)]
+
+    @classmethod
+    def load(cls, path, version=None):
+        """Read the CSV at path into a new snapshot, with FRPM fractions scaled to percentages"""
+        frame = pd.read_csv(path)
+        frame.columns = frame.columns.str.strip()
+        if FRPM_COLUMN in frame.columns:
+            districts = frame[DISTRICT_COLUMN] if DISTRICT_COLUMN in frame.columns else None
+            frame[FRPM_COLUMN] = frpm_percentages(frame[FRPM_COLUMN], districts)
+        return cls(frame, version)
+
+    @classmethod
+    def empty(cls):
+        return cls(pd.DataFrame())
+
+    def schools(self, district):
+        """School records of one district, in file order (empty if unknown)"""
+        records = self.schools_by_district.get(district)
+        if records is None:
+            rows = self._district_rows.get(district)
+            if rows is None:
+                return ()
+            records = self.schools_by_district.setdefault(
+                district, tuple(self.frame.iloc[rows].to_dict('records')))
+        return records
+
+    def all_schools_payload(self):
+        """Every school as a JSON array, in the format the index page used to embed"""
+        return self._payload(None, lambda: self.frame.to_json(orient='records'))
+
+    def district_payload(self, district):
+        """One district's schools as a JSON array (an empty array if the district is unknown)"""
+        rows = self._district_rows.get(district)
+        if rows is None:
+            return self._payload((), lambda: '[]')
+        return self._payload(district, lambda: self.frame.iloc[rows].to_json(orient='records'))
+
+    def search(self, district=None, school_type=None, frpm_min=None, frpm_max=None, flags=None,
+               name=None, page=1, per_page=DEFAULT_PAGE_SIZE):
+        """Filter schools and return one page of matches in file order
+
+        Args:
+            district (str): Exact district name
+            school_type (str): Exact school type
+            frpm_min, frpm_max (float): Inclusive FRPM percentage range
+            flags (dict): PROGRAM_FLAG_COLUMNS name to required True/False
+            name (str): Case-insensitive substring of the school name
+            page (int): 1-based page number
+            per_page (int): Results per page, at most MAX_PAGE_SIZE
+        """
+        per_page = max(1, min(int(per_page), MAX_PAGE_SIZE))
+        page = max(1, int(page))
+
+        # Start from the district's rows (or all rows), then narrow with masks
+        if district:
+            rows = self._district_rows.get(district, np.empty(0, dtype=np.intp))
+        else:
+            rows = np.arange(len(self.frame))
+
+        mask = np.ones(len(rows), dtype=bool)
+        if school_type:
+            mask &= self._type_codes[rows] == self._type_index.get(school_type, -2)
+        if frpm_min is not None:
+            mask &= self._frpm[rows] >= frpm_min
+        if frpm_max is not None:
+            mask &= self._frpm[rows] <= frpm_max
+        for flag, required in (flags or {}).items():
+            mask &= self._flags[flag][rows] == bool(required)
+        rows = rows[mask]
+
+        if name and len(rows):
+            rows = rows[self._name_matches(name.lower().replace('\n', ' '))[rows]]
+
+        total = len(rows)
+        page_rows = rows[(page - 1) * per_page:page * per_page]
+        results = json.loads(self.frame.iloc[page_rows].to_json(orient='records')) if len(page_rows) else []
+
+        return {
+            'total': total,
+            'page': page,
+            'per_page': per_page,
+            'pages': (total + per_page - 1) // per_page,
+            'results': results,
+        }
+
+    def _name_matches(self, needle):
+        """Boolean array of the rows whose lowercased name contains needle"""
+        positions = [match.start() for match in re.finditer(re.escape(needle), self._names_text)]
+        matches = np.zeros(len(self._name_starts), dtype=bool)
+        matches[np.searchsorted(self._name_starts, positions, side='right') - 1] = True
+        return matches
+
+    def _payload(self, key, build):
+        """Return the payload for key, building it on first use"""
+        payload = self._payloads.get(key)
+        if payload is None:
+            # Two threads may build the same payload; both results are identical
+            payload = self._payloads.setdefault(key, PrecomputedPayload(build()))
+        return payload
+
+    def __len__(self):
+        return len(self.frame)
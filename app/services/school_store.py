@@ -0,0 +1,193 @@
+"""
+School Store Module
+
+Columnar on-disk copy of the school catalog, built by `flask ingest-schools`
+from data.csv and the per-district demographic CSVs. Sources are mapped onto
+one set of columns, FRPM fractions become percentages district by district and
+duplicate schools keep their first source's row. Loading the store skips CSV
+parsing entirely.
+
+The store is a folder holding a Parquet file when the optional `pyarrow`
+package is installed, or otherwise one .npy file per column (numbers as
+float64, text as fixed-width unicode, both readable memory-mapped). A
+manifest.json written last marks a complete store; its modification time is
+the store's version.
+"""
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+except ImportError:  # Optional: fall back to .npy columns
+    pyarrow = None
+
+
+MANIFEST_NAME = 'manifest.json'
+PARQUET_NAME = 'schools.parquet'
+
+DISTRICT_COLUMN = 'District Name'
+SCHOOL_COLUMN = 'School Name'
+
+# Column order of the store, matching data.csv
+STORE_COLUMNS = (
+    'District Name',
+    'School Name',
+    'School Type',
+    'Total Enrollment',
+    'Meal Program Participants',
+    'FRPM Percent (%)',
+    'Expanded Learning Program',
+    'After School Education Program',
+    'Estimated Funding (USD)',
+)
+NUMERIC_COLUMNS = ('Total Enrollment', 'Meal Program Participants', 'FRPM Percent (%)', 'Estimated Funding (USD)')
+
+# Alternate column names used by the demographic CSVs
+COLUMN_ALIASES = {
+    'total_enrollment': 'Total Enrollment',
+    'frpm_students': 'Meal Program Participants',
+    'frpm_percent': 'FRPM Percent (%)',
+    'meal_program_funding_est': 'Estimated Funding (USD)',
+}
+
+
+def frpm_percentages(values, districts=None):
+    """FRPM values as float64 percentages
+
+    Sources disagree on the scale, even within data.csv (some districts give
+    0.18-0.97, others 28.3-91.9), so the scale is chosen per district (or for
+    the whole column without districts): only a district whose values are all
+    at most 1 gives fractions. A true 0.5% among percentages stays 0.5.
+    """
+    values = pd.Series(pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype='float64'))
+    if districts is None:
+        scale_max = pd.Series(values.max(), index=values.index)
+    else:
+        scale_max = values.groupby(pd.Series(districts).to_numpy(), dropna=False).transform('max')
+    return np.where(scale_max <= 1.0, values * 100, values)
+
+
+def read_source(path, district=None):
+    """Read one school CSV into the store's columns
+
+    Args:
+        path (str): CSV file
+        district (str): District of every row, for files without a District Name column
+    """
+    frame = pd.read_csv(path)
+    frame.columns = frame.columns.str.strip()
+    frame = frame.rename(columns=COLUMN_ALIASES)
+
+    if district:
+        frame[DISTRICT_COLUMN] = district
+    if DISTRICT_COLUMN not in frame.columns:
+        raise ValueError(f"{path} has no '{DISTRICT_COLUMN}' column and no district was given")
+
+    for column in STORE_COLUMNS:
+        if column not in frame.columns:
+            frame[column] = np.nan if column in NUMERIC_COLUMNS else ''
+
+    for column in NUMERIC_COLUMNS:
+        values = frame[column].astype(str).str.replace(r'[$,\s]', '', regex=True)
+        frame[column] = pd.to_numeric(values, errors='coerce').astype('float64')
+
+    # Some districts give FRPM as fractions rather than percentages
+    frame['FRPM Percent (%)'] = frpm_percentages(frame['FRPM Percent (%)'], frame[DISTRICT_COLUMN])
+
+    for column in STORE_COLUMNS:
+        if column not in NUMERIC_COLUMNS:
+            frame[column] = frame[column].fillna('').astype(str).str.strip()
+
+    return frame[list(STORE_COLUMNS)]
+
+
+def merge_sources(frames):
+    """Concatenate source frames, keeping the first row seen for each district and school"""
+    merged = pd.concat(frames, ignore_index=True)
+    merged = merged[merged[SCHOOL_COLUMN] != '']
+    return merged.drop_duplicates(subset=[DISTRICT_COLUMN, SCHOOL_COLUMN], keep='first').reset_index(drop=True)
+
+
+def write_store(frame, folder):
+    """Write frame as a complete store, replacing any existing one"""
+    tmp_folder = f"{folder}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_folder, ignore_errors=True)
+    os.makedirs(tmp_folder)
+
+    if pyarrow is not None:
+        frame.to_parquet(os.path.join(tmp_folder, PARQUET_NAME), index=False)
+        storage = 'parquet'
+    else:
+        for index, column in enumerate(frame.columns):
+            values = frame[column].to_numpy()
+            if column in NUMERIC_COLUMNS:
+                values = values.astype('float64')
+            else:
+                values = values.astype(str)
+            np.save(os.path.join(tmp_folder, f"{index}.npy"), values, allow_pickle=False)
+        storage = 'npy'
+
+    manifest = {
+        'storage': storage,
+        'columns': list(frame.columns),
+        'rows': len(frame),
+        'created_at': time.time(),
+    }
+    with open(os.path.join(tmp_folder, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    old_folder = f"{folder}.old-{os.getpid()}"
+    if os.path.exists(folder):
+        os.replace(folder, old_folder)
+    os.replace(tmp_folder, folder)
+    shutil.rmtree(old_folder, ignore_errors=True)
+    return manifest
+
+
+def store_version(folder):
+    """(mtime_ns, size) of the store's manifest, or None if there is no complete store"""
+    try:
+        stat = os.stat(os.path.join(folder, MANIFEST_NAME))
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def read_store(folder):
+    """Load the store into a DataFrame"""
+    with open(os.path.join(folder, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    if manifest['storage'] == 'parquet':
+        return pd.read_parquet(os.path.join(folder, PARQUET_NAME))
+
+    return pd.DataFrame({
+        column: np.load(os.path.join(folder, f"{index}.npy"), mmap_mode='r', allow_pickle=False)
+        for index, column in enumerate(manifest['columns'])
+    })
+
+
+def ingest(sources, input_folder, store_folder):
+    """Merge the source CSVs into a new store and return its manifest
+
+    Args:
+        sources (list): {'file': ..., 'district': optional} dicts; files are relative to input_folder
+        input_folder (str): Folder of the source CSVs
+        store_folder (str): Store to (re)write
+    """
+    frames = []
+    for source in sources:
+        path = os.path.join(input_folder, source['file'])
+        frame = read_source(path, source.get('district'))
+        print(f"Read {len(frame)} schools from {path}")
+        frames.append(frame)
+
+    merged = merge_sources(frames)
+    manifest = write_store(merged, store_folder)
+    print(f"Wrote {manifest['rows']} schools to {store_folder} ({manifest['storage']})")
+    return manifest
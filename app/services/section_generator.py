@@ -0,0 +1,78 @@
+"""
+Section-Parallel Generation Module
+
+Splits a rendered YAML+Jinja template at its top-level headings and fills each
+section that still has TBD placeholders with its own model call. Calls run
+concurrently on a bounded pool and the results are stitched back in document
+order, so wall-clock time tracks the slowest section instead of the whole
+document. A section whose call fails (after the caller's own retries) fails
+the whole document, so an unfilled template is never passed off as a proposal.
+"""
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+
+PLACEHOLDER_PATTERN = re.compile(r'\bTBD\b')
+
+
+class SectionParallelGenerator:
+    """Generates template sections concurrently under a concurrency limit"""
+
+    def __init__(self, max_concurrency=4, max_heading_level=2):
+        self.max_heading_level = max_heading_level
+        self._heading_pattern = re.compile(rf'^#{{1,{max_heading_level}}}(?!#)\s', re.MULTILINE)
+        # Shared by all requests in this worker, so it also caps total upstream concurrency
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_concurrency),
+                                            thread_name_prefix='section-llm')
+
+    def split_sections(self, text):
+        """Split markdown before every top-level heading, keeping the text intact"""
+        starts = [match.start() for match in self._heading_pattern.finditer(text)]
+        if not starts or starts[0] != 0:
+            starts.insert(0, 0)
+        starts.append(len(text))
+
+        return [text[start:end] for start, end in zip(starts, starts[1:]) if end > start]
+
+    @staticmethod
+    def needs_generation(section):
+        """Only sections with TBD placeholders go to the model"""
+        return PLACEHOLDER_PATTERN.search(section) is not None
+
+    def iter_sections(self, rendered_text, build_prompt, call_model):
+        """Yield completed sections in document order while later ones still generate
+
+        build_prompt(section) returns the prompt for one section and
+        call_model(prompt) returns the model's text for it. The first failed
+        call's exception is raised once the sections before it are yielded, and
+        the remaining calls are cancelled.
+        """
+        sections = self.split_sections(rendered_text)
+        futures = [
+            self._executor.submit(call_model, build_prompt(section)) if self.needs_generation(section) else None
+            for section in sections
+        ]
+        print(f"Generating {sum(f is not None for f in futures)} of {len(sections)} template sections in parallel...")
+
+        try:
+            for index, (section, future) in enumerate(zip(sections, futures)):
+                if future is None:
+                    yield section
+                    continue
+
+                try:
+                    section_text = future.result()
+                except Exception as e:
+                    print(f"Section {index + 1} of {len(sections)} generation failed: {e}")
+                    raise
+
+                yield section_text.rstrip('\n') + '\n\n'
+        finally:
+            # Caller stopped early (e.g. client disconnected): drop queued calls
+            for future in futures:
+                if future is not None:
+                    future.cancel()
+
+    def generate(self, rendered_text, build_prompt, call_model):
+        """Generate every section and return the stitched document"""
+        return ''.join(self.iter_sections(rendered_text, build_prompt, call_model))
@@ -0,0 +1,177 @@
+"""
+Single-Flight Module
+
+Coalesces concurrent identical model calls so only one goes upstream. Within a
+worker, callers with the same key wait on the leader's future. Across gunicorn
+workers on the same host, leaders serialize on a per-key file lock in the state
+folder and publish their result next to it, so a worker that waited on the lock
+picks up the answer instead of calling Gemini again.
+"""
+import os
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+try:
+    import fcntl
+except ImportError:  # Windows: coalesce within a worker only
+    fcntl = None
+
+from services.request_control import CANCEL_POLL_SECONDS, RequestCancelled, check_cancelled
+
+
+LOCK_POLL_SECONDS = 0.1
+LOCK_FILE_MAX_AGE_SECONDS = 3600
+
+
+class SingleFlight:
+    """Runs one call per key at a time and shares its text result with waiters"""
+
+    def __init__(self, state_dir, wait_timeout=120.0, result_ttl=60.0):
+        """
+        Args:
+            state_dir (str): Folder for the cross-worker lock and result files
+            wait_timeout (float): Longest wait for another worker's call before calling anyway
+            result_ttl (float): How long published results stay readable by other workers
+        """
+        self.state_dir = state_dir
+        self.wait_timeout = wait_timeout
+        self.result_ttl = result_ttl
+        os.makedirs(state_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.stats = {'leaders': 0, 'followers': 0, 'cross_worker_hits': 0}
+
+    def do(self, key, func, cancel_event=None):
+        """Return func()'s text, sharing one execution among concurrent callers of key"""
+        while True:
+            with self._lock:
+                future = self._calls.get(key)
+                is_leader = future is None
+                if is_leader:
+                    future = Future()
+                    self._calls[key] = future
+                self.stats['leaders' if is_leader else 'followers'] += 1
+
+            if is_leader:
+                try:
+                    result = self._lead(key, func, cancel_event)
+                except Exception as e:
+                    future.set_exception(e)
+                    raise
+                else:
+                    future.set_result(result)
+                    return result
+                finally:
+                    with self._lock:
+                        self._calls.pop(key, None)
+
+            try:
+                return self._follow(future, cancel_event)
+            except RequestCancelled:
+                # The leader's client went away; unless ours did too, try again
+                check_cancelled(cancel_event)
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats['in_flight'] = len(self._calls)
+        stats['cross_worker'] = fcntl is not None
+        return stats
+
+    @staticmethod
+    def _follow(future, cancel_event):
+        """Wait for the leader's result while watching our own cancel event"""
+        while True:
+            check_cancelled(cancel_event)
+            try:
+                return future.result(timeout=CANCEL_POLL_SECONDS)
+            except FutureTimeoutError:
+                continue
+
+    def _lead(self, key, func, cancel_event):
+        """Run func under the key's file lock, or reuse a result another worker just published"""
+        if fcntl is None:
+            return func()
+
+        started_at = time.time()
+        with open(self._path(key, 'lock'), 'a') as lock_file:
+            locked, waited = self._acquire_file_lock(lock_file, cancel_event)
+            try:
+                if waited:
+                    result = self._read_result(key, started_at)
+                    if result is not None:
+                        with self._lock:
+                            self.stats['cross_worker_hits'] += 1
+                        print("Reusing Gemini response generated by another worker")
+                        return result
+
+                result = func()
+                self._write_result(key, result)
+                return result
+            finally:
+                if locked:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _acquire_file_lock(self, lock_file, cancel_event):
+        """Return (locked, waited); gives up on the lock after wait_timeout"""
+        deadline = time.monotonic() + self.wait_timeout
+        waited = False
+
+        while True:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                os.utime(lock_file.name)
+                return True, waited
+            except BlockingIOError:
+                pass
+
+            check_cancelled(cancel_event)
+            if time.monotonic() >= deadline:
+                print("Warning: Timed out waiting for another worker's identical Gemini call")
+                return False, waited
+            waited = True
+            time.sleep(LOCK_POLL_SECONDS)
+
+    def _read_result(self, key, newer_than):
+        """Return a result published after newer_than, or None"""
+        path = self._path(key, 'result')
+        try:
+            if os.path.getmtime(path) < newer_than:
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_result(self, key, result):
+        """Publish a result for workers waiting on the same key, then prune old files"""
+        if not isinstance(result, str):
+            return
+
+        path = self._path(key, 'result')
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(result)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Warning: Could not publish single-flight result: {e}")
+
+        self._prune()
+
+    def _prune(self):
+        """Remove expired results and long-unused lock files"""
+        now = time.time()
+        try:
+            for filename in os.listdir(self.state_dir):
+                path = os.path.join(self.state_dir, filename)
+                max_age = LOCK_FILE_MAX_AGE_SECONDS if filename.endswith('.lock') else self.result_ttl
+                if now - os.path.getmtime(path) > max_age:
+                    os.remove(path)
+        except OSError as e:
+            print(f"Warning: Could not prune single-flight files: {e}")
+
+    def _path(self, key, kind):
+        return os.path.join(self.state_dir, f"{key}.{kind}")
@@ -0,0 +1,181 @@
+"""
+Startup Module
+
+Warms the application's read-only state and reports how long startup took.
+With gunicorn's preload_app the master imports the app, runs the warmup once
+and then forks the workers, so the imported modules, the school table, the
+parsed templates and the header logo are shared copy-on-write instead of being
+built again in every worker. Right before forking, gc.freeze() moves every
+object the master created into the permanent generation, so the workers'
+garbage collector never writes to (and so never copies) those shared pages.
+
+Heavy libraries (pandas, NumPy, python-docx, PyYAML) are imported where they
+are used rather than when the app is imported, so a process can answer
+/healthz as soon as Flask is set up. The warmup can run in a background
+thread; it imports DEFERRED_MODULES and loads the read-only data while the
+process already serves requests, which otherwise load them on first use.
+"""
+import gc
+import importlib
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+# Modules kept off the import path of the app and imported by the warmup instead
+DEFERRED_MODULES = (
+    'yaml',
+    'numpy',
+    'pandas',
+    'docx',
+    'convert',
+    'services.school_dataset',
+    'services.school_store',
+    'services.budget_scenarios',
+)
+
+
+class StartupReport:
+    """Timed startup phases and memory use for one process"""
+
+    def __init__(self, started_at=None):
+        """
+        Args:
+            started_at (float): time.perf_counter() when startup began, if earlier than now
+        """
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.master_pid = os.getpid()
+        self.phases = {}
+        self.ready_seconds = None
+        self.preloaded = False
+        self.frozen_objects = 0
+        self.forked_at = None
+        self.warmup = 'off'
+        self.warm_seconds = None
+        self._warmup_thread = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name):
+        """Time a block of startup work under the given phase name"""
+        phase_started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.phases[name] = round(time.perf_counter() - phase_started_at, 4)
+
+    def mark_ready(self):
+        """Record the time from startup to a fully initialized app"""
+        self.ready_seconds = round(time.perf_counter() - self.started_at, 4)
+
+    def mark_warm(self):
+        """Record the time from startup to a finished warmup"""
+        self.warm_seconds = round(time.perf_counter() - self.started_at, 4)
+        self.warmup = 'done'
+
+    def get_report(self):
+        with self._lock:
+            phases = dict(self.phases)
+        return {
+            'pid': os.getpid(),
+            'parent_pid': os.getppid(),
+            'forked_from_master': os.getpid() != self.master_pid,
+            'preloaded': self.preloaded,
+            'ready_seconds': self.ready_seconds,
+            'warmup': self.warmup,
+            'warm_seconds': self.warm_seconds,
+            'phases': phases,
+            'frozen_objects': self.frozen_objects,
+            'seconds_since_fork': round(time.time() - self.forked_at, 1) if self.forked_at else None,
+            'memory_kb': read_memory_usage(),
+        }
+
+    def print_summary(self):
+        report = self.get_report()
+        phases = ", ".join(f"{name}={seconds * 1000:.0f}ms" for name, seconds in report['phases'].items())
+        memory = report['memory_kb']
+        warmup = f"warm in {report['warm_seconds']}s" if report['warm_seconds'] else f"warmup {report['warmup']}"
+        print(f"Startup ready in {report['ready_seconds']}s (pid {report['pid']}, {warmup}): "
+              f"{phases}; RSS {memory.get('rss', '?')} kB")
+
+
+def run_warmup(report, warmers):
+    """Run each (name, function) warmer as a timed startup phase
+
+    A failing warmer is reported and skipped; its data is then loaded on first use.
+    """
+    for name, warm in warmers:
+        try:
+            with report.phase(f"warm_{name}"):
+                warm()
+        except Exception as e:
+            print(f"Warning: Startup warmup '{name}' failed: {e}")
+
+
+def start_warmup(report, warmers, background=True):
+    """Run the warmers now, or in a daemon thread while the app starts serving"""
+    def warm():
+        run_warmup(report, warmers)
+        report.mark_warm()
+        if background:
+            report.print_summary()
+
+    report.warmup = 'running'
+    if not background:
+        warm()
+        return
+    report._warmup_thread = threading.Thread(target=warm, name='startup-warmup', daemon=True)
+    report._warmup_thread.start()
+
+
+def wait_for_warmup(report, timeout=None):
+    """Block until a background warmup has finished; True if none is still running"""
+    thread = report._warmup_thread
+    if thread is not None:
+        thread.join(timeout)
+        return not thread.is_alive()
+    return True
+
+
+def import_deferred_modules():
+    """Import DEFERRED_MODULES so the first request that needs them doesn't pay for it"""
+    for name in DEFERRED_MODULES:
+        importlib.import_module(name)
+
+
+def prepare_fork(report):
+    """Freeze the master's objects so forked workers share their memory pages
+
+    A background warmup is waited for first: threads don't survive a fork, and
+    its data should be loaded once here rather than in every worker.
+    """
+    wait_for_warmup(report)
+    report.preloaded = True
+    gc.collect()
+    gc.freeze()
+    report.frozen_objects = gc.get_freeze_count()
+
+
+def after_fork(report):
+    """Note the fork time in a newly forked worker"""
+    report.forked_at = time.time()
+
+
+def read_memory_usage():
+    """Resident memory of this process in kB, split into shared and private where the OS reports it"""
+    usage = {}
+    try:
+        with open('/proc/self/smaps_rollup', 'r') as f:
+            for line in f:
+                field, _, value = line.partition(':')
+                if field in ('Rss', 'Pss', 'Shared_Clean', 'Shared_Dirty', 'Private_Clean', 'Private_Dirty'):
+                    usage[field.lower()] = int(value.split()[0])
+    except OSError:
+        try:
+            import resource
+            usage['max_rss'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        except ImportError:
+            pass
+    return usage
@@ -0,0 +1,71 @@
+"""
+Streaming Post-Processing Module
+
+Applies the whole-text clean-up steps (normalize_empty_lines, fill_form_fields)
+to model output while it is still streaming, and formats server-sent events.
+"""
+import json
+
+
+class IncrementalPostProcessor:
+    """Runs a whole-text transform over a stream of chunks
+
+    Text is released only up to a "safe" line boundary that no post-processing
+    pattern can match across, so the concatenated output is identical to
+    running the transform once over the complete text. A boundary is safe when:
+
+    - it directly follows a newline and the next character is neither
+      whitespace (blank-line runs and the ``\\s+`` between ``(Name)`` and
+      ``(Title)``) nor ``(`` (the ``(Name)``/``(Company Name)`` signature lines)
+    - the last ``I, `` before it already has its closing comma, because the
+      ``I, Name, Title`` signature pattern may span lines until that comma
+    """
+
+    def __init__(self, transform):
+        self.transform = transform
+        self._pending = ''
+
+    def feed(self, chunk):
+        """Add a chunk and return any text that is now safe to emit"""
+        self._pending += chunk
+        cut = self._find_safe_cut()
+        if cut <= 0:
+            return ''
+
+        ready, self._pending = self._pending[:cut], self._pending[cut:]
+        return self.transform(ready)
+
+    def flush(self):
+        """Emit whatever is left once the stream has ended"""
+        ready, self._pending = self._pending, ''
+        return self.transform(ready) if ready else ''
+
+    def _find_safe_cut(self):
+        """Return the index of the last safe boundary in the pending text, or 0"""
+        text = self._pending
+        search_end = len(text) - 1
+
+        while search_end > 0:
+            newline = text.rfind('\n', 0, search_end)
+            if newline < 0:
+                return 0
+
+            cut = newline + 1
+            next_char = text[cut]
+            if not next_char.isspace() and next_char != '(' and self._signature_closed(text, cut):
+                return cut
+
+            search_end = newline
+
+        return 0
+
+    @staticmethod
+    def _signature_closed(text, cut):
+        """Check that an ``I, Name, Title`` match cannot continue past the cut"""
+        start = text.rfind('I, ', 0, cut)
+        return start < 0 or ',' in text[start + 3:cut]
+
+
+def format_sse(event, payload):
+    """Format a server-sent event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
@@ -0,0 +1,122 @@
+"""
+Template Registry Module
+
+Keeps the RFP prompt, requirements, YAML, Jinja and context files from the
+input folder in memory. A file is re-read only when its modification time or
+size changes, and that check runs at most once per check interval, so a request
+normally costs no disk I/O. Parsed forms (such as YAML) are cached alongside
+the text and are dropped together with it when the file changes.
+
+Jinja templates are compiled by a shared Environment whose bytecode cache lives
+in the state folder, so compiled templates are reused across requests and
+survive worker restarts.
+"""
+import os
+import threading
+import time
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+from services.overlay import freeze
+
+
+class TemplateRegistry:
+    """Process-wide cache of input files, revalidated by mtime"""
+
+    def __init__(self, base_folder, check_interval=2.0):
+        """
+        Args:
+            base_folder (str): Folder the file names are relative to
+            check_interval (float): Seconds between stat() checks of a file (0 checks every access)
+        """
+        self.base_folder = base_folder
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._stats = {}
+
+    def read_text(self, name):
+        """Return a file's text; raises FileNotFoundError if it does not exist"""
+        return self._entry(name)['text']
+
+    def load_parsed(self, name, kind, parser):
+        """Return parser(text) for a file, parsed once per file version
+
+        The result is shared by every caller and must be treated as read-only.
+        """
+        entry = self._entry(name)
+        parsed = entry['parsed']
+        if kind not in parsed:
+            value = parser(entry['text'])
+            with self._lock:
+                parsed.setdefault(kind, value)
+        return parsed[kind]
+
+    def load_yaml(self, name):
+        """Return a file's parsed YAML, frozen into read-only mappings and tuples"""
+        import yaml
+        return self.load_parsed(name, 'yaml', lambda text: freeze(yaml.safe_load(text)))
+
+    def get_stats(self):
+        """Per-file load, reload and hit counts"""
+        with self._lock:
+            return {
+                'check_interval_seconds': self.check_interval,
+                'files': {name: dict(stats) for name, stats in self._stats.items()},
+            }
+
+    def _entry(self, name):
+        """Return the cached entry for a file, reloading it if it changed on disk"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and now - entry['checked_at'] < self.check_interval:
+                self._stats[name]['hits'] += 1
+                return entry
+
+        path = os.path.join(self.base_folder, name)
+        stat = os.stat(path)
+        version = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and entry['version'] == version:
+                entry['checked_at'] = now
+                self._stats[name]['hits'] += 1
+                return entry
+
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+
+        with self._lock:
+            stats = self._stats.setdefault(name, {'loads': 0, 'reloads': 0, 'hits': 0, 'loaded_at': None})
+            if name in self._entries:
+                stats['reloads'] += 1
+                print(f"Reloading changed template file: {path}")
+            else:
+                print(f"Loading template file: {path}")
+            stats['loads'] += 1
+            stats['loaded_at'] = time.time()
+
+            entry = {'version': version, 'checked_at': now, 'text': text, 'parsed': {}}
+            self._entries[name] = entry
+            return entry
+
+
+def create_jinja_environment(template_folder, bytecode_cache_folder=None):
+    """Shared Environment over the input folder, with an optional on-disk bytecode cache
+
+    Uses jinja2.Template's defaults, so templates render exactly as before.
+    auto_reload recompiles a template when its file changes.
+    """
+    bytecode_cache = None
+    if bytecode_cache_folder:
+        os.makedirs(bytecode_cache_folder, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(bytecode_cache_folder)
+
+    return Environment(
+        loader=FileSystemLoader(template_folder, encoding='utf-8'),
+        bytecode_cache=bytecode_cache,
+        auto_reload=True,
+        cache_size=64
+    )
@@ -1,7 +1,8 @@
 // Main JavaScript for School Data Explorer
 class SchoolDataExplorer {
     constructor() {
-        this.allData = JSON.parse(document.getElementById('data-script').textContent);
+        // District name -> promise of its school rows, fetched on first selection
+        this.schoolsByDistrict = new Map();
         this.initializeElements();
         this.setupEventListeners();
         this.updateSchools();
@@ -191,9 +192,38 @@ class SchoolDataExplorer {
         return 0;
     }
 
-    updateSchools() {
+    async fetchSchools(district) {
+        if (!district) {
+            return [];
+        }
+
+        if (!this.schoolsByDistrict.has(district)) {
+            const request = fetch(`/api/schools/${encodeURIComponent(district)}`).then(response => {
+                if (!response.ok) {
+                    throw new Error(`Failed to fetch schools (HTTP ${response.status})`);
+                }
+                return response.json();
+            });
+            // Let a later selection retry after a failure
+            request.catch(() => this.schoolsByDistrict.delete(district));
+            this.schoolsByDistrict.set(district, request);
+        }
+
+        try {
+            return await this.schoolsByDistrict.get(district);
+        } catch (error) {
+            console.error('Error loading schools:', error);
+            return [];
+        }
+    }
+
+    async updateSchools() {
         const selectedDistrict = this.districtSelect.value;
-        const schoolsInDistrict = this.allData.filter(row => row['District Name'] === selectedDistrict);
+        const schoolsInDistrict = await this.fetchSchools(selectedDistrict);
+
+        if (this.districtSelect.value !== selectedDistrict) {
+            return; // The district changed while its schools were loading
+        }
 
         this.schoolCheckboxContainer.innerHTML = "";
         this.selectAllSchoolsCheckbox.checked = false;
@@ -496,6 +526,92 @@ class SchoolDataExplorer {
 
         this.generateBtn.style.display = 'none';
         this.loader.style.display = 'block';
+
+        // Streaming mode: the proposal page opens right away and streams the text in
+        const streamInput = document.getElementById('stream-hidden');
+        if (streamInput && streamInput.value === '1' && window.ReadableStream) {
+            return;
+        }
+        if (streamInput) {
+            streamInput.value = '';
+        }
+
+        // Generate in the background and poll, so the request doesn't hold a server thread
+        if (window.fetch) {
+            event.preventDefault();
+            this.submitProposalJob();
+        }
+    }
+
+    async submitProposalJob() {
+        try {
+            const response = await fetch('/api/proposal-jobs', {
+                method: 'POST',
+                body: new FormData(this.proposalForm)
+            });
+            const result = await response.json();
+
+            if (response.status === 429) {
+                const retryAfter = response.headers.get('Retry-After') || '5';
+                alert(`${result.error} (retry in about ${retryAfter} seconds)`);
+                this.resetGenerateButton();
+                return;
+            }
+
+            if (!response.ok) {
+                throw new Error(result.error || 'Failed to queue proposal');
+            }
+
+            this.watchProposalJobPage(result.cancel_url);
+            this.pollProposalJob(result.status_url, result.result_url);
+        } catch (error) {
+            console.error('Error queueing proposal:', error);
+            alert(`Error generating proposal: ${error.message}`);
+            this.resetGenerateButton();
+        }
+    }
+
+    async pollProposalJob(statusUrl, resultUrl) {
+        try {
+            const response = await fetch(statusUrl);
+            const job = await response.json();
+
+            if (!response.ok) {
+                throw new Error(job.error || 'Failed to check proposal status');
+            }
+
+            if (job.status === 'done') {
+                this.stopWatchingProposalJobPage();
+                window.location.href = resultUrl;
+            } else if (job.status === 'failed' || job.status === 'cancelled') {
+                throw new Error(job.error || 'Proposal generation failed');
+            } else {
+                setTimeout(() => this.pollProposalJob(statusUrl, resultUrl), 2000);
+            }
+        } catch (error) {
+            console.error('Error polling proposal job:', error);
+            this.stopWatchingProposalJobPage();
+            alert(`Error generating proposal: ${error.message}`);
+            this.resetGenerateButton();
+        }
+    }
+
+    watchProposalJobPage(cancelUrl) {
+        // Cancel the job on the server if the user leaves before it finishes
+        this.cancelProposalJobOnLeave = () => navigator.sendBeacon(cancelUrl);
+        window.addEventListener('pagehide', this.cancelProposalJobOnLeave);
+    }
+
+    stopWatchingProposalJobPage() {
+        if (this.cancelProposalJobOnLeave) {
+            window.removeEventListener('pagehide', this.cancelProposalJobOnLeave);
+            this.cancelProposalJobOnLeave = null;
+        }
+    }
+
+    resetGenerateButton() {
+        this.loader.style.display = 'none';
+        this.generateBtn.style.display = 'inline-block';
     }
 
     validateAllFields() {
@@ -4,6 +4,9 @@ Word Document Formatter Module
 This module provides functions to format Word documents by:
 1. Converting **text** to bold formatting
 2. Adding spaces after colons (text:word -> text: word)
+
+Documents built by MarkdownToDocxConverter already get both fixes as their
+runs are emitted; these functions are for .docx files made some other way.
 """
 
 from docx import Document
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+
+"""Benchmark: budget scenario grid calculation, vectorized vs one scenario at a time
+
+Times the /api/budget/scenarios calculation (including JSON serialization) for
+grids of increasing size and compares it with a per-scenario Python loop using
+the form's formulas. The target is an interactive slider update: 1,000
+scenarios in under 50 ms.
+
+Run from the repository root:
+
+    python benchmarks/bench_budget_scenarios.py
+"""
+
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app')
+sys.path.insert(0, APP_DIR)
+
+from services.budget_scenarios import budget_categories, scenario_grid, scenarios_json  # noqa: E402
+
+TARGET_MS = 50.0
+TARGET_SCENARIOS = 1_000
+REPEATS = 20
+
+# (label, inputs) from about a thousand to a hundred thousand scenarios
+GRIDS = [
+    ('1,000 scenarios', dict(schools=[1, 2, 3, 4, 5], weeks={'min': 4, 'max': 40, 'step': 4},
+                             days_per_week=[3, 4, 5, 2, 1], students_per_day=[25, 50, 75, 100],
+                             cost_per_student=[20])),
+    ('10,000 scenarios', dict(schools={'min': 1, 'max': 10}, weeks={'min': 1, 'max': 50},
+                              hours_per_day=[2, 3, 4, 5], students_per_day=[25, 50, 75, 100, 125],
+                              cost_per_student=20)),
+    ('100,000 scenarios', dict(schools={'min': 1, 'max': 20}, weeks={'min': 1, 'max': 50},
+                               days_per_week=[3, 4, 5, 2, 1], total_cost={'min': 10_000, 'max': 200_000, 'step': 10_000})),
+]
+
+
+def loop_scenarios(inputs):
+    """The same table built one scenario at a time, as a per-request loop would"""
+    grid = scenario_grid(inputs)
+    rows = []
+    for values in zip(*grid.values()):
+        row = dict(zip(grid, values))
+        days, weeks, hours = row['days_per_week'], row['weeks'], row['hours_per_day']
+        if 'cost_per_student' in row:
+            daily_cost = row['students_per_day'] * row['cost_per_student']
+            total_cost = daily_cost * days * weeks
+        else:
+            total_cost = row['total_cost']
+            daily_cost = total_cost / weeks / days
+            row['cost_per_student'] = daily_cost / row['students_per_day'] if row['students_per_day'] else None
+        row.update(total_cost=round(total_cost, 2), daily_cost=round(daily_cost, 2),
+                   weekly_cost=round(daily_cost * days, 2),
+                   cost_per_school=round(total_cost / row['schools'], 2) if row['schools'] else 0.0,
+                   program_hours=weeks * days * hours)
+        row.update({name: round(value, 2) for name, value in budget_categories(total_cost).items()})
+        rows.append(row)
+    return json.dumps(rows)
+
+
+def median_ms(func, repeats):
+    latencies = []
+    for _ in range(repeats):
+        started_at = time.perf_counter()
+        func()
+        latencies.append((time.perf_counter() - started_at) * 1000)
+    return float(np.median(latencies))
+
+
+def main():
+    passed = True
+    for label, inputs in GRIDS:
+        count = len(next(iter(scenario_grid(inputs).values())))
+        vectorized = median_ms(lambda: scenarios_json(inputs), REPEATS)
+        looped = median_ms(lambda: loop_scenarios(inputs), max(1, REPEATS // 10))
+        verdict = ''
+        if count <= TARGET_SCENARIOS:
+            verdict = '  PASS' if vectorized <= TARGET_MS else f'  FAIL (target {TARGET_MS:g} ms)'
+            passed &= vectorized <= TARGET_MS
+        print(f"{label:<18} ({count:>7,} rows)  vectorized {vectorized:8.2f} ms   "
+              f"loop {looped:9.2f} ms   {looped / vectorized:5.1f}x{verdict}")
+    return 0 if passed else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
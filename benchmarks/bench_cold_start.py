@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+"""Benchmark: import-time profile of the app and time to the first healthy response
+
+Part one imports the app under `python -X importtime` (warmup off) and lists
+the slowest imports, checking that none of the deferred heavy libraries are
+among them. Part two starts gunicorn from app/ with the fake LLM in several
+startup configurations and times the first 200 from /healthz against
+FIRST_HEALTHY_TARGET_SECONDS.
+
+Run from the repository root:
+
+    python benchmarks/bench_cold_start.py [top] [port]
+"""
+
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app')
+sys.path.insert(0, APP_DIR)
+
+from services.startup import DEFERRED_MODULES  # noqa: E402
+
+FIRST_HEALTHY_TARGET_SECONDS = 1.0
+
+# (label, environment); the first one is the shipped default
+CONFIGURATIONS = [
+    ('preload, background warmup', {'GUNICORN_PRELOAD': '1', 'STARTUP_WARMUP_BACKGROUND': '1'}),
+    ('per-worker, background warmup', {'GUNICORN_PRELOAD': '0', 'STARTUP_WARMUP_BACKGROUND': '1'}),
+    ('per-worker, blocking warmup', {'GUNICORN_PRELOAD': '0', 'STARTUP_WARMUP_BACKGROUND': '0'}),
+]
+
+
+def import_profile():
+    """[(cumulative_us, self_us, depth, module)] for importing the app with warmup off"""
+    env = dict(os.environ, USE_FAKE_LLM='1', STARTUP_WARMUP='0')
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'],
+                            cwd=APP_DIR, env=env, capture_output=True, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((int(cumulative_us), int(self_us), depth, name.strip()))
+    return rows
+
+
+def first_healthy_seconds(env_overrides, port):
+    env = dict(os.environ, USE_FAKE_LLM='1', **env_overrides)
+    started_at = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '-b', f'127.0.0.1:{port}', 'wsgi:app'],
+        cwd=APP_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while True:
+            try:
+                with urllib.request.urlopen(f'http://127.0.0.1:{port}/healthz', timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started_at
+            except OSError:
+                if server.poll() is not None:
+                    raise RuntimeError('gunicorn exited during startup')
+                time.sleep(0.01)
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+
+
+def main():
+    top = int(sys.argv[1]) if len(sys.argv) > 1 else 15
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else 5098
+
+    rows = import_profile()
+    total_us = next(cumulative for cumulative, _, depth, name in rows if name == 'app' and depth == 0)
+    print(f"Importing the app: {total_us / 1000:.0f} ms (including create_app with warmup off)")
+    print(f"  {'cumulative':>10} {'self':>8}  module")
+    for cumulative_us, self_us, depth, name in sorted(rows, reverse=True)[:top]:
+        print(f"  {cumulative_us / 1000:8.1f}ms {self_us / 1000:6.1f}ms  {'  ' * depth}{name}")
+    eager = sorted({name for _, _, _, name in rows if name in DEFERRED_MODULES})
+    print(f"  Deferred modules imported eagerly: {', '.join(eager) if eager else 'none'}")
+
+    print("Time to first healthy /healthz:")
+    passed = not eager
+    for index, (label, env_overrides) in enumerate(CONFIGURATIONS):
+        seconds = first_healthy_seconds(env_overrides, port + index)
+        verdict = ''
+        if index == 0:
+            passed &= seconds <= FIRST_HEALTHY_TARGET_SECONDS
+            verdict = '  PASS' if seconds <= FIRST_HEALTHY_TARGET_SECONDS else \
+                f'  FAIL (target {FIRST_HEALTHY_TARGET_SECONDS:g} s)'
+        print(f"  {label:<32} {seconds:6.2f} s{verdict}")
+    return 0 if passed else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
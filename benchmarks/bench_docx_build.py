@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+
+"""Benchmark: building a long proposal DOCX in one pass vs build, save, reformat, save
+
+The old path saved the converted document, reopened it with
+word_formatter.format_word_document to fix **bold** markers and colon spacing,
+and saved it again. The converter now applies those fixes as it emits runs,
+so the document is serialized once (to a file or a BytesIO). On a synthetic
+proposal of about 50 pages, times the build and then each way of producing
+the final file, with their peak traced allocations.
+
+Run from the repository root:
+
+    python benchmarks/bench_docx_build.py [pages] [repeats]
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from io import BytesIO
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app')
+sys.path.insert(0, APP_DIR)
+
+from docx import Document  # noqa: E402
+
+import word_formatter  # noqa: E402
+from convert import MarkdownToDocxConverter  # noqa: E402
+
+SECTION = """## Section {index}: Program Component {index}
+**Provider Name:**Music Science & Technology Group
+**Contact:**Program Director, Ph:(216) 903-3756
+Our program delivers music integration sessions at every site. Students rotate through composition,
+instrument building and *recording* activities, with **weekly showcases** for families. Sessions
+run Monday:Thursday from 3:00 to 6:00 and align with the district's expanded learning goals.
+Staff complete onboarding, background checks and training before their first session; site leads
+report attendance daily and meet with school coordinators every two weeks.
+- Music integration sessions with **hands-on** instruments
+- S.T.E.A.M. activities linking sound, math and physics
+  - Instrument design challenges
+  - Recording and editing projects
+1. Enrollment:open to all grade levels
+2. Schedule:three hours per day
+> Outcome:students build confidence through performance
+| Item | Cost:per student | Notes |
+|------|-------------------|-------|
+| Staffing | $12.00 | **Lead** and assistant instructors |
+| Materials | $3.00 | Instruments:kits and supplies |
+| Supervision | $2.00 | Site lead |
+
+"""
+# About one page of text per section
+SECTIONS_PER_PAGE = 1
+
+
+def proposal_markdown(pages):
+    return "# Program Proposal\n" + "".join(SECTION.format(index=index + 1)
+                                             for index in range(pages * SECTIONS_PER_PAGE))
+
+
+def build(text):
+    """Convert the proposal as ProposalService.build_document does (without the header)"""
+    document = Document()
+    converter = MarkdownToDocxConverter(document=document)
+    converter.add_heading("ELOP Program Proposal", level=0)
+    converter.convert(text.replace('** ', '**').replace(' **', '**'))
+    return document
+
+
+def two_pass_save(document, path):
+    """The previous path: save, reopen and reformat, save again"""
+    document.save(path)
+    word_formatter.format_word_document(path, path)
+
+
+def save_file(document, path):
+    document.save(path)
+
+
+def save_bytes(document, path):
+    buffer = BytesIO()
+    document.save(buffer)
+    return buffer
+
+
+def measure(func, args, repeats):
+    """Median milliseconds and peak traced (Python-level) allocations in MB"""
+    timings = []
+    for _ in range(repeats):
+        started_at = time.perf_counter()
+        func(*args)
+        timings.append((time.perf_counter() - started_at) * 1000)
+
+    tracemalloc.start()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings), peak / (1024 * 1024)
+
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    text = proposal_markdown(pages)
+    print(f"Synthetic proposal: {pages} pages, {len(text.split()):,} words, {text.count(chr(10)):,} lines")
+
+    build_ms, build_mb = measure(build, (text,), repeats)
+    print(f"  {'build (fixes applied as runs are emitted)':<44} {build_ms:8.1f} ms   peak {build_mb:6.1f} MB")
+
+    document = build(text)
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'proposal.docx')
+        results = [
+            ('before: save + reopen, reformat + save', measure(two_pass_save, (document, path), repeats)),
+            ('after: save once to a file', measure(save_file, (document, path), repeats)),
+            ('after: save once to a BytesIO', measure(save_bytes, (document, path), repeats)),
+        ]
+    baseline = results[0][1][0]
+    for label, (milliseconds, peak_mb) in results:
+        print(f"  {label:<44} {milliseconds:8.1f} ms   peak {peak_mb:6.1f} MB   "
+              f"saves {baseline - milliseconds:7.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+"""Benchmark: Markdown tables in MarkdownToDocxConverter, per-cell fill vs one XML pass
+
+The previous _add_table created the full grid with doc.add_table and filled
+each cell through table.cell(row, col), which rebuilds the list of every cell
+in the table on each call, so its time grew with the square of the row
+count (so it is only run up to PER_CELL_MAX_ROWS rows). The converter now
+writes all rows as one block of XML. The table is the Natomas compliance
+matrix (input_data/natomas_school_district_rfp_matrix.csv) rendered as
+Markdown and repeated to each row count; a roughly constant time per row
+shows linear scaling.
+
+Run from the repository root:
+
+    python benchmarks/bench_docx_tables.py [max_rows] [repeats]
+"""
+
+import csv
+import os
+import statistics
+import sys
+import time
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app')
+sys.path.insert(0, APP_DIR)
+
+from convert import MarkdownToDocxConverter, TABLE_SEPARATOR_PATTERN  # noqa: E402
+
+MATRIX_CSV = os.path.join(APP_DIR, 'input_data', 'natomas_school_district_rfp_matrix.csv')
+ROW_COUNTS = (10, 50, 100, 250, 500, 1000)
+# The per-cell path takes over ten seconds at 100 rows, so larger tables skip it
+PER_CELL_MAX_ROWS = 100
+
+
+class PerCellConverter(MarkdownToDocxConverter):
+    """The previous table path: full grid up front, then table.cell() per cell"""
+
+    def _add_table(self, table_lines):
+        data_lines = [line for line in table_lines if not TABLE_SEPARATOR_PATTERN.match(line)]
+        table_data = []
+        for line in data_lines:
+            cells = [cell.strip() for cell in line.split('|')]
+            if cells and cells[0] == '':
+                cells = cells[1:]
+            if cells and cells[-1] == '':
+                cells = cells[:-1]
+            if cells:
+                table_data.append(cells)
+        if not table_data:
+            return
+
+        max_cols = max(len(row) for row in table_data)
+        table = self.doc.add_table(rows=len(table_data), cols=max_cols)
+        table.style = 'Table Grid'
+        for row_idx, row_data in enumerate(table_data):
+            for col_idx, cell_data in enumerate(row_data):
+                cell = table.cell(row_idx, col_idx)
+                cell.text = ''
+                segments = [(content, marker if marker in ('**', '__', '***', '___', '*', '_') else None)
+                            for content, marker in self._inline_segments(cell_data)]
+                self._emit_runs(cell.paragraphs[0], segments)
+        self.doc.add_paragraph()
+
+
+def matrix_rows():
+    with open(MATRIX_CSV, newline='', encoding='utf-8') as f:
+        rows = list(csv.reader(f))
+    header, body = rows[0], [row for row in rows[1:] if any(row)]
+    return header, body
+
+
+def table_markdown(header, body, row_count):
+    def line(cells):
+        return '| ' + ' | '.join(cell.replace('|', '/').replace('\n', ' ') for cell in cells) + ' |'
+
+    lines = [line(header), '|' + '---|' * len(header)]
+    for index in range(row_count):
+        row = list(body[index % len(body)])
+        row[0] = f"**{row[0]}**"
+        lines.append(line(row + [''] * (len(header) - len(row))))
+    return '\n'.join(lines)
+
+
+def measure(converter_class, text, repeats):
+    """Median milliseconds to convert text, not counting the creation of the document"""
+    timings = []
+    for _ in range(repeats):
+        converter = converter_class()
+        started_at = time.perf_counter()
+        converter.convert(text)
+        timings.append((time.perf_counter() - started_at) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    max_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    header, body = matrix_rows()
+    print(f"Compliance matrix: {len(header)} columns, {len(body)} distinct rows repeated to each size")
+    print(f"  {'rows':>6} {'per-cell ms':>12} {'us/row':>8} {'one-pass ms':>12} {'us/row':>8} {'speedup':>8}")
+
+    for row_count in [count for count in ROW_COUNTS if count <= max_rows]:
+        text = table_markdown(header, body, row_count)
+        after = measure(MarkdownToDocxConverter, text, repeats)
+        if row_count > PER_CELL_MAX_ROWS:
+            print(f"  {row_count:>6} {'-':>12} {'-':>8} {after:>12.1f} {after * 1000 / row_count:>8.0f} {'-':>8}")
+            continue
+        before = measure(PerCellConverter, text, 1 if row_count == PER_CELL_MAX_ROWS else repeats)
+        print(f"  {row_count:>6} {before:>12.1f} {before * 1000 / row_count:>8.0f} "
+              f"{after:>12.1f} {after * 1000 / row_count:>8.0f} {before / after:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
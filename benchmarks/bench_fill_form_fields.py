@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+
+"""Benchmark: fill_form_fields rule engine vs the original 15-pass implementation
+
+Checks that both produce identical output, then times them on the RFP response
+template (blank and with AI-filled fields) and on the sample proposal, each
+scaled up to roughly 50 KB. Run from the repository root:
+
+    python benchmarks/bench_fill_form_fields.py [iterations]
+"""
+
+import os
+import re
+import sys
+import timeit
+from datetime import date
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app')
+sys.path.insert(0, APP_DIR)
+
+from services.form_fields import rewrite_form_fields  # noqa: E402
+
+PROMPT_VARIABLES = {
+    'company_name': 'Musical Instruments N Kids Hands (M.I.N.K.H.) - Music Science & Technology Group (MSTG)',
+    'representative_name': 'A.P. Moore, Program Coordinator',
+    'representative_title': 'Program Coordinator',
+    'company_email': 'aphilanda@musicsciencegroup.com',
+    'company_phone': '(216) 903-3756',
+    'company_address': '2150 Capitol Avenue Sacramento, CA 95816',
+    'today': '2025-09-24',
+}
+
+
+def legacy_fill_form_fields(text, prompt_variables):
+    """The original implementation, kept here for comparison"""
+    replacements = {
+        r'\*\*Company Name:\*\* _{10,}': f"**Company Name:** {prompt_variables.get('company_name', 'Musical Instruments N Kids Hands (M.I.N.K.H.) - Music Science & Technology Group (MSTG)')}",
+        r'\*\*Authorized Representative Name:\*\* _{10,}': f"**Authorized Representative Name:** {prompt_variables.get('representative_name', 'A.P. Moore, Program Coordinator')}",
+        r'\*\*Title:\*\* _{10,}': f"**Title:** {prompt_variables.get('representative_title', 'Program Coordinator')}",
+        r'\*\*Email:\*\* _{10,}': f"**Email:** {prompt_variables.get('company_email', 'aphilanda@musicsciencegroup.com')}",
+        r'\*\*Phone:\*\* _{10,}': f"**Phone:** {prompt_variables.get('company_phone', '(216) 903-3756')}",
+        r'\*\*Address:\*\* _{10,}': f"**Address:** {prompt_variables.get('company_address', '2150 Capitol Avenue Sacramento, CA 95816')}",
+        r'\*\*Authorized Signature:\*\* _{10,}': f"**Authorized Signature:** {prompt_variables.get('representative_name', 'A.P. Moore, Program Coordinator')}",
+        r'\*\*Date:\*\* _{10,}': f"**Date:** {prompt_variables.get('today', date.today())}"
+    }
+    for pattern, replacement in replacements.items():
+        text = re.sub(pattern, replacement, text)
+
+    signature_patterns = {
+        r'I, ([^,]+), ([^\n]+)\n\(Name\)\s+\(Title\)': r'I, \1 _________________________, \2 _______________________  \n(Name)                                   (Title)',
+        r'Of ([^\n]+) hereby certify:\n\(Company Name\)': r'Of \1 ______________________________________ hereby certify:  \n(Company Name)',
+        r'\*\*Signature:\*\* ([^\n]+)': r'**Signature:** ____________________________',
+        r'\*\*Authorized Signature \(Disclosee\):\*\* ([^\n]+)': r'**Authorized Signature (Disclosee):** ____________________________',
+        r'\*\*Date:\*\* [0-9]{4}-[0-9]{2}-[0-9]{2}': r'**Date:** _____________',
+        r'\*\*Date:\*\* [^\n]+\d{4}': r'**Date:** _____________',
+        r'\*\*Initial Here:\*\* ([A-Z]+)': r'**Initial Here:** ____',
+    }
+    for pattern, replacement in signature_patterns.items():
+        text = re.sub(pattern, replacement, text)
+
+    return text
+
+
+def new_fill_form_fields(text, prompt_variables):
+    """Same field values as ProposalService.fill_form_fields"""
+    return rewrite_form_fields(text, {
+        'Company Name': prompt_variables.get('company_name'),
+        'Authorized Representative Name': prompt_variables.get('representative_name'),
+        'Title': prompt_variables.get('representative_title'),
+        'Email': prompt_variables.get('company_email'),
+        'Phone': prompt_variables.get('company_phone'),
+        'Address': prompt_variables.get('company_address'),
+        'Authorized Signature': prompt_variables.get('representative_name'),
+        'Date': prompt_variables.get('today'),
+    })
+
+
+def load(relative_path):
+    with open(os.path.join(APP_DIR, relative_path), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def scale(text, target_bytes=50_000):
+    return (text + '\n') * max(1, target_bytes // (len(text) + 1))
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    template = load('input_data/NUSD_RFP_Response_Template_Enhanced.md')
+    # What the model typically returns: blanks filled with names, dates and initials
+    ai_filled = re.sub(r'_{10,}', 'A.P. Moore, Program Coordinator 2025-09-24', template)
+    ai_filled = ai_filled.replace('**Initial Here:** ____', '**Initial Here:** APM')
+    sample_proposal = load('data_static/proposal.txt')
+
+    corpora = {
+        'blank RFP response template': scale(template),
+        'AI-filled RFP response template': scale(ai_filled),
+        'sample narrative proposal': scale(sample_proposal),
+        'narrative + one form (typical)': scale(sample_proposal, 45_000) + ai_filled,
+    }
+
+    for name, text in corpora.items():
+        expected = legacy_fill_form_fields(text, PROMPT_VARIABLES)
+        actual = new_fill_form_fields(text, PROMPT_VARIABLES)
+        if actual != expected:
+            raise SystemExit(f"Output mismatch on {name}")
+
+        legacy_time = timeit.timeit(lambda: legacy_fill_form_fields(text, PROMPT_VARIABLES), number=iterations)
+        new_time = timeit.timeit(lambda: new_fill_form_fields(text, PROMPT_VARIABLES), number=iterations)
+
+        print(f"{name} ({len(text) / 1024:.0f} KB), output identical:")
+        print(f"  original 15 passes: {legacy_time / iterations * 1000:8.3f} ms")
+        print(f"  line-oriented pass: {new_time / iterations * 1000:8.3f} ms"
+              f"  ({legacy_time / new_time:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
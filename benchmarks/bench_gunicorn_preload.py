@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+"""Benchmark: gunicorn cold start and per-worker memory with and without preload_app
+
+Starts gunicorn from app/ with the fake LLM, times the first healthy /healthz
+response, then reads each worker's memory from /proc (Linux only). Pss splits
+pages shared between processes evenly, so it shows how much preloading saves.
+
+Run from the repository root:
+
+    python benchmarks/bench_gunicorn_preload.py [workers] [port]
+"""
+
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app')
+
+
+def child_pids(parent_pid):
+    pids = []
+    for name in os.listdir('/proc'):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f'/proc/{name}/stat', 'r') as f:
+                fields = f.read().rsplit(')', 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == parent_pid:
+            pids.append(int(name))
+    return pids
+
+
+def memory_kb(pid):
+    usage = {}
+    with open(f'/proc/{pid}/smaps_rollup', 'r') as f:
+        for line in f:
+            field, _, value = line.partition(':')
+            if field in ('Rss', 'Pss', 'Private_Clean', 'Private_Dirty'):
+                usage[field] = int(value.split()[0])
+    usage['Private'] = usage.pop('Private_Clean', 0) + usage.pop('Private_Dirty', 0)
+    return usage
+
+
+def run(preload, workers, port):
+    env = dict(os.environ, USE_FAKE_LLM='1', GUNICORN_PRELOAD='1' if preload else '0')
+    started_at = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '-w', str(workers),
+         '-b', f'127.0.0.1:{port}', 'wsgi:app'],
+        cwd=APP_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while True:
+            try:
+                with urllib.request.urlopen(f'http://127.0.0.1:{port}/healthz', timeout=1) as response:
+                    if response.status == 200:
+                        break
+            except OSError:
+                if server.poll() is not None:
+                    raise RuntimeError('gunicorn exited during startup')
+                time.sleep(0.02)
+        first_healthy = time.perf_counter() - started_at
+
+        # Let every worker finish booting before measuring memory
+        deadline = time.monotonic() + 60
+        while len(child_pids(server.pid)) < workers and time.monotonic() < deadline:
+            time.sleep(0.1)
+        time.sleep(2)
+
+        worker_memory = [memory_kb(pid) for pid in child_pids(server.pid)]
+        master_memory = memory_kb(server.pid)
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+
+    label = 'preload' if preload else 'no preload'
+    print(f"{label:>10}: first healthy after {first_healthy:.2f}s; master Pss {master_memory['Pss'] / 1024:.1f} MB")
+    for index, usage in enumerate(worker_memory):
+        print(f"{'':>12}worker {index + 1}: Rss {usage['Rss'] / 1024:.1f} MB, "
+              f"Pss {usage['Pss'] / 1024:.1f} MB, private {usage['Private'] / 1024:.1f} MB")
+    total_pss = sum(usage['Pss'] for usage in worker_memory) + master_memory['Pss']
+    print(f"{'':>12}total Pss {total_pss / 1024:.1f} MB")
+
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else 5099
+    for preload in (False, True):
+        run(preload, workers, port)
+
+
+if __name__ == '__main__':
+    main()
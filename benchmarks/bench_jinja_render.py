@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+
+"""Microbenchmark: Jinja render cost with per-request compilation vs the shared environment
+
+Run from the repository root:
+
+    python benchmarks/bench_jinja_render.py [iterations]
+"""
+
+import os
+import sys
+import tempfile
+import timeit
+
+import jinja2
+import yaml
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app')
+sys.path.insert(0, APP_DIR)
+
+from config.settings import RFP_TYPE_FILES  # noqa: E402
+from services.template_registry import create_jinja_environment  # noqa: E402
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    input_folder = os.path.join(APP_DIR, 'input_data')
+
+    with tempfile.TemporaryDirectory() as cache_folder:
+        env = create_jinja_environment(input_folder, cache_folder)
+
+        for rfp_type, files in RFP_TYPE_FILES.items():
+            if 'jinja' not in files:
+                continue
+
+            with open(os.path.join(input_folder, files['yaml']), 'r', encoding='utf-8') as f:
+                template_vars = yaml.safe_load(f)['vars']
+            with open(os.path.join(input_folder, files['jinja']), 'r', encoding='utf-8') as f:
+                source = f.read()
+
+            env.get_template(files['jinja'])  # warm, as at startup
+
+            compile_each_time = timeit.timeit(
+                lambda: jinja2.Template(source).render(**template_vars), number=iterations)
+            shared_environment = timeit.timeit(
+                lambda: env.get_template(files['jinja']).render(**template_vars), number=iterations)
+
+            # A fresh environment (as after a worker restart) loading from the bytecode cache
+            restarted_env = create_jinja_environment(input_folder, cache_folder)
+            cold_start = timeit.timeit(lambda: restarted_env.get_template(files['jinja']), number=1)
+
+            print(f"{rfp_type} ({files['jinja']}):")
+            print(f"  compile + render per request: {compile_each_time / iterations * 1000:8.3f} ms")
+            print(f"  render only (shared env):     {shared_environment / iterations * 1000:8.3f} ms")
+            print(f"  first load from bytecode:     {cold_start * 1000:8.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+
+"""Benchmark: PDF export with a new LibreOffice process per document vs the converter pool
+
+Builds a proposal DOCX, then converts copies of it: first one at a time with
+the old one-shot `libreoffice --convert-to pdf` command (shared default
+profile), then concurrently through PdfConverterPool. Reports per-document
+latency and total wall time. Needs LibreOffice; the pool keeps its instances
+alive over UNO when some Python (this one, /usr/bin/python3 or
+LIBREOFFICE_PYTHON) can import the `uno` module, and uses isolated one-shot
+runs otherwise. In the Docker image, with the repository mounted:
+
+    docker run --rm -v "$PWD":/src -w /src <image> python benchmarks/bench_pdf_pool.py
+
+Run from the repository root:
+
+    python benchmarks/bench_pdf_pool.py [documents] [pool_size]
+"""
+
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app')
+sys.path.insert(0, APP_DIR)
+
+from docx import Document  # noqa: E402
+
+from convert import MarkdownToDocxConverter  # noqa: E402
+from services.pdf_converter import PdfConverterPool, find_soffice  # noqa: E402
+
+PROPOSAL = """# Program Proposal
+## Executive Summary
+**Provider:**Music Science & Technology Group
+Our program delivers music integration sessions at every site, with **weekly showcases** for families.
+- Music integration sessions
+- S.T.E.A.M. activities
+| Item | Cost |
+|------|------|
+| Staffing | $12.00 |
+| Materials | $3.00 |
+"""
+
+
+def make_documents(folder, count):
+    document = Document()
+    MarkdownToDocxConverter(document=document).convert(PROPOSAL * 10)
+    source = os.path.join(folder, 'proposal_0.docx')
+    document.save(source)
+    paths = [source]
+    for index in range(1, count):
+        paths.append(os.path.join(folder, f'proposal_{index}.docx'))
+        shutil.copyfile(source, paths[-1])
+    return paths
+
+
+def one_shot(binary, docx_path):
+    """The previous per-document command"""
+    started_at = time.perf_counter()
+    subprocess.run([binary, '--headless', '--convert-to', 'pdf', '--outdir', os.path.dirname(docx_path), docx_path],
+                   check=True, capture_output=True)
+    return time.perf_counter() - started_at
+
+
+def pooled(pool, docx_path):
+    started_at = time.perf_counter()
+    pool.convert(docx_path, docx_path.replace('.docx', '.pool.pdf'))
+    return time.perf_counter() - started_at
+
+
+def report(label, latencies, wall_seconds):
+    print(f"  {label:<36} median {statistics.median(latencies):6.2f} s   max {max(latencies):6.2f} s   "
+          f"wall {wall_seconds:6.2f} s")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    pool_size = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    binary = find_soffice()
+    if binary is None:
+        print("LibreOffice (libreoffice or soffice) is not on the PATH; nothing to measure")
+        return 0
+
+    with tempfile.TemporaryDirectory() as folder:
+        paths = make_documents(folder, count)
+
+        started_at = time.perf_counter()
+        latencies = [one_shot(binary, path) for path in paths]
+        report('one process per document (serial)', latencies, time.perf_counter() - started_at)
+
+        pool = PdfConverterPool(os.path.join(folder, 'profiles'), size=pool_size, timeout=120,
+                                python=os.environ.get('LIBREOFFICE_PYTHON') or None)
+        pool.warm()
+        print(f"  pool: {pool_size} instances, {pool.mode} mode"
+              + (f" (UNO helper on {pool.uno_python})" if pool.uno_python else ""))
+        with ThreadPoolExecutor(max_workers=pool_size) as executor:
+            # Start every instance (and initialize its profile) once, as a running worker would have
+            list(executor.map(lambda path: pooled(pool, path), paths[:pool_size]))
+            started_at = time.perf_counter()
+            latencies = list(executor.map(lambda path: pooled(pool, path), paths))
+        report(f'pool, {pool_size} concurrent', latencies, time.perf_counter() - started_at)
+        print(f"  {pool.get_stats()}")
+        pool.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
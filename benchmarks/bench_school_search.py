@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+
+"""Benchmark: school store loading and search latency on synthetic statewide data
+
+Builds a synthetic catalog (100,000 schools across 1,000 districts by default),
+writes it as data.csv and as the columnar store, then times loading each and
+running typical search queries against the latency targets below.
+
+Run from the repository root:
+
+    python benchmarks/bench_school_search.py [rows]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app')
+sys.path.insert(0, APP_DIR)
+
+from services import school_store  # noqa: E402
+from services.school_dataset import SchoolDataset  # noqa: E402
+
+# p95 latency targets in milliseconds
+SEARCH_TARGET_MS = 25.0
+DISTRICT_TARGET_MS = 10.0
+QUERY_REPEATS = 200
+
+SCHOOL_TYPES = ['Elementary Schools (Public)', 'Intermediate/Middle Schools (Public)',
+                'High Schools (Public)', 'K-12 Schools (Public)', 'Alternative Schools of Choice']
+
+
+def synthetic_catalog(rows, districts=1000, seed=7):
+    rng = np.random.default_rng(seed)
+    enrollment = rng.integers(50, 3000, rows)
+    frpm_percent = rng.uniform(0, 100, rows)
+    return pd.DataFrame({
+        'District Name': [f"District {i:04d} Unified School District" for i in rng.integers(0, districts, rows)],
+        'School Name': [f"School {i:06d}" for i in range(rows)],
+        'School Type': rng.choice(SCHOOL_TYPES, rows),
+        'Total Enrollment': enrollment,
+        'Meal Program Participants': (enrollment * frpm_percent / 100).astype(int),
+        'FRPM Percent (%)': frpm_percent,
+        'Expanded Learning Program': rng.choice(['Yes', 'No'], rows),
+        'After School Education Program': rng.choice(['Yes', 'No'], rows),
+        'Estimated Funding (USD)': enrollment * 1000.99,
+    })
+
+
+def timed(func, repeats=1):
+    """Return (last result, list of latencies in ms)"""
+    latencies = []
+    for _ in range(repeats):
+        started_at = time.perf_counter()
+        result = func()
+        latencies.append((time.perf_counter() - started_at) * 1000)
+    return result, latencies
+
+
+def report(label, latencies, target=None):
+    p50, p95 = np.percentile(latencies, [50, 95])
+    verdict = '' if target is None else ('  PASS' if p95 <= target else f'  FAIL (target {target:g} ms)')
+    print(f"  {label:<44} p50 {p50:8.2f} ms   p95 {p95:8.2f} ms{verdict}")
+    return target is None or p95 <= target
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    catalog = synthetic_catalog(rows)
+    print(f"Synthetic catalog: {rows:,} schools, {catalog['District Name'].nunique():,} districts "
+          f"(store format: {'parquet' if school_store.pyarrow else 'npy'})")
+
+    with tempfile.TemporaryDirectory() as folder:
+        csv_path = os.path.join(folder, 'data.csv')
+        store_folder = os.path.join(folder, 'school_store')
+        catalog.to_csv(csv_path, index=False)
+        school_store.write_store(school_store.read_source(csv_path), store_folder)
+
+        print("Loading:")
+        _, csv_latencies = timed(lambda: SchoolDataset.load(csv_path), repeats=3)
+        report('parse data.csv + build index', csv_latencies)
+        dataset, store_latencies = timed(lambda: SchoolDataset(school_store.read_store(store_folder)), repeats=3)
+        report('read store + build index', store_latencies)
+
+    district = dataset.districts[len(dataset.districts) // 2]
+    queries = [
+        ('district page', DISTRICT_TARGET_MS, dict(district=district)),
+        ('district + FRPM range + flags', DISTRICT_TARGET_MS,
+         dict(district=district, frpm_min=40, frpm_max=90, flags={'expanded_learning': True})),
+        ('statewide school type + FRPM range', SEARCH_TARGET_MS,
+         dict(school_type='High Schools (Public)', frpm_min=75)),
+        ('statewide flags + deep page', SEARCH_TARGET_MS,
+         dict(flags={'expanded_learning': True, 'after_school': False}, page=200)),
+        ('statewide name substring', SEARCH_TARGET_MS, dict(name='12')),
+    ]
+
+    print(f"Search ({QUERY_REPEATS} runs each):")
+    passed = True
+    for label, target, kwargs in queries:
+        result, latencies = timed(lambda: dataset.search(**kwargs), repeats=QUERY_REPEATS)
+        passed &= report(f"{label} ({result['total']:,} matches)", latencies, target)
+
+    print("All latency targets met" if passed else "Some latency targets missed")
+    return 0 if passed else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,50 @@
+"""Shared pytest fixtures: the app's modules on sys.path and a fake-LLM app with its own state folder"""
+
+import os
+import sys
+
+import pytest
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app')
+sys.path.insert(0, APP_DIR)
+
+# A valid proposal form for a YAML+Jinja RFP type
+PROPOSAL_FORM = {
+    'district': 'Natomas Unified',
+    'rfp_type': 'Request for Qualifications',
+    'schoolname': 'Natomas Park Elementary',
+    'total_students_display': '40',
+    'cost_per_student_display': '15',
+    'num_weeks': '10',
+    'days_per_week': '5',
+}
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """Flask app answering from the local fake LLM, with generated files and runtime state under tmp_path
+
+    Set tuning environment variables with monkeypatch before requesting it.
+    Built like create_app, without the startup warmup.
+    """
+    from flask import Flask
+    from config.settings import Config
+    from routes.main_routes import main_bp, init_services
+
+    monkeypatch.setenv('USE_FAKE_LLM', '1')
+    # The fake LLM has no quota; keep the per-key limiter out of the way
+    monkeypatch.setenv('GEMINI_RPM_LIMIT', '100000')
+    monkeypatch.setattr(Config, 'INPUT_FILES_FOLDER_NAME', os.path.join(APP_DIR, 'input_data'))
+    monkeypatch.setattr(Config, 'DOWNLOAD_FOLDER_NAME', str(tmp_path / 'generated_proposals'))
+    monkeypatch.setattr(Config, 'STATE_FOLDER_NAME', str(tmp_path / 'runtime_state'))
+
+    flask_app = Flask('app', root_path=APP_DIR)
+    Config().init_app(flask_app)
+    init_services(flask_app)
+    flask_app.register_blueprint(main_bp)
+    return flask_app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
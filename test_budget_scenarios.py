@@ -0,0 +1,103 @@
+"""Tests for the budget scenario grid and its API"""
+
+import json
+
+import numpy as np
+import pytest
+
+from services.budget_scenarios import MAX_AXIS_VALUES, MAX_SCENARIOS, calculate_scenarios, scenarios_json
+
+
+def strict_json(text):
+    """Parse JSON, refusing the NaN and Infinity literals browsers cannot read"""
+    def refuse(constant):
+        raise AssertionError(f"{constant} in JSON")
+    return json.loads(text, parse_constant=refuse)
+
+
+def test_figures_follow_the_form_formulas():
+    row = calculate_scenarios({'schools': 2, 'weeks': 10, 'days_per_week': 5, 'hours_per_day': 3,
+                               'students_per_day': 40, 'cost_per_student': 15}).iloc[0]
+    assert row['daily_cost'] == 600
+    assert row['weekly_cost'] == 3000
+    assert row['total_cost'] == 30000
+    assert row['cost_per_school'] == 15000
+    assert row['cost_per_hour'] == 5
+    assert row['program_hours'] == 150
+    assert row['cost_per_program_hour'] == 200
+    assert row['staffing'] == 18000
+
+
+def test_total_cost_is_worked_back_to_a_cost_per_student():
+    row = calculate_scenarios({'weeks': 10, 'students_per_day': 40, 'total_cost': 30000}).iloc[0]
+    assert row['cost_per_student'] == 15
+    assert row['days_per_week'] == 5
+
+
+def test_every_combination_is_a_row():
+    table = calculate_scenarios({'weeks': [4, 8], 'students_per_day': {'min': 10, 'max': 30, 'step': 10},
+                                 'cost_per_student': 12})
+    assert len(table) == 6
+    # The last input varies fastest
+    assert table[['weeks', 'students_per_day']].values.tolist() == [
+        [4, 10], [4, 20], [4, 30], [8, 10], [8, 20], [8, 30]]
+
+
+def test_grid_size_limits():
+    axis = {'min': 1, 'max': 100}
+    assert len(calculate_scenarios({'weeks': axis, 'students_per_day': axis, 'schools': [1] * 10,
+                                    'cost_per_student': 10})) == MAX_SCENARIOS
+    with pytest.raises(ValueError, match=f'at most {MAX_SCENARIOS}'):
+        calculate_scenarios({'weeks': axis, 'students_per_day': axis, 'schools': [1] * 11, 'cost_per_student': 10})
+    with pytest.raises(ValueError, match=f'more than {MAX_AXIS_VALUES}'):
+        calculate_scenarios({'weeks': {'min': 0, 'max': MAX_AXIS_VALUES}, 'cost_per_student': 10})
+    with pytest.raises(ValueError, match=f'between 1 and {MAX_AXIS_VALUES}'):
+        calculate_scenarios({'weeks': list(range(MAX_AXIS_VALUES + 1)), 'cost_per_student': 10})
+
+
+@pytest.mark.parametrize('inputs, message', [
+    ({'weeks': 4}, 'exactly one'),
+    ({'cost_per_student': 10, 'total_cost': 1000}, 'exactly one'),
+    ({'cost_per_student': 10, 'months': 2}, 'Unknown scenario inputs: months'),
+    ({'cost_per_student': 10, 'weeks': -1}, 'non-negative'),
+    ({'cost_per_student': 10, 'weeks': [4, float('nan')]}, 'non-negative'),
+    ({'cost_per_student': 10, 'weeks': []}, 'between 1 and'),
+    ({'cost_per_student': 10, 'weeks': 'four'}, 'must be a number'),
+    ({'cost_per_student': 10, 'weeks': {'min': 8, 'max': 4}}, 'must be a number'),
+    ({'cost_per_student': 10, 'weeks': {'min': 1, 'max': 4, 'step': 0}}, 'must be a number'),
+])
+def test_invalid_inputs_are_rejected(inputs, message):
+    with pytest.raises(ValueError, match=message):
+        calculate_scenarios(inputs)
+
+
+def test_division_by_zero_gives_nan():
+    table = calculate_scenarios({'weeks': [0, 2], 'hours_per_day': 0, 'students_per_day': 0, 'total_cost': 1000})
+    assert np.isnan(table['cost_per_student']).all()
+    assert np.isnan(table['cost_per_hour']).all()
+    assert np.isnan(table['cost_per_program_hour']).all()
+    assert np.isnan(table.loc[0, 'weekly_cost'])
+    assert table.loc[1, 'weekly_cost'] == 500
+    # The split only needs the total
+    assert (table['staffing'] == 600).all()
+
+
+def test_json_has_null_for_division_by_zero():
+    table = strict_json(scenarios_json({'students_per_day': 0, 'hours_per_day': 0, 'total_cost': 1000}))
+    row = dict(zip(table['columns'], table['data'][0]))
+    assert row['cost_per_student'] is None
+    assert row['cost_per_hour'] is None
+    assert row['total_cost'] == 1000
+
+
+def test_scenarios_route(client):
+    response = client.post('/api/budget/scenarios', json={'weeks': [4, 8], 'cost_per_student': 15,
+                                                          'students_per_day': 0})
+    assert response.status_code == 200
+    table = strict_json(response.get_data(as_text=True))
+    assert len(table['data']) == 2
+
+    rejected = client.post('/api/budget/scenarios', json={'weeks': 4})
+    assert rejected.status_code == 400
+    assert 'exactly one' in rejected.get_json()['error']
+    assert client.post('/api/budget/scenarios', data='not json').status_code == 400
@@ -0,0 +1,81 @@
+"""Tests for the in-memory school table, its district index and reloads"""
+
+import os
+
+import pytest
+
+from services.proposal_service import DataService
+
+SCHOOLS_CSV = """District Name,School Name,School Type,FRPM Percent (%)
+North Unified,Alder Elementary,Elementary Schools (Public),40.0
+South Unified,Birch Middle,Intermediate/Middle Schools (Public),55.0
+North Unified,Cedar High,High Schools (Public),30.0
+"""
+
+
+def write_csv(folder, text):
+    path = folder / 'data.csv'
+    path.write_text(text)
+    return path
+
+
+@pytest.fixture
+def data_service(tmp_path):
+    write_csv(tmp_path, SCHOOLS_CSV)
+    return DataService({'INPUT_FILES_FOLDER': str(tmp_path), 'SCHOOL_DATA_CHECK_INTERVAL_SECONDS': 0})
+
+
+def school_names(schools):
+    return [school['School Name'] for school in schools]
+
+
+def test_district_index(data_service):
+    assert data_service.get_districts() == ['North Unified', 'South Unified']
+    # Each district's schools in file order
+    assert school_names(data_service.get_schools('North Unified')) == ['Alder Elementary', 'Cedar High']
+    assert school_names(data_service.get_schools('South Unified')) == ['Birch Middle']
+    assert data_service.get_schools('Unknown Unified') == ()
+
+
+def test_snapshot_is_reused_until_the_file_changes(data_service, tmp_path):
+    dataset = data_service.get_dataset()
+    assert data_service.get_dataset() is dataset
+
+    path = write_csv(tmp_path, SCHOOLS_CSV + "West Unified,Dogwood Elementary,Elementary Schools (Public),70.0\n")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    reloaded = data_service.get_dataset()
+    assert reloaded is not dataset
+    assert data_service.get_districts() == ['North Unified', 'South Unified', 'West Unified']
+    # Readers holding the old snapshot are unaffected
+    assert dataset.districts == ('North Unified', 'South Unified')
+
+
+def test_file_is_checked_once_per_interval(tmp_path):
+    write_csv(tmp_path, SCHOOLS_CSV)
+    data_service = DataService({'INPUT_FILES_FOLDER': str(tmp_path), 'SCHOOL_DATA_CHECK_INTERVAL_SECONDS': 3600})
+    dataset = data_service.get_dataset()
+
+    write_csv(tmp_path, "District Name,School Name\nWest Unified,Dogwood Elementary\n")
+    assert data_service.get_dataset() is dataset
+
+
+def test_unreadable_file_keeps_the_last_snapshot(data_service, tmp_path):
+    dataset = data_service.get_dataset()
+    (tmp_path / 'data.csv').unlink()
+    assert data_service.get_dataset() is dataset
+
+
+def test_missing_file_is_retried(tmp_path):
+    data_service = DataService({'INPUT_FILES_FOLDER': str(tmp_path), 'SCHOOL_DATA_CHECK_INTERVAL_SECONDS': 3600})
+    assert data_service.get_districts() == []
+
+    write_csv(tmp_path, SCHOOLS_CSV)
+    assert data_service.get_districts() == ['North Unified', 'South Unified']
+
+
+def test_district_route_serves_the_index(client):
+    schools = client.get('/api/schools/Natomas Unified School District').get_json()
+    assert schools and {school['District Name'] for school in schools} == {'Natomas Unified School District'}
+    assert client.get('/api/schools/Unknown Unified').get_json() == []
@@ -0,0 +1,41 @@
+"""Tests for the guard on the google-generativeai internals the client pool relies on"""
+
+import pytest
+
+from services import gemini_pool
+from services.gemini_pool import GeminiClientPool
+
+
+def test_pinned_sdk_binds_a_client_per_key():
+    pool = GeminiClientPool('gemini-2.0-flash', {'primary': 'key-1', 'alternate': 'key-2'})
+    pool.warm()
+    with pool.checkout('primary') as primary, pool.checkout('alternate') as alternate:
+        assert primary._client is not None
+        assert primary._client is not alternate._client
+
+
+@pytest.mark.parametrize('version', ['0.9.0', '1.0.0', '0.7.2'])
+def test_other_sdk_releases_fail_at_construction(monkeypatch, version):
+    monkeypatch.setattr(gemini_pool.metadata, 'version', lambda name: version)
+    with pytest.raises(RuntimeError, match=f"google-generativeai {version} is not supported"):
+        GeminiClientPool('gemini-2.0-flash', {'primary': 'key-1'})
+
+
+def test_fake_model_needs_no_sdk(monkeypatch):
+    monkeypatch.setattr(gemini_pool.metadata, 'version', lambda name: '2.0.0')
+    pool = GeminiClientPool('gemini-2.0-flash', {'primary': None}, use_fake=True)
+    pool.warm()
+    with pool.checkout('primary') as model:
+        assert model.generate_content('prompt').text
+
+
+def test_missing_internals_fail_before_the_first_call(monkeypatch):
+    from google.generativeai import client as genai_client
+
+    monkeypatch.delattr(genai_client, '_ClientManager')
+    pool = GeminiClientPool('gemini-2.0-flash', {'primary': 'key-1'})
+    with pytest.raises(RuntimeError, match='_ClientManager is missing'):
+        pool.warm()
+    with pytest.raises(RuntimeError, match='_ClientManager is missing'):
+        with pool.checkout('primary'):
+            pass
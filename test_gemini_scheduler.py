@@ -0,0 +1,112 @@
+"""Tests for the per-key Gemini rate limits and weighted load balancing"""
+
+import pytest
+
+from services import gemini_scheduler
+from services.gemini_scheduler import GeminiCapacityError, GeminiKeyScheduler
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(gemini_scheduler.time, 'monotonic', clock.monotonic)
+    return clock
+
+
+def test_requests_per_minute_are_limited_per_key(clock):
+    scheduler = GeminiKeyScheduler(['primary'], rpm_limit=3, tpm_limit=100000, queue_timeout=0)
+    for _ in range(3):
+        assert scheduler.acquire(10) == 'primary'
+    with pytest.raises(GeminiCapacityError):
+        scheduler.acquire(10)
+
+    # One request refills every 60 / rpm_limit seconds
+    clock.now += 20
+    assert scheduler.acquire(10) == 'primary'
+
+
+def test_tokens_per_minute_are_limited_per_key(clock):
+    scheduler = GeminiKeyScheduler(['primary'], rpm_limit=100, tpm_limit=1000, queue_timeout=0)
+    scheduler.acquire(600)
+    with pytest.raises(GeminiCapacityError):
+        scheduler.acquire(600)
+    clock.now += 12  # 200 tokens back
+    assert scheduler.acquire(600) == 'primary'
+
+
+def test_prompts_larger_than_the_token_limit_still_run(clock):
+    scheduler = GeminiKeyScheduler(['primary'], rpm_limit=10, tpm_limit=1000, queue_timeout=0)
+    assert scheduler.acquire(5000) == 'primary'
+
+
+def test_calls_go_to_the_key_with_the_most_headroom(clock):
+    scheduler = GeminiKeyScheduler(['primary', 'alternate'], rpm_limit=10, tpm_limit=100000)
+    assert [scheduler.acquire(10) for _ in range(4)] == ['primary', 'alternate', 'primary', 'alternate']
+
+
+def test_weights_shift_load_between_keys(clock):
+    scheduler = GeminiKeyScheduler(['primary', 'alternate'], rpm_limit=10, tpm_limit=100000,
+                                   weights={'primary': 3.0})
+    keys = [scheduler.acquire(10) for _ in range(8)]
+    # primary keeps winning until 3x its remaining share drops below alternate's full one
+    assert keys == ['primary'] * 7 + ['alternate']
+
+
+def test_errors_rest_a_key_for_its_cooldown(clock):
+    scheduler = GeminiKeyScheduler(['primary', 'alternate'], rpm_limit=10, tpm_limit=100000,
+                                   quota_cooldown=30, auth_cooldown=600, queue_timeout=0)
+    scheduler.report_error('primary', 'quota')
+    assert {scheduler.acquire(10) for _ in range(3)} == {'alternate'}
+    assert scheduler.get_utilization()['keys']['primary']['cooldown_remaining_seconds'] == 30
+
+    clock.now += 30
+    scheduler.report_error('alternate', 'auth')
+    assert scheduler.acquire(10) == 'primary'
+    with pytest.raises(GeminiCapacityError):
+        scheduler.acquire(10, exclude={'primary'})
+
+
+def test_excluding_every_key_fails_at_once(clock):
+    scheduler = GeminiKeyScheduler(['primary'], rpm_limit=10, tpm_limit=100000)
+    with pytest.raises(GeminiCapacityError, match='No Gemini API keys left'):
+        scheduler.acquire(10, exclude={'primary'})
+
+
+def test_saturated_callers_wait_for_capacity():
+    # Real clock: 600 requests per minute frees one every 0.1s
+    scheduler = GeminiKeyScheduler(['primary'], rpm_limit=600, tpm_limit=100000, queue_timeout=2)
+    for _ in range(600):
+        scheduler.acquire(1)
+    assert scheduler.acquire(1) == 'primary'
+    assert scheduler.get_utilization()['throttled_waits'] == 1
+
+
+def test_usage_is_corrected_with_real_token_counts(clock):
+    scheduler = GeminiKeyScheduler(['primary'], rpm_limit=10, tpm_limit=1000, queue_timeout=0)
+    scheduler.acquire(100)
+    scheduler.record_usage('primary', 100, 700)
+    utilization = scheduler.get_utilization()['keys']['primary']
+    assert utilization['tokens_last_minute'] == 700
+    assert utilization['requests_last_minute'] == 1
+    with pytest.raises(GeminiCapacityError):
+        scheduler.acquire(400)
+
+    # The usage window forgets calls older than a minute
+    clock.now += 61
+    assert scheduler.get_utilization()['keys']['primary']['tokens_last_minute'] == 0
+
+
+def test_released_reservations_are_refunded(clock):
+    scheduler = GeminiKeyScheduler(['primary'], rpm_limit=1, tpm_limit=1000, queue_timeout=0)
+    scheduler.acquire(100)
+    scheduler.release('primary', 100)
+    assert scheduler.get_utilization()['keys']['primary']['total_requests'] == 0
+    assert scheduler.acquire(1000) == 'primary'
@@ -0,0 +1,135 @@
+"""Tests for the background proposal job queue, run against the local fake LLM"""
+
+import threading
+import time
+
+import pytest
+
+from conftest import PROPOSAL_FORM
+from services.job_service import JobService, JobQueueFullError
+
+# One model call per proposal, so a latency setting is the job's run time
+SINGLE_CALL_FORM = dict(PROPOSAL_FORM, rfp_type='Extended Learning Opportunities Program')
+
+
+def single_call_form(school):
+    """A distinct prompt per job, so neither the response cache nor single-flight shortens it"""
+    return dict(SINGLE_CALL_FORM, schoolname=school)
+
+
+def wait_for(get_job, job_id, statuses=JobService.FINISHED_STATUSES, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = get_job(job_id)
+        if job is not None and job['status'] in statuses:
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} never reached {statuses}: {get_job(job_id)}")
+
+
+def test_submit_status_result(client):
+    submitted = client.post('/api/proposal-jobs', data=SINGLE_CALL_FORM)
+    assert submitted.status_code == 202
+    body = submitted.get_json()
+    assert body['status'] == 'queued'
+
+    job = wait_for(lambda job_id: client.get(body['status_url']).get_json(), body['job_id'])
+    assert job['status'] == 'done'
+    assert job['has_result'] and 'result' not in job
+    assert job['error'] is None
+
+    page = client.get(body['result_url'])
+    assert page.status_code == 200
+    assert b'Natomas Unified' in page.data
+
+
+@pytest.fixture
+def slow_client(monkeypatch, request):
+    """Client for an app with room for two jobs, each taking half a second"""
+    monkeypatch.setenv('JOB_WORKERS', '1')
+    monkeypatch.setenv('JOB_QUEUE_SIZE', '1')
+    monkeypatch.setenv('JOB_RETRY_AFTER_SECONDS', '7')
+    monkeypatch.setenv('FAKE_LLM_LATENCY_SECONDS', '0.5')
+    return request.getfixturevalue('client')
+
+
+def test_jobs_beyond_workers_and_queue_get_429(slow_client):
+    # JOB_WORKERS + JOB_QUEUE_SIZE = 2 jobs in progress
+    accepted = [slow_client.post('/api/proposal-jobs', data=single_call_form(school))
+                for school in ('School A', 'School B')]
+    assert [response.status_code for response in accepted] == [202, 202]
+
+    rejected = slow_client.post('/api/proposal-jobs', data=single_call_form('School C'))
+    assert rejected.status_code == 429
+    assert rejected.headers['Retry-After'] == '7'
+    assert 'busy' in rejected.get_json()['error']
+
+    # Slots free up as the accepted jobs finish
+    for response in accepted:
+        body = response.get_json()
+        wait_for(lambda job_id: slow_client.get(body['status_url']).get_json(), body['job_id'])
+    assert slow_client.post('/api/proposal-jobs', data=single_call_form('School C')).status_code == 202
+
+
+def test_submit_raises_when_full(tmp_path):
+    service = JobService({'STATE_FOLDER': str(tmp_path), 'JOB_WORKERS': 1, 'JOB_QUEUE_SIZE': 0,
+                          'JOB_RETRY_AFTER_SECONDS': 3})
+    release = threading.Event()
+    service.submit(release.wait)
+    try:
+        with pytest.raises(JobQueueFullError) as raised:
+            service.submit(release.wait)
+        assert raised.value.retry_after == 3
+    finally:
+        release.set()
+
+
+def test_job_record_is_readable_from_another_worker(tmp_path):
+    config = {'STATE_FOLDER': str(tmp_path)}
+    worker_a, worker_b = JobService(config), JobService(config)
+    release = threading.Event()
+
+    job = worker_a.submit(lambda: release.wait() and 'proposal text', meta={'district': 'Natomas Unified'})
+    running = wait_for(worker_b.get_job, job['id'], statuses=(JobService.STATUS_RUNNING,))
+    assert running['meta'] == {'district': 'Natomas Unified'}
+
+    release.set()
+    done = wait_for(worker_b.get_job, job['id'])
+    assert done['status'] == JobService.STATUS_DONE
+    assert done['result'] == 'proposal text'
+    assert worker_b.get_job('unknown-job') is None
+    assert worker_b.get_job('../escape') is None
+
+
+def test_cancel_from_another_worker_reaches_the_running_job(tmp_path):
+    config = {'STATE_FOLDER': str(tmp_path)}
+    worker_a, worker_b = JobService(config), JobService(config)
+    saw_cancel = threading.Event()
+
+    def generate(cancel_event):
+        if cancel_event.wait(timeout=10):
+            saw_cancel.set()
+        return 'finished anyway'
+
+    job = worker_a.submit(generate, cancellable=True)
+    wait_for(worker_b.get_job, job['id'], statuses=(JobService.STATUS_RUNNING,))
+
+    # worker_b does not run the job, so it leaves a marker file for worker_a
+    assert worker_b.cancel(job['id'])['id'] == job['id']
+    assert (tmp_path / 'jobs' / 'proposal' / f"{job['id']}.cancel").exists()
+
+    cancelled = wait_for(worker_b.get_job, job['id'])
+    assert saw_cancel.is_set()
+    assert cancelled['status'] == JobService.STATUS_CANCELLED
+    assert cancelled['result'] is None
+    assert worker_a.get_stats()['active'] == 0
+
+
+def test_cancel_through_the_api(slow_client):
+    body = slow_client.post('/api/proposal-jobs', data=single_call_form('School D')).get_json()
+    assert slow_client.post(body['cancel_url']).status_code == 202
+
+    job = wait_for(lambda job_id: slow_client.get(body['status_url']).get_json(), body['job_id'])
+    assert job['status'] == 'cancelled'
+    assert slow_client.get(body['result_url']).status_code == 410
+    assert slow_client.post('/api/proposal-jobs/unknown-job/cancel').status_code == 404
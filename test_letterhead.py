@@ -0,0 +1,79 @@
+"""Tests for the cached letterhead template every generated document starts from"""
+
+import os
+import shutil
+import zipfile
+from io import BytesIO
+
+import pytest
+
+from services import proposal_service as proposal_module
+
+
+def logo_in(template):
+    """The image stored in a serialized .docx, or None"""
+    with zipfile.ZipFile(BytesIO(template)) as package:
+        media = [name for name in package.namelist() if name.startswith('word/media/')]
+        return package.read(media[0]) if media else None
+
+
+def replace_logo(path, data):
+    """Write a new logo and move its mtime on, as an edit a little later would"""
+    stat = os.stat(path) if os.path.exists(path) else None
+    path.write_bytes(data)
+    if stat is not None:
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def logo(tmp_path, monkeypatch):
+    """A copy of the shipped logo the service reads instead"""
+    path = tmp_path / 'logo.png'
+    shutil.copyfile(proposal_module.HEADER_LOGO_PATH, path)
+    monkeypatch.setattr(proposal_module, 'HEADER_LOGO_PATH', str(path))
+    return path
+
+
+def service_with_interval(request, monkeypatch, seconds):
+    monkeypatch.setenv('TEMPLATE_CHECK_INTERVAL_SECONDS', str(seconds))
+    request.getfixturevalue('app')
+    from routes import main_routes
+    return main_routes.proposal_service
+
+
+def test_template_is_built_once(request, monkeypatch, logo):
+    service = service_with_interval(request, monkeypatch, 0)
+    template = service.get_letterhead_template()
+    assert service.get_letterhead_template() is template
+    assert logo_in(template) == logo.read_bytes()
+
+
+def test_changed_logo_rebuilds_the_template(request, monkeypatch, logo):
+    service = service_with_interval(request, monkeypatch, 0)
+    template = service.get_letterhead_template()
+
+    new_logo = logo.read_bytes() + b'\0' * 16
+    replace_logo(logo, new_logo)
+    rebuilt = service.get_letterhead_template()
+    assert rebuilt is not template
+    assert logo_in(rebuilt) == new_logo
+
+
+def test_removed_logo_leaves_the_address_only(request, monkeypatch, logo):
+    service = service_with_interval(request, monkeypatch, 0)
+    service.get_letterhead_template()
+
+    logo.unlink()
+    rebuilt = service.get_letterhead_template()
+    assert logo_in(rebuilt) is None
+    from docx import Document
+    header_text = Document(BytesIO(rebuilt)).sections[0].header.tables[0].cell(0, 1).text
+    assert 'Music Science & Technology Group' in header_text
+
+
+def test_logo_is_checked_once_per_interval(request, monkeypatch, logo):
+    service = service_with_interval(request, monkeypatch, 3600)
+    template = service.get_letterhead_template()
+
+    replace_logo(logo, logo.read_bytes() + b'\0' * 16)
+    assert service.get_letterhead_template() is template
@@ -0,0 +1,102 @@
+"""Tests for the disk-backed LLM response cache: content addressing, TTL and LRU eviction"""
+
+import pytest
+
+from services import llm_cache
+from services.llm_cache import LLMResponseCache
+
+RESPONSE = 'r' * 10  # 10 bytes per cached response
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(llm_cache.time, 'time', clock.time)
+    return clock
+
+
+def make_cache(tmp_path, max_bytes=1024 * 1024, ttl_seconds=60, **config):
+    config = dict({'STATE_FOLDER': str(tmp_path), 'LLM_CACHE_MAX_MB': max_bytes / (1024 * 1024),
+                   'LLM_CACHE_TTL_SECONDS': ttl_seconds}, **config)
+    return LLMResponseCache(config)
+
+
+def test_keys_address_model_and_prompt():
+    key = LLMResponseCache.make_key('gemini', 'prompt')
+    assert key == LLMResponseCache.make_key('gemini', 'prompt')
+    assert key != LLMResponseCache.make_key('fake-gemini', 'prompt')
+    assert key != LLMResponseCache.make_key('gemini', 'prompt ')
+    # The separator keeps the model and prompt apart
+    assert LLMResponseCache.make_key('ab', 'c') != LLMResponseCache.make_key('a', 'bc')
+
+
+def test_hit_and_miss_are_shared_across_instances(tmp_path, clock):
+    worker_a, worker_b = make_cache(tmp_path), make_cache(tmp_path)
+    assert worker_a.get('k') is None
+    worker_a.put('k', 'gemini', 'text')
+    assert worker_b.get('k') == 'text'
+
+    stats = worker_b.get_stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 1, 1)
+    assert stats['process']['hits'] == 1 and stats['process']['misses'] == 0
+
+
+def test_entries_expire_after_the_ttl(tmp_path, clock):
+    cache = make_cache(tmp_path, ttl_seconds=60)
+    cache.put('k', 'gemini', RESPONSE)
+
+    clock.now += 60
+    assert cache.get('k') == RESPONSE
+    clock.now += 1
+    assert cache.get('k') is None
+    assert cache.get_stats()['entries'] == 0
+
+
+def test_expired_entries_are_evicted_on_store(tmp_path, clock):
+    cache = make_cache(tmp_path, ttl_seconds=60)
+    cache.put('old', 'gemini', RESPONSE)
+    clock.now += 61
+    cache.put('new', 'gemini', RESPONSE)
+    assert cache.get_stats()['entries'] == 1
+    assert cache.evictions == 1
+
+
+def test_least_recently_used_entries_are_evicted_past_the_size_limit(tmp_path, clock):
+    cache = make_cache(tmp_path, max_bytes=30)
+    for key in ('a', 'b', 'c'):
+        cache.put(key, 'gemini', RESPONSE)
+        clock.now += 1
+
+    # Reading 'a' makes 'b' the least recently used
+    assert cache.get('a') == RESPONSE
+    clock.now += 1
+    cache.put('d', 'gemini', RESPONSE)
+
+    assert [key for key in 'abcd' if cache.get(key) is not None] == ['a', 'c', 'd']
+    stats = cache.get_stats()
+    assert stats['total_bytes'] == 30
+    assert stats['evictions'] == 1
+
+
+def test_responses_larger_than_the_cache_are_not_stored(tmp_path, clock):
+    cache = make_cache(tmp_path, max_bytes=5)
+    cache.put('k', 'gemini', RESPONSE)
+    assert cache.get('k') is None
+    cache.put('empty', 'gemini', '')
+    assert cache.get_stats()['entries'] == 0
+
+
+def test_disabled_cache_stores_nothing(tmp_path, clock):
+    cache = make_cache(tmp_path, LLM_CACHE_ENABLED=False)
+    cache.put('k', 'gemini', RESPONSE)
+    assert cache.get('k') is None
+    stats = cache.get_stats()
+    assert stats['enabled'] is False and 'entries' not in stats
@@ -0,0 +1,81 @@
+"""Tests for Markdown tables written into .docx documents"""
+
+from io import BytesIO
+
+from docx import Document
+from docx.oxml.ns import qn
+
+from convert import TABLE_HEADER_FILL, MarkdownToDocxConverter
+
+TABLE = """Budget summary:
+
+| Category | Cost | Notes |
+|---|:---:|---|
+| Staffing | $18,000 | **Four** instructors |
+| Supplies & <kits> | $3,000 |
+| Transport | $750 | Bus:Friday | extra |
+"""
+
+
+def convert(markdown):
+    """The document built from markdown, after a save and reload"""
+    converter = MarkdownToDocxConverter()
+    converter.convert(markdown)
+    buffer = BytesIO()
+    converter.doc.save(buffer)
+    return Document(BytesIO(buffer.getvalue()))
+
+
+def cell_texts(table):
+    return [[cell.text for cell in row.cells] for row in table.rows]
+
+
+def test_cells_hold_the_table_text():
+    table = convert(TABLE).tables[0]
+    assert cell_texts(table) == [
+        ['Category', 'Cost', 'Notes', ''],
+        ['Staffing', '$18,000', 'Four instructors', ''],
+        # Short rows are padded, and text is escaped
+        ['Supplies & <kits>', '$3,000', '', ''],
+        # Cells get the same colon spacing as paragraphs
+        ['Transport', '$750', 'Bus: Friday', 'extra'],
+    ]
+
+
+def test_header_row_is_bold_shaded_and_repeats():
+    table = convert(TABLE).tables[0]
+    header, body = table.rows[0], table.rows[1]
+
+    assert header._tr.trPr.find(qn('w:tblHeader')) is not None
+    assert body._tr.trPr is None
+    for cell in header.cells:
+        assert cell._tc.tcPr.find(qn('w:shd')).get(qn('w:fill')) == TABLE_HEADER_FILL
+        assert all(run.bold for run in cell.paragraphs[0].runs)
+    assert body.cells[0]._tc.tcPr.find(qn('w:shd')) is None
+
+
+def test_inline_bold_in_body_cells():
+    runs = convert(TABLE).tables[0].rows[1].cells[2].paragraphs[0].runs
+    assert [(run.text, bool(run.bold)) for run in runs] == [('Four', True), (' instructors', False)]
+
+
+def test_table_without_separator_has_no_header():
+    table = convert("| a | b |\n| c | d |").tables[0]
+    assert cell_texts(table) == [['a', 'b'], ['c', 'd']]
+    assert all(row._tr.trPr is None for row in table.rows)
+    assert not any(run.bold for run in table.rows[0].cells[0].paragraphs[0].runs)
+
+
+def test_column_widths_follow_the_text():
+    document = convert("| Category | A very long description of the program |\n|---|---|\n| x | y |")
+    section = document.sections[0]
+    widths = [cell.width for cell in document.tables[0].rows[0].cells]
+    assert widths[1] > 3 * widths[0]
+    assert abs(sum(widths) - (section.page_width - section.left_margin - section.right_margin)) < 10_000
+
+
+def test_text_around_the_table_is_kept():
+    document = convert(TABLE + "\nAfter the table")
+    texts = [paragraph.text for paragraph in document.paragraphs if paragraph.text]
+    assert texts == ['Budget summary:', 'After the table']
+    assert len(document.tables) == 1
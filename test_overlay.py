@@ -0,0 +1,87 @@
+"""Tests for per-request YAML values layered over the shared, frozen config"""
+
+import pytest
+
+from routes import main_routes
+from services.overlay import OverlayMapping, freeze
+
+CONFIG = {
+    'submission': {'company_name': '', 'email': '', 'due_date': 'June 1'},
+    'budget': {'fiscal_year': '2025-26', 'categories': {'staffing': 0, 'admin_costs': 0}},
+    'legal': {'nda_disclosee_name': '', 'governing_law': 'California'},
+    'references': [{'organization': ''}, {'organization': ''}, {'organization': ''}, {'organization': 'Kept'}],
+    'title': 'Extended Learning Proposal',
+}
+
+
+def test_freeze_makes_the_config_read_only():
+    frozen = freeze(CONFIG)
+    with pytest.raises(TypeError):
+        frozen['title'] = 'changed'
+    with pytest.raises(TypeError):
+        frozen['submission']['email'] = 'changed'
+    assert isinstance(frozen['references'], tuple)
+    assert frozen['references'][3]['organization'] == 'Kept'
+
+
+def test_overlay_reads_like_an_updated_dict():
+    base = freeze({'a': 1, 'b': 2})
+    overlay = OverlayMapping(base, {'b': 20, 'c': 30})
+    assert dict(overlay) == {'a': 1, 'b': 20, 'c': 30}
+    assert list(overlay) == ['a', 'b', 'c']
+    assert len(overlay) == 3
+    assert 'c' in overlay and 'd' not in overlay
+    assert overlay.get('d', 'missing') == 'missing'
+    with pytest.raises(KeyError):
+        overlay['d']
+    assert dict(base) == {'a': 1, 'b': 2}
+
+
+@pytest.fixture
+def service(app):
+    return main_routes.proposal_service
+
+
+def populate(service, yaml_vars, company_name, cost_proposal):
+    prompt_variables = {'company_name': company_name, 'cost_proposal': cost_proposal}
+    return service.populate_yaml_vars(yaml_vars, prompt_variables)
+
+
+def test_requests_do_not_change_the_shared_config(service):
+    yaml_vars = freeze(CONFIG)
+    first = populate(service, yaml_vars, company_name='First Co', cost_proposal='$1000')
+    second = populate(service, yaml_vars, company_name='Second Co', cost_proposal='$2000')
+
+    assert first['submission']['company_name'] == 'First Co'
+    assert second['submission']['company_name'] == 'Second Co'
+    assert first['legal']['nda_disclosee_name'] == 'First Co'
+    assert first['budget']['categories']['staffing'] == pytest.approx(600)
+    assert second['budget']['categories']['staffing'] == pytest.approx(1200)
+    # Untouched values show through from the shared config
+    assert first['submission']['due_date'] == 'June 1'
+    assert first['budget']['fiscal_year'] == '2025-26'
+    assert first['title'] == 'Extended Learning Proposal'
+    assert first['references'][0]['organization'] == 'Natomas Unified School District'
+    assert first['references'][3]['organization'] == 'Kept'
+
+    assert yaml_vars == freeze(CONFIG)
+
+
+def test_unreferenced_sections_are_left_alone(service):
+    yaml_vars = freeze(CONFIG)
+    populated = service.populate_yaml_vars(yaml_vars, {'company_name': 'First Co'}, referenced={'submission'})
+    assert populated['submission']['company_name'] == 'First Co'
+    assert populated['legal'] is yaml_vars['legal']
+    assert populated['references'] is yaml_vars['references']
+
+
+def test_overlays_render_in_jinja(service):
+    yaml_vars = freeze(CONFIG)
+    populated = populate(service, yaml_vars, company_name='First Co', cost_proposal='$1000')
+    template = service.jinja_env.from_string(
+        "{{ submission.company_name }} / {{ submission.due_date }}"
+        "{% for name, value in submission.items() %}|{{ name }}{% endfor %}"
+        "{% for reference in references %};{{ reference.organization }}{% endfor %}")
+    rendered = template.render(**populated)
+    assert rendered.startswith('First Co / June 1|company_name|email|due_date|')
+    assert rendered.endswith(';Kept')
@@ -0,0 +1,78 @@
+"""Tests for precomputed, compressed and ETagged school data responses"""
+
+import gzip
+import json
+
+import pytest
+
+from services import payloads
+from services.payloads import PrecomputedPayload
+
+DISTRICT_URL = '/api/schools/Natomas Unified School District'
+
+
+@pytest.fixture
+def gzip_only(monkeypatch):
+    """Payloads built without brotli, whether or not it is installed"""
+    monkeypatch.setattr(payloads, 'brotli', None)
+
+
+def test_route_serves_gzip_to_clients_that_accept_it(client, gzip_only):
+    plain = client.get(DISTRICT_URL)
+    assert 'Content-Encoding' not in plain.headers
+    assert plain.headers['Vary'] == 'Accept-Encoding'
+
+    compressed = client.get(DISTRICT_URL, headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(compressed.data) == plain.data
+    assert len(compressed.data) < len(plain.data)
+    # Each representation has its own ETag
+    assert compressed.headers['ETag'] != plain.headers['ETag']
+
+
+def test_route_answers_304_for_the_current_version(client, gzip_only):
+    first = client.get(DISTRICT_URL, headers={'Accept-Encoding': 'gzip'})
+    again = client.get(DISTRICT_URL, headers={'Accept-Encoding': 'gzip', 'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 304
+    assert again.data == b''
+
+    # A validator for one encoding also covers the others of the same version
+    plain = client.get(DISTRICT_URL, headers={'If-None-Match': first.headers['ETag']})
+    assert plain.status_code == 304
+
+    stale = client.get(DISTRICT_URL, headers={'If-None-Match': '"something-older"'})
+    assert stale.status_code == 200
+
+
+def test_payload_is_built_once_per_dataset(app):
+    from routes import main_routes
+    dataset = main_routes.data_service.get_dataset()
+    assert dataset.district_payload('Natomas Unified School District') is \
+        dataset.district_payload('Natomas Unified School District')
+    assert dataset.all_schools_payload() is dataset.all_schools_payload()
+    assert json.loads(dataset.district_payload('Unknown Unified').body) == []
+
+
+def test_etag_follows_the_content(gzip_only):
+    body = json.dumps([{'School Name': 'Alder Elementary'}] * 40)
+    assert PrecomputedPayload(body).etag == PrecomputedPayload(body.encode('utf-8')).etag
+    assert PrecomputedPayload(body).etag != PrecomputedPayload(body + ' ').etag
+    # gzip output carries no timestamp, so every worker stores the same bytes
+    assert PrecomputedPayload(body).gzip == PrecomputedPayload(body).gzip
+
+
+def test_small_bodies_are_not_compressed(app):
+    payload = PrecomputedPayload('[]')
+    assert payload.gzip is None and payload.brotli is None
+    with app.test_request_context(headers={'Accept-Encoding': 'gzip, br'}):
+        from flask import request
+        response = payload.response(request)
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_data() == b'[]'
+
+
+@pytest.mark.skipif(payloads.brotli is None, reason='needs the optional brotli package')
+def test_brotli_is_preferred_when_installed(client):
+    response = client.get(DISTRICT_URL, headers={'Accept-Encoding': 'gzip, br'})
+    assert response.headers['Content-Encoding'] == 'br'
+    assert payloads.brotli.decompress(response.data) == client.get(DISTRICT_URL).data
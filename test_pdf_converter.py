@@ -0,0 +1,39 @@
+"""Tests for when the PDF converter pool looks up the Python that drives LibreOffice"""
+
+import sys
+
+import pytest
+
+from services import pdf_converter
+from services.pdf_converter import PdfConverterPool
+
+
+@pytest.fixture
+def pool(tmp_path, monkeypatch):
+    """Pool whose 'LibreOffice' is this interpreter, recording each UNO Python lookup"""
+    pool = PdfConverterPool(str(tmp_path / 'profiles'), binary=sys.executable)
+    pool.lookups = []
+
+    def find_uno_python(configured=None, soffice=None):
+        # Lookups start interpreters, so they must never hold the pool's lock
+        assert not pool._lock.locked()
+        pool.lookups.append(configured)
+        return None
+
+    monkeypatch.setattr(pdf_converter, 'find_uno_python', find_uno_python)
+    return pool
+
+
+def test_stats_never_look_up_the_uno_python(pool):
+    stats = pool.get_stats()
+    assert stats['mode'] == 'unresolved'
+    assert stats['uno_python'] is None
+    assert pool.lookups == []
+
+
+def test_warmup_looks_up_the_uno_python_once(pool):
+    pool.warm()
+    pool.warm()
+    assert pool.resolve_uno_python() is None
+    assert pool.lookups == [None]
+    assert pool.get_stats()['mode'] == 'subprocess'
@@ -0,0 +1,107 @@
+"""Tests for the status of a document's background PDF rendering"""
+
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from routes import main_routes
+from services.job_service import JobService
+
+DOCX = 'Proposal_Natomas_RFQ_1700000000.docx'
+PDF = 'Proposal_Natomas_RFQ_1700000000.pdf'
+
+
+@pytest.fixture
+def service(app):
+    service = main_routes.proposal_service
+    with open(os.path.join(service.config['DOWNLOAD_FOLDER'], DOCX), 'wb') as f:
+        f.write(b'docx')
+    return service
+
+
+def write_pdf(service):
+    with open(os.path.join(service.config['DOWNLOAD_FOLDER'], PDF), 'wb') as f:
+        f.write(b'%PDF-1.7')
+
+
+def save_job(service, status, **fields):
+    """Persist a PDF job record as the worker that took the job would have"""
+    job = {'id': PDF, 'kind': 'pdf', 'status': status, 'created_at': time.time(), 'started_at': None,
+           'finished_at': None, 'error': None, 'result': None, 'meta': {'docx_filename': DOCX},
+           'pid': os.getpid()}
+    job.update(fields)
+    service.pdf_jobs._persist(job)
+
+
+def exited_pid():
+    process = subprocess.Popen([sys.executable, '-c', ''])
+    process.wait()
+    return process.pid
+
+
+def test_unknown_document(service, client):
+    assert service.pdf_status('Proposal_Unknown_1.docx') is None
+    assert client.get('/api/documents/Proposal_Unknown_1.docx/pdf').status_code == 404
+
+
+def test_without_a_job_record(service):
+    # Never queued (queue full) or its record expired
+    assert service.pdf_status(DOCX)['status'] == 'failed'
+    write_pdf(service)
+    assert service.pdf_status(DOCX) == {'filename': PDF, 'status': 'ready', 'size': 8,
+                                        'render_seconds': None, 'error': None}
+
+
+def test_job_transitions(service, client):
+    save_job(service, JobService.STATUS_QUEUED)
+    assert service.pdf_status(DOCX)['status'] == 'pending'
+
+    save_job(service, JobService.STATUS_RUNNING, started_at=time.time())
+    assert service.pdf_status(PDF)['status'] == 'pending'
+
+    write_pdf(service)
+    save_job(service, JobService.STATUS_DONE, result={'filename': PDF, 'size': 8, 'render_seconds': 1.5})
+    response = client.get(f'/api/documents/{DOCX}/pdf').get_json()
+    assert response['status'] == 'ready'
+    assert response['render_seconds'] == 1.5
+    assert response['download_url'].endswith(PDF)
+
+    os.remove(os.path.join(service.config['DOWNLOAD_FOLDER'], PDF))
+    assert service.pdf_status(DOCX)['error'] == 'The PDF is no longer available'
+
+
+@pytest.mark.parametrize('status, error', [
+    (JobService.STATUS_FAILED, 'LibreOffice is not installed'),
+    (JobService.STATUS_CANCELLED, None),
+])
+def test_failed_or_cancelled_job(service, status, error):
+    save_job(service, status, error=error)
+    result = service.pdf_status(DOCX)
+    assert result['status'] == 'failed'
+    assert result['error'] == (error or 'PDF rendering was cancelled')
+
+
+@pytest.mark.parametrize('job_status', [JobService.STATUS_QUEUED, JobService.STATUS_RUNNING])
+def test_job_of_a_dead_worker_fails(service, job_status):
+    save_job(service, job_status, pid=exited_pid())
+    result = service.pdf_status(DOCX)
+    assert result['status'] == 'failed'
+    assert result['error'] == 'PDF rendering stopped before it finished'
+
+
+def test_job_of_a_live_worker_stays_pending(service):
+    worker = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)'])
+    try:
+        save_job(service, JobService.STATUS_RUNNING, pid=worker.pid)
+        assert service.pdf_status(DOCX)['status'] == 'pending'
+    finally:
+        worker.kill()
+        worker.wait()
+
+
+def test_job_older_than_its_longest_wait_fails(service):
+    save_job(service, JobService.STATUS_QUEUED, created_at=time.time() - service.pdf_job_max_age - 1)
+    assert service.pdf_status(DOCX)['status'] == 'failed'
@@ -0,0 +1,52 @@
+"""Tests for how request controls reach the model calls without becoming prompt variables"""
+
+import threading
+
+import pytest
+
+from conftest import PROPOSAL_FORM
+from routes import main_routes
+
+SINGLE_CALL_FORM = dict(PROPOSAL_FORM, rfp_type='Extended Learning Opportunities Program')
+
+
+@pytest.fixture
+def service(app):
+    return main_routes.proposal_service
+
+
+@pytest.fixture
+def model_calls(service, monkeypatch):
+    """Controls passed to each model call, in order"""
+    calls = []
+    call_model = service.call_gemini_with_fallback
+
+    def record(prompt, bypass_cache=False, cancel_event=None):
+        calls.append({'bypass_cache': bypass_cache, 'cancel_event': cancel_event, 'prompt': prompt})
+        return call_model(prompt, bypass_cache=bypass_cache, cancel_event=cancel_event)
+
+    monkeypatch.setattr(service, 'call_gemini_with_fallback', record)
+    return calls
+
+
+def test_controls_are_not_prompt_variables(service):
+    variables = service.prepare_prompt_variables(**SINGLE_CALL_FORM)
+    assert 'bypass_cache' not in variables
+    assert 'cancel_event' not in variables
+
+
+@pytest.mark.parametrize('form', [SINGLE_CALL_FORM, PROPOSAL_FORM], ids=['single call', 'sectioned'])
+def test_controls_reach_every_model_call(service, model_calls, form):
+    cancel_event = threading.Event()
+    service.generate_proposal_text_only(raise_errors=True, bypass_cache=True, cancel_event=cancel_event, **form)
+
+    assert model_calls
+    for call in model_calls:
+        assert call['bypass_cache'] is True
+        assert call['cancel_event'] is cancel_event
+        assert 'Event' not in call['prompt']
+
+
+def test_form_bypass_cache_is_a_control(client, model_calls):
+    client.post('/proposal', data=dict(SINGLE_CALL_FORM, bypass_cache='1'))
+    assert [call['bypass_cache'] for call in model_calls] == [True]
@@ -0,0 +1,24 @@
+"""Tests for the opt-in proposal stream and its per-worker slot limit"""
+
+from conftest import PROPOSAL_FORM
+
+
+def test_streaming_is_off_by_default(client):
+    page = client.get('/')
+    assert b'id="stream-hidden" value=""' in page.data
+
+
+def test_streams_beyond_the_slot_limit_get_429(client):
+    first = client.post('/api/proposal-stream', data=PROPOSAL_FORM, buffered=False)
+    assert first.status_code == 200
+
+    rejected = client.post('/api/proposal-stream', data=PROPOSAL_FORM)
+    assert rejected.status_code == 429
+    assert rejected.headers['Retry-After'] == '5'
+
+    # Closing the first stream frees its slot
+    first.close()
+    second = client.post('/api/proposal-stream', data=PROPOSAL_FORM)
+    assert second.status_code == 200
+    assert b'event: done' in second.data
+
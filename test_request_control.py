@@ -0,0 +1,106 @@
+"""Tests for classifying upstream Gemini errors as retryable or not, and for hedged calls"""
+
+import threading
+import time
+
+import pytest
+from google.api_core import exceptions as api_exceptions
+
+from services.request_control import is_transient_error
+
+
+@pytest.mark.parametrize('error', [
+    api_exceptions.ServiceUnavailable("The model is overloaded"),
+    api_exceptions.InternalServerError("An internal error has occurred"),
+    api_exceptions.BadGateway("Bad gateway"),
+    api_exceptions.DeadlineExceeded("Deadline Exceeded"),
+    TimeoutError("read timed out"),
+    ConnectionError("connection reset by peer"),
+    RuntimeError("503 Service Unavailable"),
+    RuntimeError("Upstream returned HTTP 502"),
+    RuntimeError("request failed with status: 504"),
+    RuntimeError("The service is temporarily unavailable"),
+])
+def test_server_and_network_errors_are_transient(error):
+    assert is_transient_error(error)
+
+
+@pytest.mark.parametrize('error', [
+    api_exceptions.InvalidArgument("Request exceeds the limit 5000 tokens"),
+    api_exceptions.InvalidArgument("Field 'timeout' must be at most 500"),
+    api_exceptions.NotFound("Model gemini-500 is unavailable in this region"),
+    api_exceptions.PermissionDenied("API key not valid"),
+    RuntimeError("400 Request payload size exceeds the limit: 5000 bytes"),
+    RuntimeError("400 Invalid value for max_output_tokens: 503"),
+    RuntimeError("Prompt of 5040 tokens is over the limit"),
+    RuntimeError("Safety filter blocked the response; timeout_ms setting ignored"),
+    ValueError("Unsupported option: unavailable"),
+])
+def test_request_errors_are_not_transient(error):
+    assert not is_transient_error(error)
+
+
+@pytest.fixture
+def hedging_service(app, monkeypatch):
+    """ProposalService with two keys and hedging after 50ms; calls on the primary key block until released"""
+    from routes import main_routes
+    from services.gemini_scheduler import GeminiKeyScheduler
+
+    service = main_routes.proposal_service
+    monkeypatch.setitem(service.config, 'GEMINI_HEDGING', True)
+    monkeypatch.setitem(service.config, 'GEMINI_HEDGE_DELAY_SECONDS', 0.05)
+    monkeypatch.setattr(service.client_pool, 'api_keys', {'primary': None, 'alternate': None})
+    service.key_scheduler = GeminiKeyScheduler(['primary', 'alternate'], rpm_limit=10, tpm_limit=10000)
+
+    service.release_primary = threading.Event()
+    service.calls = []
+
+    def generate_on_key(key_name, prompt, estimated_tokens, deadline, generate_kwargs):
+        service.calls.append(key_name)
+        if key_name == 'primary':
+            service.release_primary.wait(5)
+        return f"answer from {key_name}"
+
+    monkeypatch.setattr(service, '_generate_on_key', generate_on_key)
+    yield service
+    service.release_primary.set()
+
+
+def scheduler_reservations(service, key_name):
+    key = service.key_scheduler.get_utilization()['keys'][key_name]
+    return key['total_requests'], key['requests_last_minute']
+
+
+def test_losing_call_is_abandoned_when_the_hedge_wins(hedging_service):
+    assert hedging_service._generate_with_fallback('prompt') == "answer from alternate"
+    stats = hedging_service.request_stats.get_stats()
+    assert stats['hedges_won'] == 1
+    assert stats['abandoned_calls'] == 1
+
+
+def test_hedge_that_never_started_is_refunded(hedging_service):
+    from concurrent.futures import ThreadPoolExecutor
+    from services.request_control import RequestCancelled
+
+    # One hedge thread, busy with the slow primary call, so the hedge stays queued
+    hedging_service._hedge_executor = ThreadPoolExecutor(max_workers=1)
+    cancel_event = threading.Event()
+
+    def cancel_once_hedged():
+        while hedging_service.request_stats.get_stats()['hedges_sent'] == 0:
+            time.sleep(0.01)
+        cancel_event.set()
+
+    threading.Thread(target=cancel_once_hedged, daemon=True).start()
+    with pytest.raises(RequestCancelled):
+        hedging_service._generate_with_fallback('prompt', cancel_event=cancel_event)
+
+    hedging_service.release_primary.set()
+    hedging_service._hedge_executor.shutdown(wait=True)
+    assert hedging_service.calls == ['primary']
+    assert hedging_service.request_stats.get_stats()['abandoned_calls'] == 2
+    # The queued hedge's reservation is back; the primary call was really sent
+    assert scheduler_reservations(hedging_service, 'alternate') == (0, 0)
+    assert scheduler_reservations(hedging_service, 'primary') == (1, 1)
+    bucket = hedging_service.key_scheduler._keys['alternate'].requests
+    assert bucket.tokens == pytest.approx(bucket.capacity)
@@ -0,0 +1,103 @@
+"""Tests for the school search API on the shipped school data"""
+
+import os
+
+import pandas as pd
+import pytest
+
+from conftest import APP_DIR
+from config.settings import SCHOOL_DATA_SOURCES
+from services.school_dataset import SchoolDataset
+from services.school_store import read_source
+
+SACRAMENTO = 'Sacramento City Unified School District'
+TWIN_RIVERS = 'Twin Rivers Unified School District'
+NATOMAS = 'Natomas Unified School District'
+
+
+def shipped_frpm(district):
+    """FRPM column of one district in input_data/data.csv, as given"""
+    frame = pd.read_csv(os.path.join(APP_DIR, 'input_data', 'data.csv'))
+    frame.columns = frame.columns.str.strip()
+    return frame.loc[frame['District Name'] == district, 'FRPM Percent (%)']
+
+
+def search(client, **params):
+    response = client.get('/api/schools/search', query_string=params)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+@pytest.mark.parametrize('district', [SACRAMENTO, TWIN_RIVERS])
+def test_frpm_fractions_are_searched_as_percentages(client, district):
+    fractions = shipped_frpm(district)
+    assert fractions.max() <= 1.0
+
+    result = search(client, district=district, frpm_min=50, per_page=200)
+    assert result['total'] == int((fractions >= 0.5).sum()) > 0
+    # Results carry the percentages the filter compared
+    assert all(school['FRPM Percent (%)'] >= 50 for school in result['results'])
+    assert search(client, district=district, frpm_max=1)['total'] == 0
+
+
+def test_frpm_percentages_are_unchanged(client):
+    percentages = shipped_frpm(NATOMAS)
+    assert percentages.max() > 1.0
+
+    result = search(client, district=NATOMAS, frpm_min=50, per_page=200)
+    assert result['total'] == int((percentages >= 50).sum()) > 0
+
+
+def test_ingested_store_holds_percentages_only(app, client):
+    from routes import main_routes
+    from services import school_store
+
+    main_routes.data_service.ingest(SCHOOL_DATA_SOURCES)
+    frpm = school_store.read_store(main_routes.data_service.store_folder)['FRPM Percent (%)'].dropna()
+    assert len(frpm) and (frpm > 1.0).all()
+
+    for district in (SACRAMENTO, TWIN_RIVERS, NATOMAS):
+        everything = search(client, district=district)['total']
+        assert search(client, district=district, frpm_max=1)['total'] == 0
+        assert 0 < search(client, district=district, frpm_min=50)['total'] <= everything
+
+
+MIXED_SCALE_CSV = """District Name,School Name,School Type,FRPM Percent (%)
+Fraction District,Low,Elementary Schools (Public),0.18
+Fraction District,High,Elementary Schools (Public),0.97
+Percent District,Tiny,Elementary Schools (Public),0.5
+Percent District,Middle,Elementary Schools (Public),28.3
+Percent District,Most,Elementary Schools (Public),91.9
+"""
+
+
+@pytest.fixture
+def mixed_scale_csv(tmp_path):
+    path = tmp_path / 'mixed.csv'
+    path.write_text(MIXED_SCALE_CSV)
+    return str(path)
+
+
+def frpm_by_school(dataset, **filters):
+    return {school['School Name']: school['FRPM Percent (%)']
+            for school in dataset.search(**filters)['results']}
+
+
+@pytest.mark.parametrize('load', [
+    lambda path: SchoolDataset(read_source(path)),
+    lambda path: SchoolDataset.load(path),
+], ids=['store', 'csv'])
+def test_frpm_scale_is_chosen_per_district(mixed_scale_csv, load):
+    dataset = load(mixed_scale_csv)
+
+    assert frpm_by_school(dataset) == pytest.approx(
+        {'Low': 18.0, 'High': 97.0, 'Tiny': 0.5, 'Middle': 28.3, 'Most': 91.9})
+    # A true value under 1% among percentages is not inflated
+    assert frpm_by_school(dataset, frpm_max=1) == {'Tiny': 0.5}
+    assert frpm_by_school(dataset, frpm_min=15, frpm_max=30) == pytest.approx({'Low': 18.0, 'Middle': 28.3})
+
+
+def test_store_values_are_not_scaled_again(mixed_scale_csv):
+    frame = read_source(mixed_scale_csv)
+    assert SchoolDataset(frame).search(frpm_max=1)['total'] == 1
+    assert SchoolDataset(frame).search(frpm_min=100)['total'] == 0
@@ -0,0 +1,78 @@
+"""Tests for section-parallel generation when model calls fail"""
+
+import time
+
+import pytest
+
+from conftest import PROPOSAL_FORM
+from services.fake_llm import FakeGenerativeModel
+from services.section_generator import SectionParallelGenerator
+
+TEMPLATE = "# Intro\nFixed text\n\n# Design\nTBD\n\n# Staffing\nTBD\n"
+
+
+def wait_for_job(client, status_url, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(status_url).get_json()
+        if job['status'] in ('done', 'failed', 'cancelled'):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job did not finish: {job}")
+
+
+def test_failed_section_call_raises():
+    generator = SectionParallelGenerator(max_concurrency=2)
+
+    def call_model(prompt):
+        raise RuntimeError("400 API key not valid")
+
+    with pytest.raises(RuntimeError, match="API key not valid"):
+        generator.generate(TEMPLATE, build_prompt=lambda section: section, call_model=call_model)
+
+
+def test_sections_before_a_failure_are_yielded_first():
+    generator = SectionParallelGenerator(max_concurrency=2)
+
+    def call_model(prompt):
+        if 'Staffing' in prompt:
+            raise RuntimeError("503 Service Unavailable")
+        return prompt.replace('TBD', 'Filled')
+
+    sections = generator.iter_sections(TEMPLATE, build_prompt=lambda section: section, call_model=call_model)
+    assert next(sections).startswith('# Intro')
+    assert 'Filled' in next(sections)
+    with pytest.raises(RuntimeError, match="503"):
+        next(sections)
+
+
+@pytest.fixture
+def failing_llm(monkeypatch):
+    # One section call at a time, so the first failure is the model's own
+    # error rather than a later section finding the key already marked bad
+    monkeypatch.setenv('SECTION_CONCURRENCY', '1')
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        raise RuntimeError("400 API key not valid. Please pass a valid API key.")
+
+    monkeypatch.setattr(FakeGenerativeModel, 'generate_content', generate_content)
+
+
+def test_proposal_job_fails_when_every_section_call_fails(failing_llm, client):
+    submitted = client.post('/api/proposal-jobs', data=PROPOSAL_FORM)
+    assert submitted.status_code == 202
+
+    job = wait_for_job(client, submitted.get_json()['status_url'])
+    assert job['status'] == 'failed'
+    assert 'API key not valid' in job['error']
+    assert not job['has_result']
+
+    page = client.get(submitted.get_json()['result_url'])
+    assert page.status_code == 500
+    assert b'API key not valid' in page.data
+
+
+def test_synchronous_proposal_reports_the_error(failing_llm, client):
+    page = client.post('/proposal', data=PROPOSAL_FORM)
+    assert b'An error occurred in YAML+Jinja generation' in page.data
+    assert b'TBD' not in page.data
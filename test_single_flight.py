@@ -0,0 +1,187 @@
+"""Tests for coalescing identical model calls within and across workers"""
+
+import os
+import threading
+import time
+
+import pytest
+
+from services import single_flight
+from services.request_control import RequestCancelled
+from services.single_flight import SingleFlight
+
+cross_worker = pytest.mark.skipif(single_flight.fcntl is None, reason='needs fcntl file locks')
+
+
+class BlockingCall:
+    """A model call that runs until released and counts how often it ran"""
+
+    def __init__(self, result='shared text'):
+        self.result = result
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        assert self.release.wait(timeout=10)
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+def run_in_thread(func, *args):
+    """Start func(*args); returns the thread and a dict that receives its result or error"""
+    outcome = {}
+
+    def target():
+        try:
+            outcome['result'] = func(*args)
+        except Exception as e:
+            outcome['error'] = e
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    return thread, outcome
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'condition never held'
+        time.sleep(0.01)
+
+
+def test_concurrent_callers_share_one_call(tmp_path):
+    flight = SingleFlight(str(tmp_path))
+    call = BlockingCall()
+    leader, leader_outcome = run_in_thread(flight.do, 'key', call)
+    call.started.wait(timeout=5)
+
+    followers = [run_in_thread(flight.do, 'key', call) for _ in range(3)]
+    wait_until(lambda: flight.get_stats()['followers'] == 3)
+    call.release.set()
+
+    for thread, outcome in [(leader, leader_outcome)] + followers:
+        thread.join(timeout=5)
+        assert outcome == {'result': 'shared text'}
+    assert call.calls == 1
+    stats = flight.get_stats()
+    assert (stats['leaders'], stats['followers'], stats['in_flight']) == (1, 3, 0)
+
+
+def test_followers_see_the_leaders_error(tmp_path):
+    flight = SingleFlight(str(tmp_path))
+    call = BlockingCall(result=RuntimeError('quota exceeded'))
+    leader, leader_outcome = run_in_thread(flight.do, 'key', call)
+    call.started.wait(timeout=5)
+    follower, follower_outcome = run_in_thread(flight.do, 'key', call)
+    wait_until(lambda: flight.get_stats()['followers'] == 1)
+    call.release.set()
+
+    for thread in (leader, follower):
+        thread.join(timeout=5)
+    assert str(leader_outcome['error']) == 'quota exceeded'
+    assert follower_outcome['error'] is leader_outcome['error']
+    # Nothing is left behind for the next caller
+    assert flight.do('key', lambda: 'retried') == 'retried'
+
+
+def test_different_keys_run_separately(tmp_path):
+    flight = SingleFlight(str(tmp_path))
+    assert flight.do('first', lambda: 'one') == 'one'
+    assert flight.do('second', lambda: 'two') == 'two'
+    assert flight.get_stats()['leaders'] == 2
+
+
+def test_cancelled_follower_stops_waiting(tmp_path):
+    flight = SingleFlight(str(tmp_path))
+    call = BlockingCall()
+    leader, leader_outcome = run_in_thread(flight.do, 'key', call)
+    call.started.wait(timeout=5)
+
+    cancel_event = threading.Event()
+    follower, follower_outcome = run_in_thread(flight.do, 'key', call, cancel_event)
+    wait_until(lambda: flight.get_stats()['followers'] == 1)
+    cancel_event.set()
+    follower.join(timeout=5)
+    assert isinstance(follower_outcome['error'], RequestCancelled)
+
+    # The leader carries on for its own caller
+    call.release.set()
+    leader.join(timeout=5)
+    assert leader_outcome == {'result': 'shared text'}
+
+
+@cross_worker
+def test_waiting_worker_reuses_the_published_result(tmp_path):
+    # Two instances on one folder stand in for two gunicorn workers
+    worker_a, worker_b = SingleFlight(str(tmp_path)), SingleFlight(str(tmp_path))
+    call = BlockingCall()
+    leader, leader_outcome = run_in_thread(worker_a.do, 'key', call)
+    call.started.wait(timeout=5)
+
+    second_call = BlockingCall(result='duplicate text')
+    waiter, waiter_outcome = run_in_thread(worker_b.do, 'key', second_call)
+    time.sleep(3 * single_flight.LOCK_POLL_SECONDS)
+    call.release.set()
+
+    for thread in (leader, waiter):
+        thread.join(timeout=5)
+    assert leader_outcome == waiter_outcome == {'result': 'shared text'}
+    assert second_call.calls == 0
+    assert worker_b.get_stats()['cross_worker_hits'] == 1
+    assert (tmp_path / 'key.result').read_text(encoding='utf-8') == 'shared text'
+
+
+@cross_worker
+def test_results_from_before_the_wait_are_not_reused(tmp_path):
+    worker_a, worker_b = SingleFlight(str(tmp_path)), SingleFlight(str(tmp_path))
+    worker_a.do('key', lambda: 'old text')
+    # No one holds the lock, so worker_b calls the model itself
+    assert worker_b.do('key', lambda: 'new text') == 'new text'
+    assert worker_b.get_stats()['cross_worker_hits'] == 0
+
+
+@cross_worker
+def test_worker_calls_anyway_after_the_wait_timeout(tmp_path):
+    worker_a = SingleFlight(str(tmp_path))
+    worker_b = SingleFlight(str(tmp_path), wait_timeout=0.2)
+    call = BlockingCall()
+    leader, _ = run_in_thread(worker_a.do, 'key', call)
+    call.started.wait(timeout=5)
+    try:
+        assert worker_b.do('key', lambda: 'impatient text') == 'impatient text'
+    finally:
+        call.release.set()
+        leader.join(timeout=5)
+
+
+@cross_worker
+def test_worker_waiting_on_the_lock_can_be_cancelled(tmp_path):
+    worker_a, worker_b = SingleFlight(str(tmp_path)), SingleFlight(str(tmp_path))
+    call = BlockingCall()
+    leader, _ = run_in_thread(worker_a.do, 'key', call)
+    call.started.wait(timeout=5)
+    cancel_event = threading.Event()
+    cancel_event.set()
+    try:
+        with pytest.raises(RequestCancelled):
+            worker_b.do('key', lambda: 'unused', cancel_event=cancel_event)
+    finally:
+        call.release.set()
+        leader.join(timeout=5)
+
+
+@cross_worker
+def test_expired_results_are_pruned(tmp_path):
+    flight = SingleFlight(str(tmp_path), result_ttl=60)
+    flight.do('old', lambda: 'old text')
+    an_hour_ago = time.time() - 3600
+    os.utime(tmp_path / 'old.result', (an_hour_ago, an_hour_ago))
+
+    flight.do('new', lambda: 'new text')
+    assert not (tmp_path / 'old.result').exists()
+    assert (tmp_path / 'old.lock').exists()
+    assert (tmp_path / 'new.result').exists()